@@ -1,3 +1,9 @@
 """CommitCurry - A command line application."""
 
+import time
+
+# Taken before any submodule and its dependencies are imported, so profiles
+# can report how long imports took.
+IMPORT_STARTED = time.perf_counter()
+
 __version__ = "0.1.0"
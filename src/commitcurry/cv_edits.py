@@ -0,0 +1,163 @@
+"""Section-level edit lists as a compact alternative to regenerating a CV."""
+
+import json
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+from .packing import load_json_object
+
+EDITS_PROMPT_TEMPLATE = "cv_edits_prompt.txt"
+
+EDIT_OPERATIONS = ("replace", "insert", "delete")
+
+EDIT_LIST_SCHEMA: dict = {
+    "type": "object",
+    "properties": {
+        "edits": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "op": {"enum": list(EDIT_OPERATIONS)},
+                    "section": {"type": "string"},
+                    "content": {"type": "string"},
+                },
+                "required": ["op", "section"],
+            },
+        },
+    },
+    "required": ["edits"],
+}
+
+_HEADING = re.compile(r"^#{1,6}\s")
+
+
+@dataclass
+class CVSection:
+    """A markdown section of a CV: a heading line and the text below it."""
+
+    section_id: str
+    text: str
+
+
+@dataclass
+class CVEdit:
+    """A single edit against a section of the original CV.
+
+    ``replace`` swaps the section for ``content``, ``insert`` adds
+    ``content`` as a new section after it and ``delete`` removes it.
+    """
+
+    op: str
+    section_id: str
+    content: str = ""
+
+
+def split_sections(cv_content: str) -> list[CVSection]:
+    """Split a markdown CV into sections at its headings.
+
+    Text before the first heading (usually the name and contact details)
+    becomes its own section. Sections are numbered ``s1``, ``s2``, ... in
+    document order.
+    """
+    chunks: list[list[str]] = [[]]
+    in_code_block = False
+    for line in cv_content.strip().splitlines():
+        if line.lstrip().startswith("```"):
+            in_code_block = not in_code_block
+        if _HEADING.match(line) and not in_code_block and chunks[-1]:
+            chunks.append([])
+        chunks[-1].append(line)
+
+    texts = ["\n".join(chunk).strip() for chunk in chunks]
+    return [
+        CVSection(section_id=f"s{number}", text=text)
+        for number, text in enumerate((text for text in texts if text), start=1)
+    ]
+
+
+def format_sections(sections: Sequence[CVSection]) -> str:
+    """Render sections with their ids for the edit-list prompt."""
+    return "\n\n".join(
+        f"[{section.section_id}]\n{section.text}" for section in sections
+    )
+
+
+def format_edits_prompt(template: str, cv_content: str, job_description: str) -> str:
+    """Fill the edit-list prompt template for a CV and a job description."""
+    return template.format(
+        output_schema=json.dumps(EDIT_LIST_SCHEMA, indent=2),
+        cv_sections=format_sections(split_sections(cv_content)),
+        job_description=job_description.strip(),
+    )
+
+
+def parse_edit_list(text: str, sections: Sequence[CVSection]) -> Optional[list[CVEdit]]:
+    """Validate an edit-list response against the CV's sections.
+
+    Unlike packed responses, edits are all-or-nothing: a partially applied
+    edit list could leave the CV inconsistent, so any invalid entry rejects
+    the whole list.
+
+    Args:
+        text: Raw model output, expected to match ``EDIT_LIST_SCHEMA``
+        sections: Sections of the original CV the edits refer to
+
+    Returns:
+        The edits in response order, or None if the response is malformed,
+        uses an unknown operation or section id, omits required content,
+        or replaces or deletes the same section twice
+    """
+    data = load_json_object(text)
+    if not isinstance(data, dict) or not isinstance(data.get("edits"), list):
+        return None
+
+    section_ids = {section.section_id for section in sections}
+    changed: set[str] = set()
+    edits = []
+    for entry in data["edits"]:
+        if not isinstance(entry, dict):
+            return None
+        op, section_id = entry.get("op"), entry.get("section")
+        content = entry.get("content", "")
+        if op not in EDIT_OPERATIONS or section_id not in section_ids:
+            return None
+        if not isinstance(content, str):
+            return None
+        if op != "delete" and not content.strip():
+            return None
+        if op != "insert":
+            if section_id in changed:
+                return None
+            changed.add(section_id)
+        edits.append(CVEdit(op=op, section_id=section_id, content=content.strip()))
+    return edits
+
+
+def apply_edits(sections: Sequence[CVSection], edits: Sequence[CVEdit]) -> str:
+    """Apply validated edits to the original sections.
+
+    Args:
+        sections: Sections of the original CV
+        edits: Edits returned by ``parse_edit_list``
+
+    Returns:
+        The edited CV; untouched sections are kept verbatim
+    """
+    replacements = {edit.section_id: edit for edit in edits if edit.op != "insert"}
+    insertions: dict[str, list[str]] = {}
+    for edit in edits:
+        if edit.op == "insert":
+            insertions.setdefault(edit.section_id, []).append(edit.content)
+
+    parts = []
+    for section in sections:
+        replacement = replacements.get(section.section_id)
+        if replacement is None:
+            parts.append(section.text)
+        elif replacement.op == "replace":
+            parts.append(replacement.content)
+        parts.extend(insertions.get(section.section_id, []))
+    return "\n\n".join(parts)
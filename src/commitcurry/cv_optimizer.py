@@ -1,48 +1,157 @@
 """CV optimization module using various AI agents."""
 
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Any, Optional
 
+from griptape.artifacts import TextArtifact  # type: ignore
+from griptape.common import (  # type: ignore
+    Message,
+    PromptStack,
+    TextDeltaMessageContent,
+    TextMessageContent,
+)
 from griptape.structures import Agent  # type: ignore
 
+from .cv_edits import (
+    EDITS_PROMPT_TEMPLATE,
+    apply_edits,
+    format_edits_prompt,
+    parse_edit_list,
+    split_sections,
+)
+from .generation_guard import (
+    GenerationAbortedError,
+    GenerationGuard,
+    GuardSettings,
+    adjusted_sampling,
+)
+from .packing import (
+    PACKED_OUTPUT_SCHEMA,
+    PACKED_PROMPT_TEMPLATE,
+    format_packed_prompt,
+    parse_packed_output,
+    structured_output,
+)
+from .profiling import RunProfiler
+from .providers.cancellation import abort_prompt_driver, reset_prompt_driver
+from .providers.gemini_thinking import reported_thinking_tokens
+from .thinking import (
+    ThinkingBudgetExceededError,
+    ThinkingControl,
+    ThinkingUsage,
+    ThinkStripper,
+)
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMPT_TEMPLATE = "cv_optimization_prompt.txt"
+
+# How often the waiting thread checks for cancellation while a request runs.
+CANCEL_POLL_INTERVAL = 0.05
+
+# How long to wait for an aborted request to unwind before starting a new one.
+ABORTED_RUN_GRACE_PERIOD = 15.0
+
+
+class OptimizationTimeoutError(TimeoutError):
+    """Raised when a CV optimization does not finish before its deadline."""
+
+
+class OptimizationCancelledError(Exception):
+    """Raised when an in-flight CV optimization is cancelled."""
+
+
+def load_prompt_template(name: str = DEFAULT_PROMPT_TEMPLATE) -> str:
+    """Load a prompt template bundled with the application.
+
+    Args:
+        name: Template file name inside the templates directory
+
+    Returns:
+        The template text
+
+    Raises:
+        FileNotFoundError: If the template is missing from the package
+    """
+    template_path = Path(__file__).parent / "templates" / name
+    try:
+        return template_path.read_text(encoding="utf-8")
+    except FileNotFoundError as e:
+        raise FileNotFoundError(
+            f"CV optimization prompt template is required but not found: "
+            f"{template_path}. This file should be included as part of the "
+            "application package."
+        ) from e
+
 
 class CVOptimizer:
     """CV optimization service using configurable AI agents."""
 
-    def __init__(self, agent: Agent):
+    def __init__(
+        self,
+        agent: Agent,
+        profiler: Optional[RunProfiler] = None,
+        thinking: Optional[ThinkingControl] = None,
+        guard: Optional[GuardSettings] = None,
+    ):
         """Initialize the CV optimizer.
 
         Args:
             agent: AI agent instance to use for optimization
+            profiler: Optional started profiler; agent runs on worker threads
+                are included in it, with model calls attributed separately
+            thinking: Optional thinking settings for reasoning models; models
+                that think inline are streamed so their <think> blocks are
+                stripped and the thinking budget enforced
+            guard: Optional generation guard settings; answers are then
+                streamed and stopped once they exceed an output budget
+                derived from the CV length or fall into a repetition loop
         """
         self.agent = agent
+        self.profiler = profiler
+        self.thinking = thinking
+        self.guard = guard
+        # Thinking versus answer tokens of the last request, for inline
+        # thinking models
+        self.thinking_usage: Optional[ThinkingUsage] = None
         # Load prompt template
         self.prompt_template = self._load_prompt_template()
+        self._packed_prompt_template: Optional[str] = None
+        self._edits_prompt_template: Optional[str] = None
+        self._cancelled = threading.Event()
+        self._aborted_worker: Optional[threading.Thread] = None
+        self._worker: Optional[threading.Thread] = None
 
     def _load_prompt_template(self) -> str:
         """Load the CV optimization prompt template."""
-        template_path = (
-            Path(__file__).parent / "templates" / "cv_optimization_prompt.txt"
-        )
-        try:
-            return template_path.read_text(encoding="utf-8")
-        except FileNotFoundError as e:
-            raise FileNotFoundError(
-                f"CV optimization prompt template is required but not found: "
-                f"{template_path}. This file should be included as part of the "
-                "application package."
-            ) from e
+        return load_prompt_template()
 
-    def optimize_cv(self, cv_content: str, job_description: str) -> str:
+    def optimize_cv(
+        self,
+        cv_content: str,
+        job_description: str,
+        deadline: Optional[float] = None,
+    ) -> str:
         """Optimize a CV for a specific job description.
 
         Args:
             cv_content: The original CV content
             job_description: The job description to tailor the CV for
+            deadline: Optional ``time.monotonic()`` timestamp by which the
+                optimization must finish; the request is aborted after it
 
         Returns:
             The optimized CV content
 
         Raises:
+            OptimizationTimeoutError: If the deadline passes first
+            OptimizationCancelledError: If ``cancel()`` is called meanwhile
             Exception: If the optimization fails
         """
         try:
@@ -52,34 +161,449 @@ class CVOptimizer:
             )
 
             # Use the configured agent to generate optimized CV
-            response = self.agent.run(prompt)
+            response = self._run_agent(
+                prompt, deadline, self._output_budget(cv_content)
+            )
+            return self._extract_output(response)
+
+        except (OptimizationTimeoutError, OptimizationCancelledError):
+            raise
+        except Exception as e:
+            raise Exception(
+                f"Failed to optimize CV with agent: {str(e)}"
+            ) from e
+
+    def optimize_cv_packed(
+        self,
+        cv_content: str,
+        job_descriptions: Sequence[str],
+        deadline: Optional[float] = None,
+    ) -> list[str]:
+        """Optimize a CV for several job descriptions in a single request.
+
+        The CV and instructions are sent once together with all job
+        descriptions, and the model answers with a JSON document holding one
+        tailored CV per job. Ollama and Gemini enforce the output schema
+        natively. Entries missing from the answer or failing validation are
+        produced with individual ``optimize_cv`` calls.
 
-            # Extract the output text from Griptape Agent response
-            if hasattr(response, "output_task") and hasattr(
-                response.output_task, "output"
+        Args:
+            cv_content: The original CV content
+            job_descriptions: The job descriptions to tailor the CV for
+            deadline: Optional ``time.monotonic()`` deadline for all requests
+
+        Returns:
+            The optimized CV contents, in the order of ``job_descriptions``
+
+        Raises:
+            OptimizationTimeoutError: If the deadline passes first
+            OptimizationCancelledError: If ``cancel()`` is called meanwhile
+            Exception: If the optimization fails
+        """
+        if len(job_descriptions) == 1:
+            return [self.optimize_cv(cv_content, job_descriptions[0], deadline)]
+
+        try:
+            prompt = format_packed_prompt(
+                self.packed_prompt_template, cv_content, job_descriptions
+            )
+            with structured_output(
+                getattr(self.agent, "prompt_driver", None), PACKED_OUTPUT_SCHEMA
             ):
-                # For newer Griptape versions
-                output_value = response.output_task.output
-                if hasattr(output_value, "value"):
-                    return str(output_value.value).strip()
-                else:
-                    return str(output_value).strip()
-            elif hasattr(response, "output"):
-                # Alternative structure
-                output_value = response.output
-                if hasattr(output_value, "value"):
-                    return str(output_value.value).strip()
-                else:
-                    return str(output_value).strip()
-            else:
-                # Fallback - convert response to string
-                return str(response).strip()
+                response = self._run_agent(
+                    prompt,
+                    deadline,
+                    self._output_budget(cv_content, len(job_descriptions)),
+                )
+            results = parse_packed_output(
+                self._extract_output(response), len(job_descriptions)
+            )
+        except (OptimizationTimeoutError, OptimizationCancelledError):
+            raise
+        except Exception as e:
+            raise Exception(
+                f"Failed to optimize CV with agent: {str(e)}"
+            ) from e
+
+        optimized = []
+        for index, (job_description, result) in enumerate(
+            zip(job_descriptions, results)
+        ):
+            if result is None:
+                logger.warning(
+                    "Packed response has no valid CV for job %d, "
+                    "falling back to an individual request",
+                    index + 1,
+                )
+                result = self.optimize_cv(cv_content, job_description, deadline)
+            optimized.append(result)
+        return optimized
+
+    def optimize_cv_edits(
+        self,
+        cv_content: str,
+        job_description: str,
+        deadline: Optional[float] = None,
+    ) -> str:
+        """Optimize a CV by asking the model for section-level edits.
+
+        The model sees the CV split into numbered sections and answers with
+        a JSON list of replace/insert/delete edits, which are validated and
+        applied locally. Sections that need no change are not re-generated,
+        which cuts completion tokens for long CVs. If the edit list is
+        malformed, the CV is regenerated in full with ``optimize_cv``.
+
+        Args:
+            cv_content: The original CV content
+            job_description: The job description to tailor the CV for
+            deadline: Optional ``time.monotonic()`` deadline for all requests
+
+        Returns:
+            The optimized CV content
 
+        Raises:
+            OptimizationTimeoutError: If the deadline passes first
+            OptimizationCancelledError: If ``cancel()`` is called meanwhile
+            Exception: If the optimization fails
+        """
+        sections = split_sections(cv_content)
+        try:
+            prompt = format_edits_prompt(
+                self.edits_prompt_template, cv_content, job_description
+            )
+            response = self._run_agent(
+                prompt, deadline, self._output_budget(cv_content)
+            )
+            edits = parse_edit_list(self._extract_output(response), sections)
+        except (OptimizationTimeoutError, OptimizationCancelledError):
+            raise
         except Exception as e:
             raise Exception(
                 f"Failed to optimize CV with agent: {str(e)}"
             ) from e
 
+        optimized = apply_edits(sections, edits).strip() if edits is not None else ""
+        if not optimized:
+            logger.warning(
+                "Edit list response is malformed, falling back to full regeneration"
+            )
+            return self.optimize_cv(cv_content, job_description, deadline)
+        return optimized
+
+    @property
+    def edits_prompt_template(self) -> str:
+        """Prompt template for edit-list requests, loaded on first use."""
+        if self._edits_prompt_template is None:
+            self._edits_prompt_template = load_prompt_template(EDITS_PROMPT_TEMPLATE)
+        return self._edits_prompt_template
+
+    @property
+    def packed_prompt_template(self) -> str:
+        """Prompt template for packed multi-job requests, loaded on first use."""
+        if self._packed_prompt_template is None:
+            self._packed_prompt_template = load_prompt_template(PACKED_PROMPT_TEMPLATE)
+        return self._packed_prompt_template
+
+    def cancel(self) -> None:
+        """Cancel the optimization currently in flight, if any.
+
+        Safe to call from any thread. The HTTP request is aborted so the
+        server stops generating, and ``optimize_cv`` raises
+        ``OptimizationCancelledError``.
+        """
+        self._cancelled.set()
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._abort(worker)
+
+    def _output_budget(self, cv_content: str, answers: int = 1) -> Optional[int]:
+        """Return the guard's output budget for a request, if guarded."""
+        if self.guard is None:
+            return None
+        return self.guard.output_budget(cv_content, answers)
+
+    def _run_agent(
+        self,
+        prompt: str,
+        deadline: Optional[float],
+        output_budget: Optional[int] = None,
+    ) -> Any:
+        """Run the agent on a worker thread, honouring deadline and cancellation.
+
+        The calling thread stays responsive to Ctrl-C, deadlines and
+        ``cancel()`` while the request is in flight; any of them aborts the
+        request instead of leaving it generating on the server.
+        """
+        self._wait_for_aborted_run(deadline)
+        self._cancelled.clear()
+
+        result: dict = {}
+
+        def target() -> None:
+            profiling = self.profiler.profile_thread() if self.profiler else None
+            try:
+                with profiling or nullcontext():
+                    result["response"] = self._generate(prompt, output_budget)
+            except BaseException as e:  # re-raised on the calling thread
+                result["error"] = e
+
+        worker = threading.Thread(target=target, name="commitcurry-agent", daemon=True)
+        self._worker = worker
+        worker.start()
+        try:
+            while worker.is_alive():
+                if self._cancelled.is_set():
+                    self._abort(worker)
+                    raise OptimizationCancelledError("CV optimization was cancelled")
+                timeout = CANCEL_POLL_INTERVAL
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._abort(worker)
+                        raise OptimizationTimeoutError(
+                            "CV optimization did not finish before the deadline"
+                        )
+                    timeout = min(timeout, remaining)
+                worker.join(timeout)
+        except KeyboardInterrupt:
+            self._abort(worker)
+            raise
+
+        if self._cancelled.is_set():
+            self._abort(worker)
+            raise OptimizationCancelledError("CV optimization was cancelled")
+        if "error" in result:
+            raise result["error"]
+        return result["response"]
+
+    def _generate(self, prompt: str, output_budget: Optional[int] = None) -> Any:
+        """Run a prompt on the agent; called on the worker thread.
+
+        Inline thinking models and guarded requests are streamed from the
+        prompt driver. Think blocks are stripped and counted as they arrive;
+        if thinking exceeds its budget, the request is abandoned and retried
+        with thinking disabled. Models thinking out of band (Gemini) report
+        their thinking tokens with the response instead.
+        """
+        control = self.thinking
+        driver = getattr(self.agent, "prompt_driver", None)
+        if control is None or control.support.inline:
+            return self._generate_answer(driver, prompt, control, output_budget)
+
+        reported = reported_thinking_tokens(driver)
+        response = self._generate_answer(driver, prompt, None, output_budget)
+        if reported is not None:
+            self.thinking_usage = ThinkingUsage(
+                thinking_tokens=(reported_thinking_tokens(driver) or 0) - reported,
+                answer_tokens=estimate_tokens(self._extract_output(response)),
+            )
+        return response
+
+    def _generate_answer(
+        self,
+        driver: Any,
+        prompt: str,
+        control: Optional[ThinkingControl],
+        output_budget: Optional[int],
+    ) -> Any:
+        """Run a prompt, streaming it for inline thinking or a guard."""
+        if self.guard is None:
+            output_budget = None
+        if (
+            driver is None
+            or (control is None and output_budget is None)
+            or not hasattr(driver, "try_stream")
+        ):
+            return self.agent.run(prompt)
+
+        usage = ThinkingUsage()
+        if control is not None:
+            self.thinking_usage = usage
+        budget = (
+            control.budget
+            if control is not None and control.enabled is not False
+            else None
+        )
+        try:
+            answer = self._guarded_answer(
+                driver, prompt, control is not None, budget, output_budget, usage
+            )
+        except ThinkingBudgetExceededError as e:
+            logger.warning("%s, retrying with thinking disabled", e)
+            usage.retried_without_thinking = True
+            previous = dict(driver.extra_params)
+            driver.extra_params["think"] = False
+            try:
+                answer = self._guarded_answer(
+                    driver, prompt, True, None, output_budget, usage
+                )
+            finally:
+                driver.extra_params.clear()
+                driver.extra_params.update(previous)
+        usage.answer_tokens = estimate_tokens(answer)
+        return answer
+
+    def _guarded_answer(
+        self,
+        driver: Any,
+        prompt: str,
+        strip_thinking: bool,
+        thinking_budget: Optional[int],
+        output_budget: Optional[int],
+        usage: ThinkingUsage,
+    ) -> str:
+        """Stream an answer, retrying once if the guard stops it.
+
+        The retry runs with a higher temperature and repeat penalty. If it
+        is stopped too, the longest valid prefix of both attempts is
+        returned rather than failing the run.
+        """
+        if output_budget is None or self.guard is None:
+            return self._stream_answer(
+                driver, prompt, strip_thinking, thinking_budget, None, usage
+            )
+        settings = self.guard
+        try:
+            return self._stream_answer(
+                driver,
+                prompt,
+                strip_thinking,
+                thinking_budget,
+                settings.create(output_budget),
+                usage,
+            )
+        except GenerationAbortedError as e:
+            first_error = e
+        if not settings.retry:
+            return self._valid_prefix(first_error)
+
+        logger.warning("%s, retrying with adjusted sampling", first_error)
+        try:
+            with adjusted_sampling(driver, settings):
+                return self._stream_answer(
+                    driver,
+                    prompt,
+                    strip_thinking,
+                    thinking_budget,
+                    settings.create(output_budget),
+                    usage,
+                )
+        except GenerationAbortedError as e:
+            if len(first_error.prefix) > len(e.prefix):
+                e.prefix = first_error.prefix
+            return self._valid_prefix(e)
+
+    @staticmethod
+    def _valid_prefix(error: GenerationAbortedError) -> str:
+        """Return the valid prefix of a stopped answer, or re-raise if empty."""
+        if not error.prefix.strip():
+            raise error
+        logger.warning("%s, returning the last valid prefix", error)
+        return error.prefix.strip()
+
+    @staticmethod
+    def _stream_answer(
+        driver: Any,
+        prompt: str,
+        strip_thinking: bool,
+        thinking_budget: Optional[int],
+        guard: Optional[GenerationGuard],
+        usage: ThinkingUsage,
+    ) -> str:
+        """Stream a prompt and return the answer without think blocks.
+
+        The guard only sees answer text: until the stripper meets its first
+        tag, the text is held back, as a closing tag would turn it into a
+        think block opened by the chat template.
+        """
+        prompt_stack = PromptStack()
+        prompt_stack.add_user_message(prompt)
+        stripper = ThinkStripper(thinking_budget) if strip_thinking else None
+        chunks: list[str] = []
+        held: list[str] = []
+        driver.before_run(prompt_stack)
+        stream = driver.try_stream(prompt_stack)
+        try:
+            for delta in stream:
+                if not isinstance(delta.content, TextDeltaMessageContent):
+                    continue
+                text = delta.content.text
+                if stripper is not None:
+                    text = stripper.feed(text)
+                    if stripper.undecided:
+                        held.append(text)
+                        continue
+                    if held and not stripper.template_opened:
+                        text = "".join(held) + text
+                    held = []
+                else:
+                    chunks.append(text)
+                if guard is not None:
+                    guard.feed(text)
+            if guard is not None and held:
+                guard.feed("".join(held))
+        finally:
+            # Closing the stream drops the connection, so an abandoned
+            # request stops generating on the server
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            if stripper is not None:
+                usage.thinking_tokens += stripper.thinking_tokens
+        answer = stripper.finish() if stripper is not None else "".join(chunks).strip()
+        driver.after_run(
+            Message(
+                content=[TextMessageContent(TextArtifact(answer))],
+                role=Message.ASSISTANT_ROLE,
+                usage=Message.Usage(),
+            )
+        )
+        return answer
+
+    def _abort(self, worker: threading.Thread) -> None:
+        """Abort the in-flight request served by the given worker thread."""
+        abort_prompt_driver(getattr(self.agent, "prompt_driver", None))
+        self._aborted_worker = worker
+
+    def _wait_for_aborted_run(self, deadline: Optional[float]) -> None:
+        """Let a previously aborted request unwind, then reset the driver.
+
+        The aborted request's connection is closed, so it fails quickly
+        (possibly after a retry); the driver gets a fresh client afterwards.
+        """
+        worker = self._aborted_worker
+        if worker is None:
+            return
+        grace = ABORTED_RUN_GRACE_PERIOD
+        if deadline is not None:
+            grace = max(0.0, min(grace, deadline - time.monotonic()))
+        worker.join(grace)
+        reset_prompt_driver(getattr(self.agent, "prompt_driver", None))
+        self._aborted_worker = None
+
+    @staticmethod
+    def _extract_output(response: Any) -> str:
+        """Extract the output text from a Griptape Agent response."""
+        if hasattr(response, "output_task") and hasattr(
+            response.output_task, "output"
+        ):
+            # For newer Griptape versions
+            output_value = response.output_task.output
+            if hasattr(output_value, "value"):
+                return str(output_value.value).strip()
+            else:
+                return str(output_value).strip()
+        elif hasattr(response, "output"):
+            # Alternative structure
+            output_value = response.output
+            if hasattr(output_value, "value"):
+                return str(output_value.value).strip()
+            else:
+                return str(output_value).strip()
+        else:
+            # Fallback - convert response to string
+            return str(response).strip()
+
 
 def create_cv_optimizer(agent: Agent) -> CVOptimizer:
     """Factory function to create a CV optimizer instance.
@@ -0,0 +1,218 @@
+"""Streaming guard against runaway generations.
+
+Small local models occasionally fall into repetition loops and keep
+generating until the context window fills. The guard watches the answer as it
+streams, enforces an output budget derived from the CV length, and detects
+repeated n-grams, so the request can be abandoned early.
+"""
+
+import math
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from .tokens import estimate_tokens
+
+# A tailored CV is about as long as the original; the ratio leaves room for
+# rewording, and packed or edit-list answers add JSON markup.
+OUTPUT_BUDGET_RATIO = 2.0
+
+# Output budget for very short CVs.
+MIN_OUTPUT_BUDGET = 1024
+
+# Words and punctuation marks of an n-gram; long enough that ordinary CV
+# phrasing (dates, bullet markup) does not repeat by chance.
+NGRAM_SIZE = 12
+
+# Occurrences of the same n-gram that count as a repetition loop.
+MAX_NGRAM_REPEATS = 4
+
+# Sampling used when retrying a degenerate generation.
+RETRY_TEMPERATURE = 0.7
+RETRY_REPEAT_PENALTY = 1.2
+
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+class GenerationAbortedError(Exception):
+    """Raised when the guard stops a generation.
+
+    Attributes:
+        prefix: The answer up to the last complete line before the problem
+    """
+
+    def __init__(self, message: str, prefix: str):
+        super().__init__(message)
+        self.prefix = prefix
+
+
+class OutputBudgetExceededError(GenerationAbortedError):
+    """Raised when the answer grows past its output token budget."""
+
+
+class RepetitionLoopError(GenerationAbortedError):
+    """Raised when the answer keeps repeating the same n-gram."""
+
+
+@dataclass(frozen=True)
+class GuardSettings:
+    """Settings of the generation guard.
+
+    Attributes:
+        budget_ratio: Output budget as a multiple of the CV's token count
+        min_budget: Smallest output budget
+        ngram_size: Words and punctuation marks per n-gram
+        max_repeats: Occurrences of one n-gram that abort the generation
+        retry: Retry an aborted generation once with adjusted sampling
+            before falling back to the last valid prefix
+        retry_temperature: Minimum temperature of the retry
+        retry_repeat_penalty: Repeat penalty of the retry (Ollama only)
+    """
+
+    budget_ratio: float = OUTPUT_BUDGET_RATIO
+    min_budget: int = MIN_OUTPUT_BUDGET
+    ngram_size: int = NGRAM_SIZE
+    max_repeats: int = MAX_NGRAM_REPEATS
+    retry: bool = True
+    retry_temperature: float = RETRY_TEMPERATURE
+    retry_repeat_penalty: float = RETRY_REPEAT_PENALTY
+
+    def output_budget(self, cv_content: str, answers: int = 1) -> int:
+        """Return the output token budget for answers derived from a CV.
+
+        Args:
+            cv_content: The CV being tailored
+            answers: Number of tailored CVs expected in the answer
+        """
+        per_answer = math.ceil(estimate_tokens(cv_content) * self.budget_ratio)
+        return max(self.min_budget, per_answer) * answers
+
+    def create(self, max_tokens: int) -> "GenerationGuard":
+        """Return a guard for one generation."""
+        return GenerationGuard(max_tokens, self.ngram_size, self.max_repeats)
+
+
+class GenerationGuard:
+    """Watch a streamed answer for budget overruns and repetition loops.
+
+    Feed answer chunks as they arrive; ``feed`` raises once the answer
+    exceeds ``max_tokens`` or an n-gram occurs ``max_repeats`` times.
+    Chunks are counted as tokens the way ``ThinkStripper`` counts them.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        ngram_size: int = NGRAM_SIZE,
+        max_repeats: int = MAX_NGRAM_REPEATS,
+    ):
+        """Initialize the guard.
+
+        Args:
+            max_tokens: Output token budget
+            ngram_size: Words and punctuation marks per n-gram
+            max_repeats: Occurrences of one n-gram that count as a loop
+        """
+        self.max_tokens = max_tokens
+        self.ngram_size = ngram_size
+        self.max_repeats = max_repeats
+        self.tokens = 0
+        self._text = ""
+        # Pieces and their offsets in the text; the last piece may still
+        # grow with the next chunk, so it is only counted once complete
+        self._pieces: list[str] = []
+        self._offsets: list[int] = []
+        self._scanned = 0
+        self._ngrams: dict[tuple[str, ...], list[int]] = {}
+
+    @property
+    def text(self) -> str:
+        """The answer seen so far."""
+        return self._text
+
+    def feed(self, text: str) -> None:
+        """Consume the next chunk of the answer.
+
+        Raises:
+            OutputBudgetExceededError: If the answer exceeds the budget
+            RepetitionLoopError: If the answer repeats itself
+        """
+        if not text:
+            return
+        self._text += text
+        self.tokens += estimate_tokens(text)
+        if self.tokens > self.max_tokens:
+            raise OutputBudgetExceededError(
+                f"Answer exceeded the output budget of {self.max_tokens} tokens",
+                _complete_lines(self._text),
+            )
+        self._scan()
+
+    def _scan(self) -> None:
+        """Split new text into pieces and count the completed n-grams."""
+        for match in _PIECE_PATTERN.finditer(self._text, self._scanned):
+            if match.end() == len(self._text):
+                break  # may continue in the next chunk
+            self._pieces.append(match.group())
+            self._offsets.append(match.start())
+            self._scanned = match.end()
+            if len(self._pieces) >= self.ngram_size:
+                self._count_ngram()
+
+    def _count_ngram(self) -> None:
+        start = len(self._pieces) - self.ngram_size
+        ngram = tuple(self._pieces[start:])
+        positions = self._ngrams.setdefault(ngram, [])
+        positions.append(start)
+        if len(positions) >= self.max_repeats:
+            # Keep the text up to the first repetition of the looping n-gram
+            repeat_offset = self._offsets[positions[1]]
+            raise RepetitionLoopError(
+                f"Answer repeated the same {self.ngram_size}-gram "
+                f"{len(positions)} times",
+                _complete_lines(self._text[:repeat_offset]),
+            )
+
+
+@contextmanager
+def adjusted_sampling(prompt_driver: Any, settings: GuardSettings) -> Iterator[None]:
+    """Temporarily raise the temperature and repeat penalty of a driver.
+
+    Ollama drivers take both through their ``options``; other drivers only
+    get the higher temperature. The previous values are restored on exit.
+
+    Args:
+        prompt_driver: A Griptape prompt driver instance
+        settings: Guard settings holding the retry sampling
+    """
+    options = getattr(prompt_driver, "options", None)
+    if isinstance(options, dict):
+        previous = dict(options)
+        options["temperature"] = max(
+            options.get("temperature") or 0.0, settings.retry_temperature
+        )
+        options["repeat_penalty"] = settings.retry_repeat_penalty
+        try:
+            yield
+        finally:
+            options.clear()
+            options.update(previous)
+        return
+
+    temperature = getattr(prompt_driver, "temperature", None)
+    if temperature is None:
+        yield
+        return
+    prompt_driver.temperature = max(temperature, settings.retry_temperature)
+    try:
+        yield
+    finally:
+        prompt_driver.temperature = temperature
+
+
+def _complete_lines(text: str) -> str:
+    """Return the text up to its last line break, dropping a partial line."""
+    end = text.rfind("\n")
+    return text[:end].rstrip() if end != -1 else ""
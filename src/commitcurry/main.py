@@ -1,14 +1,42 @@
 """Main entry point for CommitCurry CLI application."""
 
 import sys
+import time
 from pathlib import Path
 from typing import Optional
 
 import click
 
 from .config.logging import setup_logging
-from .cv_optimizer import create_cv_optimizer
+from .cv_edits import EDITS_PROMPT_TEMPLATE
+from .cv_optimizer import (
+    DEFAULT_PROMPT_TEMPLATE,
+    OptimizationCancelledError,
+    OptimizationTimeoutError,
+    create_cv_optimizer,
+    load_prompt_template,
+)
+from .generation_guard import GuardSettings
+from .packing import PACKED_PROMPT_TEMPLATE, format_job_postings
+from .preflight import (
+    ContextWindowExceededError,
+    estimate_prompt_tokens,
+    plan_packed_request,
+    plan_request,
+)
+from .profiling import PROFILE_MODES, RunProfiler
 from .providers.factory import AgentFactory
+from .ranking import CVIndex, TailoringResult, tailor_concurrently
+from .rendering import CVRenderer, parse_formats
+from .routing import ModelRouter, ModelStatsStore, parse_candidates
+from .thinking import ThinkingUsage, thinking_control
+from .tokens import estimate_tokens
+from .watch import DEFAULT_DEBOUNCE, WatchSession, atomic_write
+
+# Exit codes for runs that did not fail but were stopped, following the
+# conventions of timeout(1) and shells for SIGINT.
+EXIT_TIMEOUT = 124
+EXIT_CANCELLED = 130
 
 
 def read_file_content(file_path: Path) -> str:
@@ -47,61 +75,793 @@ def validate_file_path(
     return file_path
 
 
-@click.command()
+def validate_file_paths(
+    ctx: click.Context, param: click.Parameter, value: tuple[str, ...]
+) -> tuple[Path, ...]:
+    """Validate that every file path exists and is a file."""
+    return tuple(
+        path
+        for path in (validate_file_path(ctx, param, item) for item in value)
+        if path is not None
+    )
+
+
+def parse_render_formats(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> list[str]:
+    """Parse the comma-separated output formats of --render."""
+    if value is None:
+        return []
+    try:
+        return parse_formats(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def _start_renderer(formats: list[str], output_dir: Path) -> Optional[CVRenderer]:
+    """Start the renderer for --render, stopping it when the command finishes."""
+    if not formats:
+        return None
+    try:
+        renderer = CVRenderer(formats, output_dir)
+    except ValueError as e:
+        click.echo(f"❌ Configuration Error: {e}", err=True)
+        sys.exit(1)
+    click.get_current_context().call_on_close(renderer.close)
+    return renderer
+
+
+def _report_renders(renderer: Optional[CVRenderer]) -> bool:
+    """Wait for queued renders and report them; return False if any failed."""
+    if renderer is None:
+        return True
+    success = True
+    for outcome in renderer.wait():
+        if outcome.error is not None:
+            success = False
+            click.echo(f"❌ Rendering {outcome.path} failed: {outcome.error}", err=True)
+        else:
+            click.echo(f"📄 {outcome.path}", err=True)
+    return success
+
+
+class DefaultCommandGroup(click.Group):
+    """Command group that runs ``tailor`` unless a subcommand is named.
+
+    Keeps ``commitcurry CV_FILE JOB_FILE...`` working next to subcommands
+    such as ``commitcurry watch``.
+    """
+
+    default_command = "tailor"
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        """Insert the default command unless a subcommand or help is given."""
+        if not args or (
+            args[0] not in self.commands and args[0] not in ctx.help_option_names
+        ):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultCommandGroup)
+def main() -> None:
+    """CommitCurry - AI-powered resume tailoring tool.
+
+    Run 'commitcurry CV_FILE JOB_FILE...' to tailor a CV once,
+    'commitcurry watch CV_FILE JOB_FILE' to re-tailor it on every change, or
+    'commitcurry rank CV_DIR JOB_FILE' to tailor the best matching CVs.
+    """
+
+
+@main.command()
 @click.argument("cv_file", callback=validate_file_path, type=str)
-@click.argument("job_file", callback=validate_file_path, type=str)
+@click.argument(
+    "job_files",
+    metavar="JOB_FILE...",
+    nargs=-1,
+    required=True,
+    type=str,
+    callback=validate_file_paths,
+)
 @click.option(
     "-m", "--model",
     default="gemini-2.5-flash",
-    help="AI model to use (e.g., 'gemini-2.5-flash', 'ollama:qwen3:8b')"
+    help=(
+        "AI model to use (e.g., 'gemini-2.5-flash', 'ollama:qwen3:8b'), or 'auto' "
+        "to pick the candidate most likely to meet --slo"
+    ),
+)
+@click.option(
+    "--candidates",
+    default=None,
+    help=(
+        "Comma-separated candidate models for '-m auto', in order of preference "
+        "(default: COMMITCURRY_AUTO_MODELS or the Gemini flash models)"
+    ),
+)
+@click.option(
+    "--slo",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Latency target in seconds used by '-m auto'",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Abort the run if it takes longer than this many seconds",
+)
+@click.option(
+    "--pack",
+    is_flag=True,
+    help="Tailor the CV for all job files in a single request per batch",
+)
+@click.option(
+    "--pack-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum number of job files per packed request (default: all)",
+)
+@click.option(
+    "--edits",
+    is_flag=True,
+    help=(
+        "Ask the model for section-level edits instead of the whole CV "
+        "(fewer generated tokens; falls back to full regeneration)"
+    ),
+)
+@click.option(
+    "--think/--no-think",
+    default=None,
+    help=(
+        "Enable or disable the thinking phase of reasoning models "
+        "(default: the model's own behaviour)"
+    ),
+)
+@click.option(
+    "--think-budget",
+    type=click.IntRange(min=1),
+    default=None,
+    help=(
+        "Maximum thinking tokens; Ollama models exceeding it are retried "
+        "with thinking disabled"
+    ),
+)
+@click.option(
+    "--render",
+    default=None,
+    callback=parse_render_formats,
+    help=(
+        "Also render each tailored CV to these comma-separated formats: "
+        "html, pdf (needs a local renderer such as wkhtmltopdf), docx"
+    ),
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=Path("."),
+    show_default=True,
+    help="Directory for the files written by --render",
+)
+@click.option(
+    "--guard",
+    is_flag=True,
+    help=(
+        "Stream the answer and stop runaway generations: cap the output at a "
+        "budget derived from the CV length and abort repetition loops"
+    ),
+)
+@click.option(
+    "--profile",
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+    help=(
+        "Profile client-side CPU time or memory and print a report to stderr; "
+        "time waiting on the model is reported separately"
+    ),
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="With '--profile cpu', write sampled stacks in collapsed (flamegraph) format",
 )
 @click.option(
     "-v", "--verbose", is_flag=True, help="Show progress messages and formatting"
 )
-def main(cv_file: Path, job_file: Path, model: str, verbose: bool) -> None:
-    """CommitCurry - AI-powered resume tailoring tool.
+def tailor(
+    cv_file: Path,
+    job_files: tuple[Path, ...],
+    model: str,
+    candidates: Optional[str],
+    slo: Optional[float],
+    timeout: Optional[float],
+    pack: bool,
+    pack_size: Optional[int],
+    edits: bool,
+    think: Optional[bool],
+    think_budget: Optional[int],
+    render: list[str],
+    output_dir: Path,
+    guard: bool,
+    profile: Optional[str],
+    profile_output: Optional[Path],
+    verbose: bool,
+) -> None:
+    """Tailor a CV for one or more job descriptions (default command).
 
     CV_FILE: Path to the CV/resume file
-    JOB_FILE: Path to the job description file
+    JOB_FILE: Path to one or more job description files
     """
+    if edits and pack:
+        raise click.UsageError("--edits cannot be combined with --pack")
+
+    profiler = _start_profiler(profile, profile_output) if profile else None
+
     # Configure logging early to capture all library logs
     setup_logging()
 
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    # Rendering runs in worker processes while the next CV is generated
+    renderer = _start_renderer(render, output_dir)
+
     # Read file contents
     cv_content = read_file_content(cv_file)
-    job_content = read_file_content(job_file)
+    job_contents = [read_file_content(job_file) for job_file in job_files]
+
+    # Split the jobs into requests: one per job, or packed batches
+    batch_size = (pack_size or len(job_contents)) if pack else 1
+    batches = [
+        job_contents[i : i + batch_size]
+        for i in range(0, len(job_contents), batch_size)
+    ]
+
+    stats_store = ModelStatsStore()
+    input_tokens = 0
+    start_time: Optional[float] = None
 
     try:
+        template = load_prompt_template(
+            EDITS_PROMPT_TEMPLATE if edits else DEFAULT_PROMPT_TEMPLATE
+        )
+        packed_template = (
+            load_prompt_template(PACKED_PROMPT_TEMPLATE) if batch_size > 1 else ""
+        )
+        # Measured like the prompt sizes recorded in the run statistics
+        input_tokens = max(
+            estimate_prompt_tokens(
+                packed_template, cv_content, format_job_postings(batch)
+            )
+            if len(batch) > 1
+            else estimate_prompt_tokens(template, cv_content, batch[0])
+            for batch in batches
+        )
+        model = _resolve_model(
+            model, candidates, slo, input_tokens, stats_store, verbose
+        )
+
+        thinking = thinking_control(model, think, think_budget)
+        if verbose and thinking is None and (think is not None or think_budget):
+            click.echo(f"💭 {model} has no thinking phase, ignoring think options")
+
+        # Check every prompt fits the model before any network call
+        plans = [
+            plan_packed_request(model, cv_content, batch, packed_template, stats_store)
+            if len(batch) > 1
+            else plan_request(model, cv_content, batch[0], template, stats_store)
+            for batch in batches
+        ]
+        if verbose:
+            for plan in plans:
+                click.echo(
+                    f"📏 ~{plan.prompt_tokens} prompt tokens, "
+                    f"{plan.context_window} token context window"
+                    + (f", num_ctx={plan.num_ctx}" if plan.num_ctx else "")
+                    + (", input compacted" if plan.compacted else "")
+                    + (
+                        f", predicted {plan.predicted_latency:.1f}s"
+                        if plan.predicted_latency is not None
+                        else ""
+                    )
+                )
+        num_ctx = max((plan.num_ctx or 0 for plan in plans), default=0)
+        agent_kwargs: dict = {"num_ctx": num_ctx} if num_ctx else {}
+        if timeout is not None:
+            agent_kwargs["timeout"] = timeout
+        if thinking is not None:
+            if think is False:
+                agent_kwargs["think"] = False
+            elif think_budget and thinking.support.native_budget:
+                agent_kwargs["think_budget"] = think_budget
+
         # Create AI agent instance
         if verbose:
             click.echo(f"🤖 Initializing {model} agent...")
-        agent = AgentFactory.create_agent(model)
+        agent = AgentFactory.create_agent(model, **agent_kwargs)
 
         # Initialize CV optimizer with the agent
         optimizer = create_cv_optimizer(agent)
+        optimizer.profiler = profiler
+        optimizer.thinking = thinking
+        if guard:
+            optimizer.guard = GuardSettings()
 
         # Optimize the CV
-        if verbose:
-            click.echo("✨ Optimizing CV for the job description...")
-        optimized_cv = optimizer.optimize_cv(cv_content, job_content)
+        optimized_cvs: list[str] = []
+        for plan in plans:
+            if verbose:
+                click.echo(
+                    f"✨ Optimizing CV for {len(plan.job_descriptions)} "
+                    "job descriptions in one request..."
+                    if len(plan.job_descriptions) > 1
+                    else "✨ Optimizing CV for the job description..."
+                )
+            start_time = time.perf_counter()
+            if len(plan.job_descriptions) > 1:
+                results = optimizer.optimize_cv_packed(
+                    plan.cv_content, plan.job_descriptions, deadline=deadline
+                )
+            elif edits:
+                results = [
+                    optimizer.optimize_cv_edits(
+                        plan.cv_content, plan.job_description, deadline=deadline
+                    )
+                ]
+            else:
+                results = [
+                    optimizer.optimize_cv(
+                        plan.cv_content, plan.job_description, deadline=deadline
+                    )
+                ]
+            usage = optimizer.thinking_usage if thinking is not None else None
+            if verbose and isinstance(usage, ThinkingUsage):
+                click.echo(
+                    f"🧠 ~{usage.thinking_tokens} thinking tokens, "
+                    f"~{usage.answer_tokens} answer tokens"
+                    + (
+                        " (retried without thinking)"
+                        if usage.retried_without_thinking
+                        else ""
+                    )
+                )
+            elif verbose and thinking is not None:
+                click.echo(f"🧠 Thinking token count unavailable for {model}")
+            _record_run(
+                stats_store,
+                model,
+                True,
+                plan.prompt_tokens,
+                sum(estimate_tokens(result) for result in results),
+                time.perf_counter() - start_time,
+            )
+            if renderer is not None:
+                for job_file, result in zip(job_files[len(optimized_cvs) :], results):
+                    renderer.submit(result, f"{cv_file.stem}-{job_file.stem}")
+            optimized_cvs.extend(results)
 
-        # Print the optimized CV
-        if verbose:
-            click.echo("\n" + "=" * 60)
-            click.echo("🎯 OPTIMIZED CV")
-            click.echo("=" * 60)
-        click.echo(optimized_cv)
+        # Print the optimized CVs
+        for job_file, optimized_cv in zip(job_files, optimized_cvs):
+            if verbose:
+                click.echo("\n" + "=" * 60)
+                click.echo("🎯 OPTIMIZED CV")
+                click.echo("=" * 60)
+            if len(job_files) > 1:
+                click.echo(f"==> {job_file} <==")
+            click.echo(optimized_cv)
+
+        if not _report_renders(renderer):
+            sys.exit(1)
 
+    except OptimizationTimeoutError:
+        _record_run(stats_store, model, False, input_tokens)
+        click.echo(f"❌ Timed out after {timeout:g}s", err=True)
+        sys.exit(EXIT_TIMEOUT)
+    except (OptimizationCancelledError, KeyboardInterrupt):
+        click.echo("❌ Cancelled", err=True)
+        sys.exit(EXIT_CANCELLED)
+    except ContextWindowExceededError as e:
+        click.echo(f"❌ Input too large: {e}", err=True)
+        sys.exit(1)
     except ValueError as e:
+        # Configuration mistakes (e.g. a misspelt model) are not model failures
+        if start_time is not None:
+            _record_run(stats_store, model, False, input_tokens)
         click.echo(f"❌ Configuration Error: {e}", err=True)
         sys.exit(1)
     except ConnectionError as e:
+        # e.g. the driver could not be created, so no request was sent
+        if start_time is not None:
+            _record_run(stats_store, model, False, input_tokens)
         click.echo(f"❌ Connection Error: {e}", err=True)
         sys.exit(1)
     except Exception as e:
+        if start_time is not None:
+            _record_run(stats_store, model, False, input_tokens)
         click.echo(f"❌ Optimization failed: {e}", err=True)
         sys.exit(1)
 
 
+@main.command()
+@click.argument("cv_file", callback=validate_file_path, type=str)
+@click.argument("job_file", callback=validate_file_path, type=str)
+@click.option(
+    "-o", "--output",
+    "output_file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="File to write the tailored CV to (default: CV_FILE.tailored.md)",
+)
+@click.option(
+    "-m", "--model",
+    default="gemini-2.5-flash",
+    help="AI model to use, or 'auto' (resolved once when watching starts)",
+)
+@click.option(
+    "--candidates",
+    default=None,
+    help="Comma-separated candidate models for '-m auto'",
+)
+@click.option(
+    "--slo",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Latency target in seconds used by '-m auto'",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Abort a run if it takes longer than this many seconds",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_DEBOUNCE,
+    show_default=True,
+    help="Seconds the files must stay unchanged before a run starts",
+)
+@click.option(
+    "--edits",
+    is_flag=True,
+    help="Ask the model for section-level edits instead of the whole CV",
+)
+@click.option("-v", "--verbose", is_flag=True, help="Show progress messages")
+def watch(
+    cv_file: Path,
+    job_file: Path,
+    output_file: Optional[Path],
+    model: str,
+    candidates: Optional[str],
+    slo: Optional[float],
+    timeout: Optional[float],
+    debounce: float,
+    edits: bool,
+    verbose: bool,
+) -> None:
+    """Re-tailor a CV whenever the CV or job file changes.
+
+    The agent stays loaded between runs. Each change (after DEBOUNCE seconds
+    of quiet) cancels the run in flight, and results are written atomically
+    to the output file. Stop with Ctrl-C.
+
+    CV_FILE: Path to the CV/resume file
+    JOB_FILE: Path to the job description file
+    """
+    setup_logging()
+
+    if output_file is None:
+        output_file = cv_file.with_name(f"{cv_file.stem}.tailored.md")
+    stats_store = ModelStatsStore()
+
+    try:
+        input_tokens = estimate_prompt_tokens(
+            load_prompt_template(
+                EDITS_PROMPT_TEMPLATE if edits else DEFAULT_PROMPT_TEMPLATE
+            ),
+            read_file_content(cv_file),
+            read_file_content(job_file),
+        )
+        model = _resolve_model(
+            model, candidates, slo, input_tokens, stats_store, verbose
+        )
+        agent_kwargs: dict = {"timeout": timeout} if timeout is not None else {}
+        if verbose:
+            click.echo(f"🤖 Initializing {model} agent...")
+        agent = AgentFactory.create_agent(model, **agent_kwargs)
+        session = WatchSession(
+            create_cv_optimizer(agent),
+            model,
+            cv_file,
+            job_file,
+            output_file,
+            edits=edits,
+            timeout=timeout,
+            debounce=debounce,
+            stats_store=stats_store,
+            notify=lambda message: click.echo(message, err=True),
+        )
+        session.run()
+    except KeyboardInterrupt:
+        click.echo("👋 Stopped watching", err=True)
+    except ValueError as e:
+        click.echo(f"❌ Configuration Error: {e}", err=True)
+        sys.exit(1)
+    except ConnectionError as e:
+        click.echo(f"❌ Connection Error: {e}", err=True)
+        sys.exit(1)
+
+
+@main.command()
+@click.argument(
+    "cv_dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+)
+@click.argument("job_file", callback=validate_file_path, type=str)
+@click.option(
+    "-k", "--top",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Number of best matching CVs to tailor",
+)
+@click.option(
+    "-o", "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory to write the tailored CVs to (default: CV_DIR/tailored)",
+)
+@click.option(
+    "-m", "--model",
+    default="gemini-2.5-flash",
+    help="AI model to use, or 'auto' (resolved once for all CVs)",
+)
+@click.option(
+    "--candidates",
+    default=None,
+    help="Comma-separated candidate models for '-m auto'",
+)
+@click.option(
+    "--slo",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Latency target in seconds used by '-m auto'",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Abort tailoring if it takes longer than this many seconds in total",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of CVs tailored concurrently",
+)
+@click.option(
+    "--edits",
+    is_flag=True,
+    help="Ask the model for section-level edits instead of whole CVs",
+)
+@click.option(
+    "--render",
+    default=None,
+    callback=parse_render_formats,
+    help="Also render the tailored CVs to these formats: html, pdf, docx",
+)
+@click.option(
+    "--rank-only",
+    is_flag=True,
+    help="Only print the ranking, without tailoring any CV",
+)
+@click.option("-v", "--verbose", is_flag=True, help="Show progress messages")
+def rank(
+    cv_dir: Path,
+    job_file: Path,
+    top: int,
+    output_dir: Optional[Path],
+    model: str,
+    candidates: Optional[str],
+    slo: Optional[float],
+    timeout: Optional[float],
+    workers: int,
+    edits: bool,
+    render: list[str],
+    rank_only: bool,
+    verbose: bool,
+) -> None:
+    """Rank the CVs in a directory against a job and tailor the best ones.
+
+    CVs (.md, .markdown, .txt files directly in CV_DIR) are ranked with a
+    local BM25 index kept in CV_DIR, which is updated incrementally. Only
+    the top CVs are sent to the model, several at a time.
+
+    CV_DIR: Directory holding the applicants' CVs
+    JOB_FILE: Path to the job description file
+    """
+    setup_logging()
+
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    job_description = read_file_content(job_file)
+
+    index = CVIndex(cv_dir)
+    update = index.update()
+    if verbose:
+        click.echo(
+            f"🗂️  Indexed {len(index.entries)} CVs ({update.added} added, "
+            f"{update.updated} updated, {update.removed} removed)"
+        )
+    ranked = index.rank(job_description, top)
+    if not ranked:
+        click.echo("❌ No CV matches the job description", err=True)
+        sys.exit(1)
+    for position, cv in enumerate(ranked, 1):
+        click.echo(
+            f"{position:>3}. {cv.score:7.2f}  {cv.path.name}"
+            + (f"  ({', '.join(cv.matched_terms)})" if cv.matched_terms else "")
+        )
+    if rank_only:
+        return
+
+    if output_dir is None:
+        output_dir = cv_dir / "tailored"
+    renderer = _start_renderer(render, output_dir)
+    stats_store = ModelStatsStore()
+    cv_contents = [
+        cv.path.read_text(encoding="utf-8", errors="replace") for cv in ranked
+    ]
+
+    try:
+        template = load_prompt_template(
+            EDITS_PROMPT_TEMPLATE if edits else DEFAULT_PROMPT_TEMPLATE
+        )
+        input_tokens = max(
+            estimate_prompt_tokens(template, content, job_description)
+            for content in cv_contents
+        )
+        model = _resolve_model(
+            model, candidates, slo, input_tokens, stats_store, verbose
+        )
+
+        # Check every prompt fits the model before any network call
+        jobs = []
+        for position, (cv, content) in enumerate(zip(ranked, cv_contents), 1):
+            try:
+                plan = plan_request(
+                    model, content, job_description, template, stats_store
+                )
+            except ContextWindowExceededError as e:
+                click.echo(f"⚠️  Skipping {cv.path.name}: {e}", err=True)
+                continue
+            jobs.append((position, cv, plan))
+        if not jobs:
+            click.echo("❌ None of the top CVs fits the model", err=True)
+            sys.exit(1)
+
+        num_ctx = max((plan.num_ctx or 0 for _, _, plan in jobs), default=0)
+        agent_kwargs: dict = {"num_ctx": num_ctx} if num_ctx else {}
+        if timeout is not None:
+            agent_kwargs["timeout"] = timeout
+        if verbose:
+            click.echo(
+                f"🤖 Tailoring {len(jobs)} CVs with {model}, "
+                f"{min(workers, len(jobs))} at a time..."
+            )
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        failures = 0
+        timed_out = False
+
+        # Each CV is written, recorded and rendered as soon as it is tailored,
+        # so a cancelled run keeps the CVs that were already finished
+        def save(index: int, result: TailoringResult) -> None:
+            nonlocal failures, timed_out
+            position, cv, plan = jobs[index]
+            if result.content is None:
+                failures += 1
+                timed_out = timed_out or result.timed_out
+                _record_run(stats_store, model, False, plan.prompt_tokens)
+                click.echo(f"❌ {cv.path.name}: {result.error}", err=True)
+                return
+            _record_run(
+                stats_store,
+                model,
+                True,
+                plan.prompt_tokens,
+                estimate_tokens(result.content),
+                result.latency,
+            )
+            output_file = output_dir / f"{position:02d}-{cv.path.stem}.tailored.md"
+            atomic_write(output_file, result.content + "\n")
+            click.echo(f"📝 {output_file}")
+            if renderer is not None:
+                renderer.submit(result.content, output_file.stem)
+
+        tailor_concurrently(
+            [plan for _, _, plan in jobs],
+            lambda: create_cv_optimizer(
+                AgentFactory.create_agent(model, **agent_kwargs)
+            ),
+            workers,
+            deadline=deadline,
+            edits=edits,
+            on_result=save,
+        )
+        if not _report_renders(renderer):
+            failures += 1
+    except KeyboardInterrupt:
+        click.echo("❌ Cancelled", err=True)
+        sys.exit(EXIT_CANCELLED)
+    except ValueError as e:
+        click.echo(f"❌ Configuration Error: {e}", err=True)
+        sys.exit(1)
+    except ConnectionError as e:
+        click.echo(f"❌ Connection Error: {e}", err=True)
+        sys.exit(1)
+
+    if timed_out:
+        click.echo(f"❌ Timed out after {timeout:g}s", err=True)
+        sys.exit(EXIT_TIMEOUT)
+    if failures:
+        sys.exit(1)
+
+
+def _start_profiler(mode: str, output: Optional[Path]) -> RunProfiler:
+    """Start profiling and report when the command finishes, even on errors."""
+    profiler = RunProfiler(mode)
+
+    def finish() -> None:
+        profiler.stop()
+        click.echo(profiler.report(), err=True)
+        if output is not None and mode == "cpu":
+            profiler.write_collapsed_stacks(output)
+            click.echo(f"🔥 Collapsed stacks written to {output}", err=True)
+
+    click.get_current_context().call_on_close(finish)
+    profiler.start()
+    return profiler
+
+
+def _resolve_model(
+    model: str,
+    candidates: Optional[str],
+    slo: Optional[float],
+    input_tokens: int,
+    stats_store: ModelStatsStore,
+    verbose: bool,
+) -> str:
+    """Return the model to use, routing '-m auto' to the best candidate."""
+    if model != "auto":
+        return model
+    router = ModelRouter(parse_candidates(candidates), stats_store)
+    decision = router.select(input_tokens, slo)
+    if verbose:
+        predicted = (
+            f", predicted {decision.predicted_latency:.1f}s"
+            if decision.predicted_latency is not None
+            else ""
+        )
+        click.echo(
+            f"🧭 Auto-selected {decision.model_name} ({decision.reason}{predicted})"
+        )
+    return decision.model_name
+
+
+def _record_run(
+    stats_store: ModelStatsStore,
+    model: str,
+    success: bool,
+    input_tokens: int,
+    output_tokens: int = 0,
+    latency: float = 0.0,
+) -> None:
+    """Record run statistics for model routing without failing the run."""
+    try:
+        stats_store.record(model, success, input_tokens, output_tokens, latency)
+    except OSError:
+        pass
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,132 @@
+"""Packing several job descriptions into a single CV optimization request."""
+
+import json
+import re
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from griptape.drivers.prompt.google import GooglePromptDriver  # type: ignore
+from griptape.drivers.prompt.ollama import OllamaPromptDriver  # type: ignore
+
+PACKED_PROMPT_TEMPLATE = "cv_packed_optimization_prompt.txt"
+
+PACKED_OUTPUT_SCHEMA: dict = {
+    "type": "object",
+    "properties": {
+        "cvs": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "job": {"type": "integer", "minimum": 1},
+                    "cv": {"type": "string", "minLength": 1},
+                },
+                "required": ["job", "cv"],
+            },
+        },
+    },
+    "required": ["cvs"],
+}
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+
+def format_job_postings(job_descriptions: Sequence[str]) -> str:
+    """Number job descriptions for the packed prompt."""
+    return "\n\n".join(
+        f"---\nJob Posting {number}:\n{job.strip()}"
+        for number, job in enumerate(job_descriptions, start=1)
+    )
+
+
+def format_packed_prompt(
+    template: str, cv_content: str, job_descriptions: Sequence[str]
+) -> str:
+    """Fill the packed prompt template for one CV and several jobs."""
+    return template.format(
+        job_count=len(job_descriptions),
+        output_schema=json.dumps(PACKED_OUTPUT_SCHEMA, indent=2),
+        cv_content=cv_content.strip(),
+        job_postings=format_job_postings(job_descriptions),
+    )
+
+
+@contextmanager
+def structured_output(prompt_driver: Any, schema: dict) -> Iterator[None]:
+    """Temporarily make a driver enforce a JSON schema on its answers.
+
+    Ollama takes the schema as ``format``; Gemini answers JSON with the
+    schema as ``response_json_schema``. Other drivers are left unchanged,
+    so only the schema in the prompt and the lenient parser apply. The
+    previous ``extra_params`` are restored on exit.
+
+    Args:
+        prompt_driver: A Griptape prompt driver instance, or None
+        schema: The JSON schema the answer must match
+    """
+    if isinstance(prompt_driver, OllamaPromptDriver):
+        overrides: dict[str, Any] = {"format": schema}
+    elif isinstance(prompt_driver, GooglePromptDriver):
+        overrides = {
+            "response_mime_type": "application/json",
+            "response_json_schema": schema,
+        }
+    else:
+        yield
+        return
+
+    previous = dict(prompt_driver.extra_params)
+    prompt_driver.extra_params.update(overrides)
+    try:
+        yield
+    finally:
+        prompt_driver.extra_params.clear()
+        prompt_driver.extra_params.update(previous)
+
+
+def load_json_object(text: str) -> Any:
+    """Parse a JSON object, tolerating code fences and surrounding prose."""
+    text = text.strip()
+    fenced = _CODE_FENCE.match(text)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        return json.loads(text)
+    except ValueError:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        try:
+            return json.loads(text[start : end + 1])
+        except ValueError:
+            return None
+
+
+def parse_packed_output(text: str, job_count: int) -> list[Optional[str]]:
+    """Validate a packed response and extract one CV per job.
+
+    Args:
+        text: Raw model output, expected to match ``PACKED_OUTPUT_SCHEMA``
+        job_count: Number of job postings in the request
+
+    Returns:
+        A list with one entry per job in request order: the tailored CV, or
+        None if the response has no valid entry for that job
+    """
+    results: list[Optional[str]] = [None] * job_count
+    data = load_json_object(text)
+    if not isinstance(data, dict) or not isinstance(data.get("cvs"), list):
+        return results
+
+    for entry in data["cvs"]:
+        if not isinstance(entry, dict):
+            continue
+        job, cv = entry.get("job"), entry.get("cv")
+        if isinstance(job, bool) or not isinstance(job, int):
+            continue
+        if not 1 <= job <= job_count or not isinstance(cv, str) or not cv.strip():
+            continue
+        if results[job - 1] is None:
+            results[job - 1] = cv.strip()
+    return results
@@ -0,0 +1,222 @@
+"""Pre-flight prompt sizing checks run before any request is sent."""
+
+import re
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .packing import format_job_postings
+from .providers.factory import AgentFactory
+from .routing import ModelStatsStore
+from .tokens import estimate_tokens
+
+# The tailored CV is usually about as long as the original; reserve a bit more
+# plus a fixed margin so the completion is not cut off by the context limit.
+OUTPUT_TOKEN_RATIO = 1.25
+OUTPUT_TOKEN_MARGIN = 256
+
+# Requested Ollama context sizes are rounded up to this many tokens.
+NUM_CTX_GRANULARITY = 1024
+
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_HORIZONTAL_RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_INNER_WHITESPACE = re.compile(r"(?<=\S)[ \t]{2,}")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+class ContextWindowExceededError(ValueError):
+    """Raised when a prompt cannot fit in the model's context window."""
+
+
+@dataclass
+class PreflightPlan:
+    """Outcome of the pre-flight check for a single request."""
+
+    model_name: str
+    cv_content: str
+    job_description: str
+    prompt_tokens: int
+    output_tokens: int
+    context_window: int
+    num_ctx: Optional[int] = None
+    compacted: bool = False
+    predicted_latency: Optional[float] = None
+    job_descriptions: list[str] = field(default_factory=list)
+
+    @property
+    def required_tokens(self) -> int:
+        """Prompt tokens plus the tokens reserved for the completion."""
+        return self.prompt_tokens + self.output_tokens
+
+
+def compact_text(text: str) -> str:
+    """Remove formatting that costs tokens without carrying content.
+
+    Drops HTML comments and horizontal rules, collapses runs of spaces inside
+    lines, strips trailing whitespace and squeezes consecutive blank lines.
+    Leading indentation is kept because it encodes nested bullet points.
+    """
+    text = _HTML_COMMENT.sub("", text)
+    lines = []
+    for line in text.splitlines():
+        if _HORIZONTAL_RULE.match(line):
+            continue
+        lines.append(_INNER_WHITESPACE.sub(" ", line).rstrip())
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def estimate_prompt_tokens(template: str, cv_content: str, job_description: str) -> int:
+    """Estimate the tokens of a prompt built from a template.
+
+    This is the input size recorded in the run statistics, so latency
+    predictions for model routing should use it too.
+
+    Args:
+        template: Prompt template with {cv_content} (or {cv_sections}) and
+            {job_description} (or {job_postings}); other placeholders are
+            left empty
+        cv_content: The CV content
+        job_description: The job description, or formatted job postings
+    """
+    prompt = template.format_map(
+        defaultdict(
+            str,
+            cv_content=cv_content.strip(),
+            cv_sections=cv_content.strip(),
+            job_description=job_description.strip(),
+            job_postings=job_description.strip(),
+        )
+    )
+    return estimate_tokens(prompt)
+
+
+def _estimate(
+    template: str, cv_content: str, job_description: str, output_count: int
+) -> tuple[int, int]:
+    """Estimate prompt and reserved output tokens for a request."""
+    output_tokens = output_count * (
+        int(estimate_tokens(cv_content) * OUTPUT_TOKEN_RATIO) + OUTPUT_TOKEN_MARGIN
+    )
+    return (
+        estimate_prompt_tokens(template, cv_content, job_description),
+        output_tokens,
+    )
+
+
+def plan_request(
+    model_name: str,
+    cv_content: str,
+    job_description: str,
+    template: str,
+    stats_store: Optional[ModelStatsStore] = None,
+    output_count: int = 1,
+) -> PreflightPlan:
+    """Check that a request fits the model and decide how to send it.
+
+    If the prompt plus the reserved completion does not fit the model's
+    maximum context window, the inputs are compacted; if they still do not
+    fit, the request fails before any network call. For Ollama models whose
+    server default context is too small, an adequate ``num_ctx`` is chosen.
+
+    Args:
+        model_name: The model identifier (e.g., 'ollama:qwen3:8b')
+        cv_content: The original CV content
+        job_description: The job description
+        template: Prompt template with {cv_content} (or {cv_sections}) and
+            {job_description}; other placeholders are left empty when
+            estimating
+        stats_store: Optional run statistics used to predict latency
+        output_count: Number of tailored CVs the request produces
+
+    Returns:
+        The pre-flight plan, with possibly compacted inputs
+
+    Raises:
+        ValueError: If model format is not supported
+        ContextWindowExceededError: If the request cannot fit the model
+    """
+    context_window = AgentFactory.get_context_window(model_name)
+    prompt_tokens, output_tokens = _estimate(
+        template, cv_content, job_description, output_count
+    )
+    compacted = False
+
+    if prompt_tokens + output_tokens > context_window:
+        cv_content = compact_text(cv_content)
+        job_description = compact_text(job_description)
+        prompt_tokens, output_tokens = _estimate(
+            template, cv_content, job_description, output_count
+        )
+        compacted = True
+        if prompt_tokens + output_tokens > context_window:
+            raise ContextWindowExceededError(
+                f"Prompt needs about {prompt_tokens + output_tokens} tokens "
+                f"({prompt_tokens} prompt + {output_tokens} reserved for the "
+                f"tailored CV) but '{model_name}' supports at most "
+                f"{context_window}. Shorten the CV or job description, or use "
+                "a model with a larger context window."
+            )
+
+    plan = PreflightPlan(
+        model_name=model_name,
+        cv_content=cv_content,
+        job_description=job_description,
+        prompt_tokens=prompt_tokens,
+        output_tokens=output_tokens,
+        context_window=context_window,
+        compacted=compacted,
+        job_descriptions=[job_description],
+    )
+
+    if plan.required_tokens > AgentFactory.get_default_context_window(model_name):
+        rounded = -(-plan.required_tokens // NUM_CTX_GRANULARITY) * NUM_CTX_GRANULARITY
+        plan.num_ctx = min(rounded, context_window)
+
+    if stats_store is not None:
+        plan.predicted_latency = stats_store.get(model_name).predict_latency(
+            prompt_tokens
+        )
+
+    return plan
+
+
+def plan_packed_request(
+    model_name: str,
+    cv_content: str,
+    job_descriptions: Sequence[str],
+    template: str,
+    stats_store: Optional[ModelStatsStore] = None,
+) -> PreflightPlan:
+    """Run the pre-flight check for a packed multi-job request.
+
+    Works like ``plan_request`` for a prompt holding all job descriptions
+    and reserving output for one tailored CV per job. When compaction is
+    needed, each job description is compacted individually.
+
+    Args:
+        model_name: The model identifier
+        cv_content: The original CV content
+        job_descriptions: The job descriptions packed into the request
+        template: Packed prompt template
+        stats_store: Optional run statistics used to predict latency
+
+    Returns:
+        The pre-flight plan; ``job_descriptions`` holds the jobs to send
+
+    Raises:
+        ValueError: If model format is not supported
+        ContextWindowExceededError: If the request cannot fit the model
+    """
+    plan = plan_request(
+        model_name,
+        cv_content,
+        format_job_postings(job_descriptions),
+        template,
+        stats_store,
+        output_count=len(job_descriptions),
+    )
+    plan.job_descriptions = [
+        compact_text(job) if plan.compacted else job for job in job_descriptions
+    ]
+    return plan
@@ -0,0 +1,284 @@
+"""Client-side CPU and memory profiling of CommitCurry runs."""
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+from griptape.events import (  # type: ignore
+    EventBus,
+    EventListener,
+    FinishPromptEvent,
+    StartPromptEvent,
+)
+
+from . import IMPORT_STARTED
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore
+
+PROFILE_MODES = ("cpu", "mem")
+
+# Seconds between stack samples for the collapsed-stack output.
+SAMPLE_INTERVAL = 0.005
+
+# Number of entries shown in the function and allocation reports.
+REPORT_LIMIT = 25
+
+# Frames kept per allocation traceback by tracemalloc.
+TRACEMALLOC_FRAMES = 10
+
+# Root frames labelling samples taken while a thread waits on the model.
+MODEL_WAIT_FRAME = "[model wait]"
+CLIENT_FRAME = "[client]"
+
+
+class RunProfiler:
+    """Profile the client side of a run, attributing model wait separately.
+
+    In ``cpu`` mode every participating thread runs under cProfile and a
+    sampler records stacks for a flamegraph-compatible collapsed-stack file.
+    In ``mem`` mode tracemalloc records allocations. In both modes the time
+    the prompt driver spends on model calls is measured through Griptape's
+    prompt events, so it can be told apart from client-side overhead.
+
+    Threads other than the one calling ``start()`` take part through
+    ``profile_thread()``; ``CVOptimizer`` does this for its agent thread.
+    """
+
+    def __init__(self, mode: str, sample_interval: float = SAMPLE_INTERVAL):
+        """Initialize the profiler.
+
+        Args:
+            mode: 'cpu' or 'mem'
+            sample_interval: Seconds between stack samples in 'cpu' mode
+
+        Raises:
+            ValueError: If the mode is not supported
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(
+                f"Unsupported profile mode '{mode}'. "
+                f"Use one of: {', '.join(PROFILE_MODES)}"
+            )
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.model_wait = 0.0
+        self.model_calls = 0
+        self.samples: Counter = Counter()
+        self._lock = threading.Lock()
+        self._profiles: list[cProfile.Profile] = []
+        self._main_profile: Optional[cProfile.Profile] = None
+        self._thread_ids: set[int] = set()
+        self._waiting_since: dict[int, float] = {}
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampling = threading.Event()
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._peak_traced = 0
+        self._listener = EventListener(
+            self._on_prompt_event, event_types=[StartPromptEvent, FinishPromptEvent]
+        )
+
+    @property
+    def wall_time(self) -> float:
+        """Seconds between ``start()`` and ``stop()`` (or now)."""
+        if self.started_at is None:
+            return 0.0
+        end = self.stopped_at if self.stopped_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def start(self) -> None:
+        """Start profiling the calling thread."""
+        self.started_at = time.perf_counter()
+        EventBus.add_event_listener(self._listener)
+        self._thread_ids.add(threading.get_ident())
+        if self.mode == "cpu":
+            self._main_profile = self._new_profile()
+            self._main_profile.enable()
+            self._sampler = threading.Thread(
+                target=self._sample, name="commitcurry-profiler", daemon=True
+            )
+            self._sampler.start()
+        else:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    def stop(self) -> None:
+        """Stop profiling and keep the collected data for the report."""
+        if self.started_at is None or self.stopped_at is not None:
+            return
+        if self._main_profile is not None:
+            self._main_profile.disable()
+        if self._sampler is not None:
+            self._stop_sampling.set()
+            self._sampler.join()
+        if self.mode == "mem":
+            self._snapshot = tracemalloc.take_snapshot()
+            self._peak_traced = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        EventBus.remove_event_listener(self._listener)
+        with self._lock:
+            for thread_id in list(self._waiting_since):
+                self._finish_wait(thread_id)
+        self.stopped_at = time.perf_counter()
+
+    @contextmanager
+    def profile_thread(self) -> Iterator[None]:
+        """Include the calling (worker) thread in the profile."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._thread_ids.add(thread_id)
+        # Griptape keeps event listeners in a context variable, which new
+        # threads do not inherit
+        listening = self._listener in EventBus.event_listeners
+        if not listening:
+            EventBus.add_event_listener(self._listener)
+        profile = self._new_profile() if self.mode == "cpu" else None
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler, covering all threads
+                profile = None
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            if not listening:
+                EventBus.remove_event_listener(self._listener)
+            with self._lock:
+                self._thread_ids.discard(thread_id)
+                # A failed model call publishes no finish event
+                self._finish_wait(thread_id)
+
+    def report(self) -> str:
+        """Return a human readable profiling report."""
+        out = io.StringIO()
+        wall = self.wall_time
+        out.write(f"Profile ({self.mode})\n")
+        out.write(
+            f"  imports before start:  {self.started_at - IMPORT_STARTED:8.3f}s\n"
+            if self.started_at is not None
+            else ""
+        )
+        out.write(f"  wall time:             {wall:8.3f}s\n")
+        out.write(
+            f"  waiting on model:      {self.model_wait:8.3f}s "
+            f"({self.model_calls} model calls)\n"
+        )
+        out.write(
+            f"  client-side:           {max(wall - self.model_wait, 0.0):8.3f}s\n"
+        )
+
+        if self.mode == "cpu":
+            self._write_cpu_report(out)
+        else:
+            self._write_memory_report(out)
+        return out.getvalue()
+
+    def write_collapsed_stacks(self, path: Path) -> None:
+        """Write sampled stacks in the collapsed format used by flamegraph.pl.
+
+        Each line holds semicolon-separated frames from the root and a sample
+        count. Stacks start with ``[model wait]`` when the thread was inside
+        a model call and ``[client]`` otherwise.
+        """
+        lines = [f"{stack} {count}" for stack, count in sorted(self.samples.items())]
+        path.write_text("\n".join(lines) + "\n" if lines else "", encoding="utf-8")
+
+    def _new_profile(self) -> cProfile.Profile:
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def _on_prompt_event(self, event: Any) -> None:
+        """Track model call intervals per thread from prompt events."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            if isinstance(event, StartPromptEvent):
+                # An abandoned call (e.g. a retry) publishes no finish event
+                self._finish_wait(thread_id)
+                self._waiting_since[thread_id] = time.perf_counter()
+                self.model_calls += 1
+            else:
+                self._finish_wait(thread_id)
+
+    def _finish_wait(self, thread_id: int) -> None:
+        """Close a thread's model call interval; call with the lock held."""
+        since = self._waiting_since.pop(thread_id, None)
+        if since is not None:
+            self.model_wait += time.perf_counter() - since
+
+    def _sample(self) -> None:
+        """Record the stacks of the profiled threads until stopped."""
+        while not self._stop_sampling.wait(self.sample_interval):
+            frames = sys._current_frames()
+            with self._lock:
+                thread_ids = [tid for tid in self._thread_ids if tid in frames]
+                waiting = set(self._waiting_since)
+            for thread_id in thread_ids:
+                stack = _collapse(frames[thread_id])
+                root = MODEL_WAIT_FRAME if thread_id in waiting else CLIENT_FRAME
+                self.samples[f"{root};{stack}"] += 1
+
+    def _write_cpu_report(self, out: io.StringIO) -> None:
+        with self._lock:
+            profiles = [p for p in self._profiles if p.getstats()]
+        if not profiles:
+            return
+        stats = pstats.Stats(profiles[0], stream=out)
+        for profile in profiles[1:]:
+            stats.add(profile)
+        out.write(
+            "\nTop functions by cumulative time across threads "
+            "(includes blocking waits):\n"
+        )
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LIMIT)
+        out.write("Top functions by own time:\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(REPORT_LIMIT)
+
+    def _write_memory_report(self, out: io.StringIO) -> None:
+        out.write(f"  peak traced memory:    {self._peak_traced / 1024**2:8.1f} MiB\n")
+        peak_rss = _peak_rss()
+        if peak_rss is not None:
+            out.write(f"  peak RSS:              {peak_rss / 1024**2:8.1f} MiB\n")
+        if self._snapshot is None:
+            return
+        snapshot = self._snapshot.filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        out.write("\nTop allocations by line:\n")
+        for stat in snapshot.statistics("lineno")[:REPORT_LIMIT]:
+            out.write(f"  {stat}\n")
+
+
+def _collapse(frame: Any) -> str:
+    """Render a frame's stack root first as ``file:function`` entries."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{Path(code.co_filename).name}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _peak_rss() -> Optional[int]:
+    """Return the process's peak resident set size in bytes, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
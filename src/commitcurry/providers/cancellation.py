@@ -0,0 +1,107 @@
+"""Helpers for aborting in-flight prompt driver requests."""
+
+import logging
+import socket
+import weakref
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# Factories for SDK clients configured beyond the driver's defaults (e.g. with
+# a request timeout), keyed by driver id so a reset rebuilds the same client.
+_client_factories: dict[int, Callable[[], Any]] = {}
+
+
+def set_client_factory(prompt_driver: Any, factory: Callable[[], Any]) -> None:
+    """Install an SDK client on a prompt driver and remember how to rebuild it.
+
+    Args:
+        prompt_driver: A Griptape prompt driver with a ``client`` attribute
+        factory: Callable returning a new, configured SDK client
+    """
+    key = id(prompt_driver)
+    _client_factories[key] = factory
+    weakref.finalize(prompt_driver, _client_factories.pop, key, None)
+    prompt_driver.client = factory()
+
+
+def _httpx_clients(sdk_client: Any) -> list:
+    """Return the httpx clients used by a provider SDK client."""
+    candidates = [
+        # ollama.Client keeps its httpx.Client in `_client`
+        getattr(sdk_client, "_client", None),
+        # google.genai.Client keeps it on the underlying API client
+        getattr(getattr(sdk_client, "_api_client", None), "_httpx_client", None),
+    ]
+    return [client for client in candidates if hasattr(client, "_transport")]
+
+
+def _shutdown_sockets(http_client: Any) -> None:
+    """Shut down the sockets of all pooled connections of an httpx client.
+
+    Closing an httpx client does not interrupt a request blocked on another
+    thread; shutting the socket down does, and it also tells the server that
+    the client went away so it can stop generating.
+    """
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    for connection in list(getattr(pool, "connections", [])):
+        connection = getattr(connection, "_connection", None)
+        stream = getattr(connection, "_network_stream", None)
+        if stream is None:
+            continue
+        sock = stream.get_extra_info("socket")
+        if sock is None:
+            continue
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def abort_prompt_driver(prompt_driver: Any) -> None:
+    """Abort any request the prompt driver currently has in flight.
+
+    Drivers that implement their own ``cancel()`` are asked to cancel;
+    otherwise the connections of the driver's SDK client are torn down. The
+    closed client cannot be reused, so call ``reset_prompt_driver`` once the
+    aborted request has finished. This is best effort: providers without an
+    httpx based client are left alone.
+
+    Args:
+        prompt_driver: A Griptape prompt driver instance
+    """
+    cancel = getattr(prompt_driver, "cancel", None)
+    if callable(cancel):
+        cancel()
+        return
+
+    # Read the cached client directly; the public lazy property would
+    # construct a new client if none exists yet.
+    sdk_client = getattr(prompt_driver, "_client", None)
+    if sdk_client is None:
+        return
+
+    for http_client in _httpx_clients(sdk_client):
+        try:
+            _shutdown_sockets(http_client)
+            http_client.close()
+        except Exception as e:  # pragma: no cover - best effort cleanup
+            logger.debug("Failed to abort HTTP client: %s", e)
+
+
+def reset_prompt_driver(prompt_driver: Any) -> None:
+    """Drop a prompt driver's SDK client after an abort.
+
+    Clients installed with ``set_client_factory`` are rebuilt; other drivers
+    create a default client lazily on the next request. Drivers with a
+    ``reset()`` method are asked to reset instead.
+
+    Args:
+        prompt_driver: A Griptape prompt driver instance
+    """
+    reset = getattr(prompt_driver, "reset", None)
+    if callable(reset):
+        reset()
+    elif hasattr(prompt_driver, "_client"):
+        factory = _client_factories.get(id(prompt_driver))
+        prompt_driver._client = factory() if factory else None
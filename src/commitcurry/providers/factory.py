@@ -7,6 +7,34 @@ from griptape.drivers.prompt.google import GooglePromptDriver  # type: ignore
 from griptape.drivers.prompt.ollama import OllamaPromptDriver  # type: ignore
 from griptape.structures import Agent  # type: ignore
 
+from .cancellation import set_client_factory
+from .gemini_thinking import track_thinking_tokens
+from .ollama_pool import OllamaHostPool, PooledOllamaPromptDriver, parse_hosts
+
+# Context window applied by the Ollama server unless num_ctx is set explicitly.
+OLLAMA_DEFAULT_CONTEXT_WINDOW = 2048
+
+# Maximum context windows (in tokens) by model family. Keys are matched as
+# prefixes of the model name without the provider prefix, longest first.
+MODEL_CONTEXT_WINDOWS = {
+    "gemini-1.5-pro": 2_097_152,
+    "gemini": 1_048_576,
+    "qwen3": 40_960,
+    "qwen2.5": 32_768,
+    "deepseek-r1": 131_072,
+    "llama3.3": 131_072,
+    "llama3.2": 131_072,
+    "llama3.1": 131_072,
+    "llama3": 8_192,
+    "mistral": 32_768,
+    "phi4": 16_384,
+    "gemma2": 8_192,
+    "gemma3": 131_072,
+}
+
+# Used for Ollama models missing from MODEL_CONTEXT_WINDOWS.
+UNKNOWN_MODEL_CONTEXT_WINDOW = 8_192
+
 
 class AgentFactory:
     """Factory for creating AI agent instances with prompt drivers."""
@@ -20,6 +48,12 @@ class AgentFactory:
                 - 'gemini-*' for Gemini models (e.g., 'gemini-2.5-flash')
                 - 'ollama:*' for Ollama models (e.g., 'ollama:qwen3:8b')
             **kwargs: Additional arguments passed to prompt driver configuration
+                (e.g., 'api_key', 'base_url', 'num_ctx' for Ollama models,
+                'timeout' in seconds for the underlying HTTP requests). For
+                Ollama, 'base_url' may list several comma-separated hosts.
+                'think=False' disables thinking on models that support it;
+                'think_budget' caps thinking tokens where the provider
+                enforces a budget (Gemini 2.5).
 
         Returns:
             Agent instance configured with the appropriate prompt driver
@@ -29,7 +63,9 @@ class AgentFactory:
             ConnectionError: If connection to the service fails
         """
         prompt_driver = cls._create_prompt_driver(model_name, **kwargs)
-        return Agent(prompt_driver=prompt_driver)
+        # Every optimization is a self-contained prompt; conversation memory
+        # would resend earlier CVs with each later request on the same agent.
+        return Agent(prompt_driver=prompt_driver, conversation_memory=None)
 
     @classmethod
     def _create_prompt_driver(cls, model_name: str, **kwargs: Any) -> Any:
@@ -56,7 +92,26 @@ class AgentFactory:
                 )
 
             try:
-                return GooglePromptDriver(model=model_name, api_key=api_key)
+                driver = GooglePromptDriver(model=model_name, api_key=api_key)
+                if kwargs.get("think") is False:
+                    driver.extra_params["thinking_config"] = {"thinking_budget": 0}
+                elif kwargs.get("think_budget"):
+                    driver.extra_params["thinking_config"] = {
+                        "thinking_budget": kwargs["think_budget"]
+                    }
+                from google import genai  # type: ignore
+                from google.genai import types  # type: ignore
+
+                timeout = kwargs.get("timeout")
+                http_options = (
+                    types.HttpOptions(timeout=int(timeout * 1000)) if timeout else None
+                )
+                # The client also counts the thinking tokens of each response
+                track_thinking_tokens(
+                    driver,
+                    lambda: genai.Client(api_key=api_key, http_options=http_options),
+                )
+                return driver
             except Exception as e:
                 raise Exception(
                     f"Failed to create Gemini prompt driver for model "
@@ -68,20 +123,39 @@ class AgentFactory:
             # Extract actual model name after "ollama:" prefix
             actual_model_name = model_name[7:]  # Remove "ollama:" prefix
             if not actual_model_name:
-                raise ValueError(
-                    f"Invalid Ollama model format: '{model_name}'. "
-                    "Expected format: 'ollama:model_name' (e.g., 'ollama:qwen3:8b')"
-                )
+                raise cls._invalid_ollama_format_error(model_name)
 
-            # Get base_url from kwargs or environment, with localhost fallback
-            base_url = (
+            # Get base_url(s) from kwargs or environment, with localhost
+            # fallback; several comma-separated hosts enable load balancing
+            hosts = parse_hosts(
                 kwargs.get("base_url")
                 or os.getenv("OLLAMA_URL")
                 or "http://localhost:11434"
-            ).rstrip("/")
+            )
+            base_url = ", ".join(hosts)
 
             try:
-                return OllamaPromptDriver(model=actual_model_name, host=base_url)
+                timeout = kwargs.get("timeout")
+                if len(hosts) > 1:
+                    driver = PooledOllamaPromptDriver(  # type: ignore[call-arg]
+                        model=actual_model_name,
+                        pool=OllamaHostPool.shared(hosts, timeout=timeout),
+                    )
+                else:
+                    driver = OllamaPromptDriver(model=actual_model_name, host=hosts[0])
+                    if timeout:
+                        import ollama  # type: ignore
+
+                        set_client_factory(
+                            driver,
+                            lambda: ollama.Client(host=hosts[0], timeout=timeout),
+                        )
+                num_ctx = kwargs.get("num_ctx")
+                if num_ctx:
+                    driver.options["num_ctx"] = num_ctx
+                if kwargs.get("think") is False:
+                    driver.extra_params["think"] = False
+                return driver
             except Exception as e:
                 raise ConnectionError(
                     f"Failed to create Ollama prompt driver for '{actual_model_name}' "
@@ -91,12 +165,7 @@ class AgentFactory:
                 ) from e
 
         else:
-            raise ValueError(
-                f"Unsupported model format: '{model_name}'. "
-                f"Supported formats:\n"
-                f"  - Gemini: 'gemini-*' (e.g., 'gemini-2.5-flash')\n"
-                f"  - Ollama: 'ollama:*' (e.g., 'ollama:qwen3:8b')"
-            )
+            raise cls._unsupported_format_error(model_name)
 
     @classmethod
     def list_supported_formats(cls) -> dict:
@@ -114,7 +183,9 @@ class AgentFactory:
                     "gemini-1.5-flash",
                     "gemini-1.5-pro"
                 ],
-                "description": "Google Gemini models (requires API key)"
+                "description": "Google Gemini models (requires API key)",
+                "context_window": MODEL_CONTEXT_WINDOWS["gemini"],
+                "default_context_window": MODEL_CONTEXT_WINDOWS["gemini"],
             },
             "ollama": {
                 "format": "ollama:*",
@@ -125,6 +196,79 @@ class AgentFactory:
                     "ollama:mistral:7b",
                     "ollama:phi4:14b"
                 ],
-                "description": "Local Ollama models (requires Ollama server)"
+                "description": "Local Ollama models (requires Ollama server)",
+                "context_window": UNKNOWN_MODEL_CONTEXT_WINDOW,
+                "default_context_window": OLLAMA_DEFAULT_CONTEXT_WINDOW,
             }
         }
+
+    @classmethod
+    def get_context_window(cls, model_name: str) -> int:
+        """Return the maximum context window for a model, in tokens.
+
+        Args:
+            model_name: The model identifier (e.g., 'ollama:qwen3:8b')
+
+        Returns:
+            Maximum number of prompt plus completion tokens the model supports
+
+        Raises:
+            ValueError: If model format is not supported
+        """
+        provider = cls._provider_for(model_name)
+        bare_name = model_name[7:] if provider == "ollama" else model_name
+        for prefix in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+            if bare_name.startswith(prefix):
+                return MODEL_CONTEXT_WINDOWS[prefix]
+        return int(cls.list_supported_formats()[provider]["context_window"])
+
+    @classmethod
+    def get_default_context_window(cls, model_name: str) -> int:
+        """Return the context window used when none is requested explicitly.
+
+        Args:
+            model_name: The model identifier
+
+        Returns:
+            The provider's default context window in tokens
+
+        Raises:
+            ValueError: If model format is not supported
+        """
+        provider = cls._provider_for(model_name)
+        if provider == "gemini":
+            return cls.get_context_window(model_name)
+        return int(cls.list_supported_formats()[provider]["default_context_window"])
+
+    @classmethod
+    def _provider_for(cls, model_name: str) -> str:
+        """Return the provider key for a model name.
+
+        Raises:
+            ValueError: If model format is not supported
+        """
+        if model_name.startswith("gemini"):
+            return "gemini"
+        if model_name.startswith("ollama:"):
+            if not model_name[7:]:
+                raise cls._invalid_ollama_format_error(model_name)
+            return "ollama"
+        raise cls._unsupported_format_error(model_name)
+
+    @staticmethod
+    def _invalid_ollama_format_error(model_name: str) -> ValueError:
+        """Build the error raised for an 'ollama:' prefix without a model."""
+        return ValueError(
+            f"Invalid Ollama model format: '{model_name}'. "
+            "Expected format: 'ollama:model_name' (e.g., 'ollama:qwen3:8b')"
+        )
+
+    @staticmethod
+    def _unsupported_format_error(model_name: str) -> ValueError:
+        """Build the error raised for unknown model name formats."""
+        return ValueError(
+            f"Unsupported model format: '{model_name}'. "
+            f"Supported formats:\n"
+            f"  - Gemini: 'gemini-*' (e.g., 'gemini-2.5-flash')\n"
+            f"  - Ollama: 'ollama:*' (e.g., 'ollama:qwen3:8b')"
+        )
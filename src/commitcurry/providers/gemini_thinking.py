@@ -0,0 +1,86 @@
+"""Thinking-token accounting for Gemini prompt drivers.
+
+Griptape's Google driver reports only prompt and answer tokens, although
+every Gemini response also says how many tokens the model spent thinking
+(``usage_metadata.thoughts_token_count``). The SDK client installed here
+records that count for the driver.
+"""
+
+import weakref
+from collections.abc import Iterator
+from typing import Any, Callable, Optional
+
+from .cancellation import set_client_factory
+
+
+class ThinkingTokenCounter:
+    """Running total of the thinking tokens reported by Gemini responses."""
+
+    def __init__(self) -> None:
+        self.total = 0
+
+    def add(self, usage_metadata: Any) -> None:
+        """Add the thinking tokens of a response's usage metadata."""
+        self.total += getattr(usage_metadata, "thoughts_token_count", None) or 0
+
+
+class _CountingModels:
+    """``client.models`` stand-in counting the thinking tokens of responses."""
+
+    def __init__(self, models: Any, counter: ThinkingTokenCounter):
+        self._models = models
+        self._counter = counter
+
+    def generate_content(self, *args: Any, **kwargs: Any) -> Any:
+        response = self._models.generate_content(*args, **kwargs)
+        self._counter.add(response.usage_metadata)
+        return response
+
+    def generate_content_stream(self, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        # Usage metadata is cumulative; the last chunk carrying it counts
+        usage_metadata = None
+        for chunk in self._models.generate_content_stream(*args, **kwargs):
+            usage_metadata = chunk.usage_metadata or usage_metadata
+            yield chunk
+        self._counter.add(usage_metadata)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._models, name)
+
+
+class _CountingClient:
+    """``google.genai.Client`` wrapper counting reported thinking tokens."""
+
+    def __init__(self, client: Any, counter: ThinkingTokenCounter):
+        self._wrapped = client
+        self.models = _CountingModels(client.models, counter)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._wrapped, name)
+
+
+# Counters keyed by driver id, like the client factories they belong to
+_counters: dict[int, ThinkingTokenCounter] = {}
+
+
+def track_thinking_tokens(prompt_driver: Any, create_client: Callable[[], Any]) -> None:
+    """Install a client on a Gemini driver that counts its thinking tokens.
+
+    Args:
+        prompt_driver: A Griptape Google prompt driver
+        create_client: Callable returning a new, configured ``genai.Client``
+    """
+    key = id(prompt_driver)
+    counter = _counters[key] = ThinkingTokenCounter()
+    weakref.finalize(prompt_driver, _counters.pop, key, None)
+    set_client_factory(prompt_driver, lambda: _CountingClient(create_client(), counter))
+
+
+def reported_thinking_tokens(prompt_driver: Any) -> Optional[int]:
+    """Return the thinking tokens a driver's responses reported so far.
+
+    Returns:
+        The running total, or None if the driver's thinking is not tracked
+    """
+    counter = _counters.get(id(prompt_driver))
+    return counter.total if counter is not None else None
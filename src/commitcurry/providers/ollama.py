@@ -1,37 +1,53 @@
 """Ollama prompt driver provider using Griptape."""
 
 import os
-from typing import Optional
+from collections.abc import Sequence
+from typing import Optional, Union
 
 from griptape.drivers.prompt.ollama import OllamaPromptDriver  # type: ignore
 
 from .base import PromptDriverProvider
+from .ollama_pool import OllamaHostPool, PooledOllamaPromptDriver, parse_hosts
 
 
 class OllamaProvider(PromptDriverProvider):
     """Ollama prompt driver provider using Ollama API."""
 
-    def __init__(self, model_name: str, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: str,
+        base_url: Optional[Union[str, Sequence[str]]] = None,
+    ):
         """Initialize the Ollama provider.
 
         Args:
             model_name: The Ollama model name (e.g., 'qwen3:8b')
-            base_url: The base URL for Ollama API. If None, will be read from
-                OLLAMA_URL env var.
+            base_url: The base URL for Ollama API, or several hosts as a list
+                or comma-separated string to load-balance across. If None,
+                will be read from OLLAMA_URL env var.
         """
         self._model_name = model_name
-        self.base_url = (base_url or os.getenv("OLLAMA_URL") or "http://localhost:11434").rstrip("/")
+        self.base_urls = parse_hosts(
+            base_url or os.getenv("OLLAMA_URL") or "http://localhost:11434"
+        )
+        self.base_url = self.base_urls[0]
 
     def create_prompt_driver(self) -> OllamaPromptDriver:
         """Create and configure an Ollama prompt driver instance.
         
         Returns:
-            Configured OllamaPromptDriver instance
+            Configured OllamaPromptDriver instance; a PooledOllamaPromptDriver
+            when several hosts are configured
             
         Raises:
             ConnectionError: If driver creation fails
         """
         try:
+            if len(self.base_urls) > 1:
+                return PooledOllamaPromptDriver(  # type: ignore[call-arg]
+                    model=self._model_name,
+                    pool=OllamaHostPool.shared(self.base_urls),
+                )
             return OllamaPromptDriver(
                 model=self._model_name,
                 host=self.base_url
@@ -39,7 +55,7 @@ class OllamaProvider(PromptDriverProvider):
         except Exception as e:
             raise ConnectionError(
                 f"Failed to create Ollama prompt driver for '{self._model_name}' "
-                f"at {self.base_url}. Make sure Ollama is running with "
+                f"at {', '.join(self.base_urls)}. Make sure Ollama is running with "
                 f"'ollama serve' and the model is available. "
                 f"Run 'ollama pull {self._model_name}' if needed. Error: {str(e)}"
             ) from e
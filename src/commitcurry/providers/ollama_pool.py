@@ -0,0 +1,308 @@
+"""Load balancing of Ollama requests across several hosts."""
+
+import logging
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Optional
+
+import httpx
+import ollama  # type: ignore
+from attrs import define, field
+from griptape.common import DeltaMessage, Message, PromptStack  # type: ignore
+from griptape.drivers.prompt.ollama import OllamaPromptDriver  # type: ignore
+
+from .cancellation import abort_prompt_driver
+
+logger = logging.getLogger(__name__)
+
+# Seconds between health checks of a host (models available and loaded).
+HEALTH_CHECK_INTERVAL = 30.0
+
+# Timeout in seconds for health check requests.
+HEALTH_CHECK_TIMEOUT = 2.0
+
+# A host that already has the model loaded is preferred over an idle host
+# without it unless it has this many more requests outstanding; loading a
+# model usually costs more than waiting for a couple of requests.
+RESIDENCY_AFFINITY = 2
+
+# Errors meaning the host itself is unavailable, as opposed to the request
+# being invalid; these trigger failover to another host.
+HOST_ERRORS = (ConnectionError, httpx.TransportError)
+
+
+def parse_hosts(value: Any) -> list[str]:
+    """Normalize a host list given as a comma-separated string or sequence."""
+    items = value.split(",") if isinstance(value, str) else list(value or [])
+    return [item.strip().rstrip("/") for item in items if item and item.strip()]
+
+
+def _matches(model_name: str, available: str) -> bool:
+    """Return whether a model tag reported by Ollama is the requested model."""
+    return available == model_name or available == f"{model_name}:latest"
+
+
+class OllamaHost:
+    """Health and load state of a single Ollama host."""
+
+    def __init__(self, url: str):
+        """Initialize the host state.
+
+        Args:
+            url: Base URL of the Ollama server
+        """
+        self.url = url
+        self.healthy = True
+        self.models: set[str] = set()
+        self.loaded_models: set[str] = set()
+        self.outstanding = 0
+        self.last_checked: Optional[float] = None
+
+    def has_model(self, model_name: str) -> bool:
+        """Return whether the host has the model available."""
+        return any(_matches(model_name, name) for name in self.models)
+
+    def has_loaded(self, model_name: str) -> bool:
+        """Return whether the model is currently loaded in memory on the host."""
+        return any(_matches(model_name, name) for name in self.loaded_models)
+
+
+class NoHealthyHostError(ConnectionError):
+    """Raised when no Ollama host can serve a request."""
+
+
+class OllamaHostPool:
+    """A set of Ollama hosts with health checks and request dispatching.
+
+    Hosts are checked with ``/api/tags`` (available models) and ``/api/ps``
+    (loaded models) at most every ``HEALTH_CHECK_INTERVAL`` seconds. Requests
+    go to the healthy host with the fewest outstanding requests, preferring
+    hosts that already have the model loaded.
+    """
+
+    _shared: dict[tuple, "OllamaHostPool"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        hosts: Sequence[str],
+        timeout: Optional[float] = None,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL,
+    ):
+        """Initialize the pool.
+
+        Args:
+            hosts: Base URLs of the Ollama servers
+            timeout: Timeout in seconds for generation requests
+            health_check_interval: Seconds between health checks of a host
+        """
+        if not hosts:
+            raise ValueError("At least one Ollama host is required.")
+        self.hosts = [OllamaHost(url) for url in hosts]
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(
+        cls, hosts: Sequence[str], timeout: Optional[float] = None
+    ) -> "OllamaHostPool":
+        """Return a process-wide pool for the given hosts.
+
+        Agents created for the same hosts share one pool, so outstanding
+        request counts cover every request made by this process.
+        """
+        key = (tuple(hosts), timeout)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(hosts, timeout=timeout)
+            return cls._shared[key]
+
+    def create_client(self, host: OllamaHost) -> Any:
+        """Create an Ollama client for generation requests to a host."""
+        return ollama.Client(host=host.url, timeout=self.timeout)
+
+    def check_host(self, host: OllamaHost) -> None:
+        """Refresh a host's health, available models and loaded models."""
+        client = ollama.Client(host=host.url, timeout=HEALTH_CHECK_TIMEOUT)
+        try:
+            models = {model.model for model in client.list().models if model.model}
+            loaded = {model.model for model in client.ps().models if model.model}
+        except Exception as e:
+            logger.warning("Ollama host %s failed health check: %s", host.url, e)
+            with self._lock:
+                host.healthy = False
+                host.last_checked = time.monotonic()
+            return
+        finally:
+            client.close()
+
+        with self._lock:
+            host.healthy = True
+            host.models = models
+            host.loaded_models = loaded
+            host.last_checked = time.monotonic()
+
+    def refresh(self, force: bool = False) -> None:
+        """Health check all hosts whose state is stale, in parallel."""
+        now = time.monotonic()
+        stale = [
+            host
+            for host in self.hosts
+            if force
+            or host.last_checked is None
+            or now - host.last_checked >= self.health_check_interval
+        ]
+        if not stale:
+            return
+        with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+            list(executor.map(self.check_host, stale))
+
+    def candidates(self, model_name: str) -> list[OllamaHost]:
+        """Return healthy hosts for a model, best first.
+
+        Hosts known to have the model come first; if no host reports it,
+        every healthy host is a candidate (the model may be pulled on demand).
+        """
+        self.refresh()
+        with self._lock:
+            healthy = [host for host in self.hosts if host.healthy]
+            with_model = [host for host in healthy if host.has_model(model_name)]
+            hosts = with_model or healthy
+            return sorted(
+                hosts,
+                key=lambda host: (
+                    host.outstanding
+                    + (0 if host.has_loaded(model_name) else RESIDENCY_AFFINITY)
+                ),
+            )
+
+    @contextmanager
+    def dispatch(self, host: OllamaHost, model_name: str) -> Iterator[OllamaHost]:
+        """Track a request to a host for load balancing.
+
+        A successful request marks the model as loaded on the host.
+        """
+        with self._lock:
+            host.outstanding += 1
+        try:
+            yield host
+            with self._lock:
+                host.loaded_models.add(model_name)
+        finally:
+            with self._lock:
+                host.outstanding -= 1
+
+    def mark_unhealthy(self, host: OllamaHost) -> None:
+        """Take a host out of rotation until its next health check."""
+        with self._lock:
+            host.healthy = False
+            host.last_checked = time.monotonic()
+
+
+@define
+class PooledOllamaPromptDriver(OllamaPromptDriver):
+    """Ollama prompt driver dispatching requests across an ``OllamaHostPool``.
+
+    Each request goes to the pool's best host for the model and fails over
+    to the next candidate when a host is unreachable.
+    """
+
+    pool: OllamaHostPool = field(kw_only=True)
+    _host_drivers: dict = field(factory=dict, kw_only=True, alias="host_drivers")
+    _cancelled: threading.Event = field(
+        factory=threading.Event, kw_only=True, alias="cancelled"
+    )
+
+    def _driver_for(self, host: OllamaHost) -> OllamaPromptDriver:
+        """Return the single-host driver used for requests to a host."""
+        driver = self._host_drivers.get(host.url)
+        if driver is None:
+            driver = OllamaPromptDriver(
+                model=self.model,
+                host=host.url,
+                options=self.options,
+                extra_params=self.extra_params,
+                use_native_tools=self.use_native_tools,
+                structured_output_strategy=self.structured_output_strategy,
+                client=self.pool.create_client(host),
+            )
+            self._host_drivers[host.url] = driver
+        return driver
+
+    def _candidates(self) -> list[OllamaHost]:
+        """Return candidate hosts, re-checking all hosts if none is healthy."""
+        hosts = self.pool.candidates(self.model)
+        if not hosts:
+            self.pool.refresh(force=True)
+            hosts = self.pool.candidates(self.model)
+        if not hosts:
+            raise NoHealthyHostError(
+                f"No healthy Ollama host available for '{self.model}' among "
+                + ", ".join(host.url for host in self.pool.hosts)
+            )
+        return hosts
+
+    def try_run(self, prompt_stack: PromptStack) -> Message:
+        """Run the prompt on the best host, failing over on host errors."""
+        last_error: Optional[Exception] = None
+        for host in self._candidates():
+            try:
+                with self.pool.dispatch(host, self.model):
+                    return self._driver_for(host).try_run(prompt_stack)
+            except HOST_ERRORS as e:
+                self._handle_host_error(host, e)
+                last_error = e
+        raise NoHealthyHostError(
+            f"All Ollama hosts failed for '{self.model}': {last_error}"
+        ) from last_error
+
+    def try_stream(self, prompt_stack: PromptStack) -> Iterator[DeltaMessage]:
+        """Stream the prompt from the best host.
+
+        Fails over only until the first chunk arrives; a host dropping in the
+        middle of a stream is reported to the caller.
+        """
+        last_error: Optional[Exception] = None
+        for host in self._candidates():
+            started = False
+            try:
+                with self.pool.dispatch(host, self.model):
+                    for delta in self._driver_for(host).try_stream(prompt_stack):
+                        started = True
+                        yield delta
+                    return
+            except HOST_ERRORS as e:
+                if started:
+                    if not self._cancelled.is_set():
+                        self.pool.mark_unhealthy(host)
+                    raise
+                self._handle_host_error(host, e)
+                last_error = e
+        raise NoHealthyHostError(
+            f"All Ollama hosts failed for '{self.model}': {last_error}"
+        ) from last_error
+
+    def _handle_host_error(self, host: OllamaHost, error: Exception) -> None:
+        """Take a failed host out of rotation, unless we aborted the request."""
+        if self._cancelled.is_set():
+            raise error
+        self.pool.mark_unhealthy(host)
+        logger.warning("Ollama host %s failed, failing over: %s", host.url, error)
+
+    def cancel(self) -> None:
+        """Abort the requests in flight on every host."""
+        self._cancelled.set()
+        for driver in list(self._host_drivers.values()):
+            abort_prompt_driver(driver)
+
+    def reset(self) -> None:
+        """Replace the clients closed by ``cancel()``."""
+        for host in self.pool.hosts:
+            driver = self._host_drivers.get(host.url)
+            if driver is not None:
+                driver.client = self.pool.create_client(host)
+        self._cancelled.clear()
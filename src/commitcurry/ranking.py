@@ -0,0 +1,371 @@
+"""Recruiter mode: rank many CVs against one job description.
+
+CVs in a directory are indexed locally and ranked with BM25, so only the
+best matches are sent through the (slow, paid) LLM tailoring pipeline.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .cv_optimizer import CVOptimizer, OptimizationTimeoutError
+from .preflight import PreflightPlan
+from .watch import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Index file kept next to the CVs it covers.
+INDEX_FILE_NAME = ".commitcurry-index.json"
+INDEX_VERSION = 1
+
+# Files in the CV directory that are indexed.
+CV_SUFFIXES = (".md", ".markdown", ".txt")
+
+# BM25 term frequency saturation and document length normalisation.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Matched terms listed per ranked CV.
+MATCHED_TERMS_SHOWN = 8
+
+# Words, numbers and tech names such as 'c++', 'c#' or 'node.js'.
+_TERM_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOP_WORDS = frozenset(
+    """
+    a about also an and are as at be been but by can do for from has have
+    i in into is it its me my of on or our so that the their them they this
+    to us was we were what which who will with within you your
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower-case index terms without stop words."""
+    return [
+        term
+        for term in _TERM_PATTERN.findall(text.lower())
+        if len(term) > 1 and term not in STOP_WORDS
+    ]
+
+
+@dataclass
+class IndexedCV:
+    """Index entry of one CV file."""
+
+    mtime_ns: int
+    size: int
+    digest: str
+    length: int
+    terms: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the entry for the index file."""
+        return {
+            "mtime_ns": self.mtime_ns,
+            "size": self.size,
+            "digest": self.digest,
+            "length": self.length,
+            "terms": self.terms,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "IndexedCV":
+        """Deserialize an entry from the index file."""
+        return cls(
+            mtime_ns=int(data["mtime_ns"]),
+            size=int(data["size"]),
+            digest=str(data["digest"]),
+            length=int(data["length"]),
+            terms={str(term): int(count) for term, count in data["terms"].items()},
+        )
+
+
+@dataclass
+class IndexUpdate:
+    """What an index update changed."""
+
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        """Whether the index differs from the saved one."""
+        return bool(self.added or self.updated or self.removed)
+
+
+@dataclass
+class RankedCV:
+    """A CV ranked against a job description."""
+
+    path: Path
+    score: float
+    matched_terms: list[str] = field(default_factory=list)
+
+
+@dataclass
+class TailoringResult:
+    """Outcome of tailoring one CV in a concurrent batch.
+
+    Attributes:
+        content: The tailored CV, or None if tailoring failed
+        error: The exception raised for the CV, if any
+        timed_out: Whether the CV failed because the deadline passed, rather
+            than because of the model
+        latency: Seconds the request took
+    """
+
+    content: Optional[str] = None
+    error: Optional[Exception] = None
+    timed_out: bool = False
+    latency: float = 0.0
+
+
+class CVIndex:
+    """Incremental BM25 index over the CV files of a directory.
+
+    Each CV's term frequencies are persisted in ``INDEX_FILE_NAME`` inside
+    the directory. Updates re-read only files whose size or modification
+    time changed, and re-index only those whose content hash changed too;
+    the inverted index used for ranking is built from the entries in memory.
+    Only files directly inside the directory are indexed, so output written
+    to a subdirectory is never picked up.
+    """
+
+    def __init__(self, directory: Path, index_path: Optional[Path] = None):
+        """Initialize the index, loading previously indexed CVs.
+
+        Args:
+            directory: Directory holding the CV files
+            index_path: Index file location. Defaults to
+                ``INDEX_FILE_NAME`` inside the directory.
+        """
+        self.directory = directory
+        self.index_path = index_path or directory / INDEX_FILE_NAME
+        self.entries: dict[str, IndexedCV] = self._load()
+        self._postings: Optional[dict[str, dict[str, int]]] = None
+
+    def _load(self) -> dict[str, IndexedCV]:
+        """Load index entries, treating a missing or corrupt file as empty."""
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if data.get("version") != INDEX_VERSION:
+                return {}
+            return {
+                name: IndexedCV.from_dict(entry)
+                for name, entry in data.get("cvs", {}).items()
+            }
+        except (OSError, ValueError, TypeError, AttributeError, KeyError):
+            return {}
+
+    def save(self) -> None:
+        """Atomically write the index file."""
+        payload = {
+            "version": INDEX_VERSION,
+            "cvs": {name: entry.to_dict() for name, entry in self.entries.items()},
+        }
+        atomic_write(self.index_path, json.dumps(payload))
+
+    def update(self) -> IndexUpdate:
+        """Bring the index up to date with the directory and save it if needed.
+
+        Returns:
+            Counts of added, updated, removed and unchanged CVs
+        """
+        result = IndexUpdate()
+        seen = set()
+        touched = False
+        for path in sorted(self.directory.iterdir()):
+            if (
+                path.name.startswith(".")
+                or path.suffix.lower() not in CV_SUFFIXES
+                or not path.is_file()
+            ):
+                continue
+            seen.add(path.name)
+            stat = path.stat()
+            entry = self.entries.get(path.name)
+            if (
+                entry is not None
+                and entry.mtime_ns == stat.st_mtime_ns
+                and entry.size == stat.st_size
+            ):
+                result.unchanged += 1
+                continue
+
+            content = path.read_bytes()
+            digest = hashlib.sha256(content).hexdigest()
+            if entry is not None and entry.digest == digest:
+                # Touched but not modified
+                entry.mtime_ns = stat.st_mtime_ns
+                entry.size = stat.st_size
+                touched = True
+                result.unchanged += 1
+                continue
+
+            terms = tokenize(content.decode("utf-8", errors="replace"))
+            self.entries[path.name] = IndexedCV(
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                digest=digest,
+                length=len(terms),
+                terms=dict(Counter(terms)),
+            )
+            if entry is None:
+                result.added += 1
+            else:
+                result.updated += 1
+
+        for name in set(self.entries) - seen:
+            del self.entries[name]
+            result.removed += 1
+
+        self._postings = None
+        if result.changed or touched or not self.index_path.exists():
+            self.save()
+        return result
+
+    def rank(self, job_description: str, top_k: Optional[int] = None) -> list[RankedCV]:
+        """Rank the indexed CVs against a job description with BM25.
+
+        Args:
+            job_description: The job description to match
+            top_k: Number of best matches to return (default: all matches)
+
+        Returns:
+            CVs matching at least one job term, best first
+        """
+        if not self.entries:
+            return []
+        postings = self._inverted_index()
+        count = len(self.entries)
+        average_length = sum(e.length for e in self.entries.values()) / count or 1.0
+
+        scores: dict[str, float] = {}
+        matched: dict[str, list[tuple[float, str]]] = {}
+        for term in set(tokenize(job_description)):
+            documents = postings.get(term)
+            if not documents:
+                continue
+            idf = math.log(1 + (count - len(documents) + 0.5) / (len(documents) + 0.5))
+            for name, frequency in documents.items():
+                length_norm = (
+                    1 - BM25_B + BM25_B * (self.entries[name].length / average_length)
+                )
+                weight = idf * (
+                    frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+                )
+                scores[name] = scores.get(name, 0.0) + weight
+                matched.setdefault(name, []).append((weight, term))
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        if top_k is not None:
+            ranked = ranked[:top_k]
+        return [
+            RankedCV(
+                path=self.directory / name,
+                score=score,
+                matched_terms=[
+                    term
+                    for _, term in sorted(matched[name], reverse=True)[
+                        :MATCHED_TERMS_SHOWN
+                    ]
+                ],
+            )
+            for name, score in ranked
+        ]
+
+    def _inverted_index(self) -> dict[str, dict[str, int]]:
+        """Return term -> {CV name: term frequency}, built on first use."""
+        if self._postings is None:
+            postings: dict[str, dict[str, int]] = {}
+            for name, entry in self.entries.items():
+                for term, frequency in entry.terms.items():
+                    postings.setdefault(term, {})[name] = frequency
+            self._postings = postings
+        return self._postings
+
+
+def tailor_concurrently(
+    plans: Sequence[PreflightPlan],
+    create_optimizer: Callable[[], CVOptimizer],
+    workers: int,
+    deadline: Optional[float] = None,
+    edits: bool = False,
+    on_result: Optional[Callable[[int, TailoringResult], None]] = None,
+) -> list[TailoringResult]:
+    """Tailor several CVs at once, one optimizer (and agent) per worker.
+
+    Optimizers are not shared between threads; each worker thread creates
+    its own on first use. A failing CV does not stop the others.
+
+    Args:
+        plans: Pre-flight plans holding each CV and the job description
+        create_optimizer: Callable returning a new optimizer with its own agent
+        workers: Number of requests in flight at once
+        deadline: Optional ``time.monotonic()`` deadline for all requests
+        edits: Ask for section-level edits instead of whole CVs
+        on_result: Called with the plan's index and its result as each CV
+            completes, in completion order, on the calling thread. Results
+            handled before an interruption (e.g. Ctrl-C) are not lost.
+
+    Returns:
+        One result per plan, in order
+    """
+    local = threading.local()
+    optimizers: list[CVOptimizer] = []
+    lock = threading.Lock()
+
+    def tailor(plan: PreflightPlan) -> TailoringResult:
+        optimizer = getattr(local, "optimizer", None)
+        if optimizer is None:
+            optimizer = local.optimizer = create_optimizer()
+            with lock:
+                optimizers.append(optimizer)
+        optimize = optimizer.optimize_cv_edits if edits else optimizer.optimize_cv
+        start_time = time.perf_counter()
+        try:
+            content = optimize(plan.cv_content, plan.job_description, deadline=deadline)
+        except OptimizationTimeoutError as e:
+            logger.warning("Tailoring timed out: %s", e)
+            return TailoringResult(error=e, timed_out=True)
+        except Exception as e:
+            logger.warning("Tailoring failed: %s", e)
+            return TailoringResult(error=e)
+        return TailoringResult(
+            content=content, latency=time.perf_counter() - start_time
+        )
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, workers), thread_name_prefix="commitcurry-rank"
+    )
+    futures: list[Future[TailoringResult]] = []
+    try:
+        futures.extend(executor.submit(tailor, plan) for plan in plans)
+        indexes = {future: index for index, future in enumerate(futures)}
+        for future in as_completed(futures):
+            if on_result is not None:
+                on_result(indexes[future], future.result())
+        return [future.result() for future in futures]
+    except BaseException:
+        # e.g. Ctrl-C: stop queued work and abort the requests in flight
+        for future in futures:
+            future.cancel()
+        with lock:
+            for optimizer in optimizers:
+                optimizer.cancel()
+        raise
+    finally:
+        executor.shutdown(wait=False)
@@ -0,0 +1,665 @@
+"""Render tailored CVs to HTML, PDF and DOCX in a process pool.
+
+The Markdown produced by the model is parsed into blocks by a small,
+dependency-free parser covering what CVs use (headings, paragraphs, lists,
+rules, code and inline emphasis and links). HTML fills a bundled template,
+PDF is printed from that HTML by a locally installed renderer, and DOCX is
+written as a minimal Office Open XML package.
+
+This module must stay light to import: it is loaded by every pool worker.
+"""
+
+import html
+import multiprocessing
+import os
+import re
+import shutil
+import string
+import subprocess
+import tempfile
+import zipfile
+from collections.abc import Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+from xml.sax.saxutils import escape as xml_escape
+from xml.sax.saxutils import quoteattr
+
+RENDER_FORMATS = ("html", "pdf", "docx")
+
+RENDER_TEMPLATE = "cv_render.html"
+
+# Local HTML-to-PDF renderers, in order of preference; {html} and {pdf} are
+# replaced by the input and output paths.
+PDF_RENDERERS = (
+    ("wkhtmltopdf", ["--quiet", "--enable-local-file-access", "{html}", "{pdf}"]),
+    ("weasyprint", ["{html}", "{pdf}"]),
+    (
+        "chromium",
+        [
+            "--headless",
+            "--disable-gpu",
+            "--no-pdf-header-footer",
+            "--print-to-pdf={pdf}",
+            "{html}",
+        ],
+    ),
+    (
+        "google-chrome",
+        [
+            "--headless",
+            "--disable-gpu",
+            "--no-pdf-header-footer",
+            "--print-to-pdf={pdf}",
+            "{html}",
+        ],
+    ),
+)
+
+# Seconds a PDF renderer may take for one CV.
+PDF_RENDER_TIMEOUT = 60.0
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_RULE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_BULLET = re.compile(r"^(\s*)[-*+]\s+(.*)$")
+_NUMBERED = re.compile(r"^(\s*)(\d+)[.)]\s+(.*)$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_INLINE = re.compile(
+    r"`(?P<code>[^`]+)`"
+    r"|\*\*(?P<bold>.+?)\*\*|__(?P<bold2>.+?)__"
+    r"|\*(?P<italic>[^*\s][^*]*?)\*|\b_(?P<italic2>[^_]+?)_\b"
+    r"|\[(?P<label>[^\]]+)\]\((?P<href>[^)\s]+)\)"
+)
+# Link schemes written as hyperlinks; other links render as their label
+_LINK_SCHEME = re.compile(r"^(https?|mailto):", re.IGNORECASE)
+
+
+class RenderError(Exception):
+    """Raised when a CV cannot be rendered to a format."""
+
+
+@dataclass
+class Span:
+    """A run of inline text with uniform formatting."""
+
+    text: str
+    bold: bool = False
+    italic: bool = False
+    code: bool = False
+    href: Optional[str] = None
+
+
+@dataclass
+class Block:
+    """A block-level element of a CV.
+
+    Attributes:
+        kind: 'heading', 'paragraph', 'bullet', 'number', 'code' or 'rule'
+        spans: Inline content (code blocks keep their text in one span)
+        level: Heading level, list nesting depth, or the item number
+    """
+
+    kind: str
+    spans: list[Span] = field(default_factory=list)
+    level: int = 0
+
+
+def parse_formats(value: str) -> list[str]:
+    """Parse a comma-separated list of output formats.
+
+    Raises:
+        ValueError: If a format is not supported
+    """
+    formats = []
+    for name in (part.strip().lower() for part in value.split(",")):
+        if not name:
+            continue
+        if name not in RENDER_FORMATS:
+            raise ValueError(
+                f"Unsupported render format '{name}'. "
+                f"Use any of: {', '.join(RENDER_FORMATS)}"
+            )
+        if name not in formats:
+            formats.append(name)
+    return formats
+
+
+def find_pdf_renderer() -> Optional[list[str]]:
+    """Return the command line template of the first local PDF renderer found."""
+    for name, arguments in PDF_RENDERERS:
+        executable = shutil.which(name)
+        if executable is not None:
+            return [executable, *arguments]
+    return None
+
+
+def load_render_template() -> str:
+    """Load the HTML template bundled with the application."""
+    return (Path(__file__).parent / "templates" / RENDER_TEMPLATE).read_text(
+        encoding="utf-8"
+    )
+
+
+def parse_inline(text: str) -> list[Span]:
+    """Split a line of Markdown into formatted spans."""
+    spans = []
+    position = 0
+    for match in _INLINE.finditer(text):
+        if match.start() > position:
+            spans.append(Span(text[position : match.start()]))
+        if match.group("code") is not None:
+            spans.append(Span(match.group("code"), code=True))
+        elif match.group("bold") is not None or match.group("bold2") is not None:
+            spans.append(Span(match.group("bold") or match.group("bold2"), bold=True))
+        elif match.group("italic") is not None or match.group("italic2") is not None:
+            spans.append(
+                Span(match.group("italic") or match.group("italic2"), italic=True)
+            )
+        elif _LINK_SCHEME.match(match.group("href")):
+            spans.append(Span(match.group("label"), href=match.group("href")))
+        else:
+            spans.append(Span(match.group("label")))
+        position = match.end()
+    if position < len(text):
+        spans.append(Span(text[position:]))
+    return spans
+
+
+def parse_markdown(markdown: str) -> list[Block]:
+    """Parse the Markdown of a CV into blocks."""
+    blocks: list[Block] = []
+    paragraph: list[str] = []
+    code: Optional[list[str]] = None
+
+    def flush_paragraph() -> None:
+        if paragraph:
+            blocks.append(Block("paragraph", parse_inline(" ".join(paragraph))))
+            paragraph.clear()
+
+    for line in markdown.splitlines():
+        if code is not None:
+            if _FENCE.match(line):
+                blocks.append(Block("code", [Span("\n".join(code), code=True)]))
+                code = None
+            else:
+                code.append(line)
+            continue
+        if _FENCE.match(line):
+            flush_paragraph()
+            code = []
+            continue
+        if not line.strip():
+            flush_paragraph()
+            continue
+
+        heading = _HEADING.match(line)
+        bullet = _BULLET.match(line)
+        numbered = _NUMBERED.match(line)
+        if heading:
+            flush_paragraph()
+            blocks.append(
+                Block("heading", parse_inline(heading.group(2)), len(heading.group(1)))
+            )
+        elif _RULE.match(line):
+            flush_paragraph()
+            blocks.append(Block("rule"))
+        elif bullet:
+            flush_paragraph()
+            depth = len(bullet.group(1).expandtabs(4)) // 2
+            blocks.append(Block("bullet", parse_inline(bullet.group(2)), depth))
+        elif numbered:
+            flush_paragraph()
+            blocks.append(
+                Block("number", parse_inline(numbered.group(3)), int(numbered.group(2)))
+            )
+        elif (
+            line.startswith((" ", "\t"))
+            and blocks
+            and not paragraph
+            and blocks[-1].kind in ("bullet", "number")
+        ):
+            # Continuation of a list item
+            blocks[-1].spans.extend(parse_inline(" " + line.strip()))
+        else:
+            paragraph.append(line.strip())
+
+    flush_paragraph()
+    if code is not None:
+        blocks.append(Block("code", [Span("\n".join(code), code=True)]))
+    return blocks
+
+
+def document_title(blocks: Sequence[Block], default: str = "CV") -> str:
+    """Return the text of the first heading, or the default."""
+    for block in blocks:
+        if block.kind == "heading":
+            return "".join(span.text for span in block.spans).strip() or default
+    return default
+
+
+def render_html(markdown: str, template: string.Template) -> str:
+    """Render a CV to a complete HTML document.
+
+    Args:
+        markdown: The CV in Markdown
+        template: HTML template with ``$title`` and ``$body`` placeholders
+    """
+    blocks = parse_markdown(markdown)
+    return template.safe_substitute(
+        title=html.escape(document_title(blocks)), body=_html_body(blocks)
+    )
+
+
+def _html_spans(spans: Sequence[Span]) -> str:
+    parts = []
+    for span in spans:
+        text = html.escape(span.text)
+        if span.code:
+            text = f"<code>{text}</code>"
+        if span.bold:
+            text = f"<strong>{text}</strong>"
+        if span.italic:
+            text = f"<em>{text}</em>"
+        if span.href is not None:
+            text = f'<a href="{html.escape(span.href)}">{text}</a>'
+        parts.append(text)
+    return "".join(parts)
+
+
+def _html_body(blocks: Sequence[Block]) -> str:
+    lines: list[str] = []
+    # Tags of the open lists; each holds an open <li> that nested lists go in
+    open_lists: list[str] = []
+    # Whether the last line is a list item without a nested list
+    item_on_line = False
+
+    def close_item() -> None:
+        nonlocal item_on_line
+        if item_on_line:
+            lines[-1] += "</li>"
+        else:
+            lines.append("</li>")
+        item_on_line = False
+
+    def close_list() -> None:
+        close_item()
+        lines.append(f"</{open_lists.pop()}>")
+
+    for block in blocks:
+        if block.kind in ("bullet", "number"):
+            tag = "ul" if block.kind == "bullet" else "ol"
+            depth = block.level if block.kind == "bullet" else 0
+            while len(open_lists) > depth + 1:
+                close_list()
+            if len(open_lists) == depth + 1 and open_lists[-1] != tag:
+                close_list()
+            if len(open_lists) == depth + 1:
+                close_item()
+            while len(open_lists) < depth + 1:
+                open_lists.append(tag)
+                lines.append(f"<{tag}>")
+                if len(open_lists) < depth + 1:
+                    lines.append("<li>")  # item holding a deeper list
+            lines.append(f"<li>{_html_spans(block.spans)}")
+            item_on_line = True
+            continue
+        while open_lists:
+            close_list()
+        if block.kind == "heading":
+            lines.append(f"<h{block.level}>{_html_spans(block.spans)}</h{block.level}>")
+        elif block.kind == "rule":
+            lines.append("<hr>")
+        elif block.kind == "code":
+            lines.append(f"<pre>{_html_spans(block.spans)}</pre>")
+        else:
+            lines.append(f"<p>{_html_spans(block.spans)}</p>")
+    while open_lists:
+        close_list()
+    return "\n".join(lines)
+
+
+def render_pdf(html_document: str, path: Path, command: Sequence[str]) -> None:
+    """Print an HTML document to PDF with a local renderer.
+
+    Args:
+        html_document: The HTML to print
+        path: Where to write the PDF
+        command: Renderer command line with {html} and {pdf} placeholders
+
+    Raises:
+        RenderError: If the renderer fails
+    """
+    with tempfile.TemporaryDirectory(prefix="commitcurry-render-") as tmp:
+        html_path = Path(tmp) / "cv.html"
+        html_path.write_text(html_document, encoding="utf-8")
+
+        def write(pdf_path: Path) -> None:
+            arguments = [part.format(html=html_path, pdf=pdf_path) for part in command]
+            try:
+                completed = subprocess.run(
+                    arguments,
+                    capture_output=True,
+                    text=True,
+                    timeout=PDF_RENDER_TIMEOUT,
+                )
+            except (OSError, subprocess.TimeoutExpired) as e:
+                raise RenderError(f"PDF renderer failed: {e}") from e
+            if completed.returncode != 0 or not pdf_path.stat().st_size:
+                raise RenderError(
+                    f"PDF renderer exited with status {completed.returncode}: "
+                    f"{completed.stderr.strip()}"
+                )
+
+        _write_atomically(path, write)
+
+
+def render_docx(markdown: str, path: Path) -> None:
+    """Write a CV as a DOCX document."""
+    blocks = parse_markdown(markdown)
+    links: list[str] = []
+    body = "".join(_docx_paragraph(block, links) for block in blocks)
+    relationships = "".join(
+        f'<Relationship Id="rIdLink{index}" Type="{_REL_HYPERLINK}" '
+        f'Target={quoteattr(href)} TargetMode="External"/>'
+        for index, href in enumerate(links, 1)
+    )
+    parts = {
+        "[Content_Types].xml": _DOCX_CONTENT_TYPES,
+        "_rels/.rels": _DOCX_PACKAGE_RELS,
+        "word/_rels/document.xml.rels": (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{_NS_PACKAGE_RELS}">'
+            f'<Relationship Id="rIdStyles" Type="{_REL_STYLES}" Target="styles.xml"/>'
+            f"{relationships}</Relationships>"
+        ),
+        "word/document.xml": (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<w:document xmlns:w="{_NS_W}" xmlns:r="{_NS_R}"><w:body>{body}'
+            '<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>'
+            '<w:pgMar w:top="1020" w:right="907" w:bottom="1020" w:left="907"'
+            ' w:header="0" w:footer="0" w:gutter="0"/></w:sectPr>'
+            "</w:body></w:document>"
+        ),
+        "word/styles.xml": _DOCX_STYLES,
+    }
+
+    def write(docx_path: Path) -> None:
+        with zipfile.ZipFile(docx_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, content in parts.items():
+                archive.writestr(name, content)
+
+    _write_atomically(path, write)
+
+
+def _docx_paragraph(block: Block, links: list[str]) -> str:
+    style = {
+        "heading": f"Heading{min(block.level, 3)}",
+        "bullet": "ListParagraph",
+        "number": "ListParagraph",
+        "code": "Code",
+    }.get(block.kind)
+    properties = f'<w:pStyle w:val="{style}"/>' if style else ""
+    if block.kind == "rule":
+        properties = (
+            '<w:pBdr><w:bottom w:val="single" w:sz="6" w:space="1" '
+            'w:color="BBBBBB"/></w:pBdr>'
+        )
+    if block.kind == "bullet" and block.level:
+        properties += f'<w:ind w:left="{360 * (block.level + 1)}" w:hanging="360"/>'
+
+    runs = []
+    if block.kind == "bullet":
+        runs.append(_docx_run(Span("•\t")))
+    elif block.kind == "number":
+        runs.append(_docx_run(Span(f"{block.level}.\t")))
+    for span in block.spans:
+        run = _docx_run(span)
+        if span.href is not None:
+            links.append(span.href)
+            run = f'<w:hyperlink r:id="rIdLink{len(links)}">{run}</w:hyperlink>'
+        runs.append(run)
+    return f"<w:p><w:pPr>{properties}</w:pPr>{''.join(runs)}</w:p>"
+
+
+def _docx_run(span: Span) -> str:
+    properties = ""
+    if span.bold:
+        properties += "<w:b/>"
+    if span.italic:
+        properties += "<w:i/>"
+    if span.code:
+        properties += '<w:rFonts w:ascii="Consolas" w:hAnsi="Consolas"/>'
+    if span.href is not None:
+        properties += '<w:color w:val="1A5FB4"/><w:u w:val="single"/>'
+    content = []
+    for index, line in enumerate(span.text.split("\n")):
+        if index:
+            content.append("<w:br/>")
+        for piece_index, piece in enumerate(line.split("\t")):
+            if piece_index:
+                content.append("<w:tab/>")
+            if piece:
+                content.append(f'<w:t xml:space="preserve">{xml_escape(piece)}</w:t>')
+    return f"<w:r><w:rPr>{properties}</w:rPr>{''.join(content)}</w:r>"
+
+
+def _write_atomically(path: Path, write: Callable[[Path], None]) -> None:
+    """Have ``write`` create a temporary file, then move it over ``path``."""
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        write(Path(tmp_name))
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+# Template of the current pool worker, parsed once by the initializer.
+_worker_template: Optional[string.Template] = None
+
+
+def _init_worker(template_text: str) -> None:
+    global _worker_template
+    _worker_template = string.Template(template_text)
+
+
+def _render(
+    markdown: str, path: Path, format_name: str, pdf_command: Optional[list[str]]
+) -> Path:
+    """Render one CV to one format; runs in a pool worker."""
+    if _worker_template is None:
+        raise RenderError("Render worker was not initialized")
+    if format_name == "html":
+        html_document = render_html(markdown, _worker_template)
+
+        def write(tmp_path: Path) -> None:
+            tmp_path.write_text(html_document, encoding="utf-8")
+
+        _write_atomically(path, write)
+    elif format_name == "pdf":
+        if pdf_command is None:
+            raise RenderError("No local PDF renderer found")
+        render_pdf(render_html(markdown, _worker_template), path, pdf_command)
+    else:
+        render_docx(markdown, path)
+    return path
+
+
+@dataclass
+class RenderOutcome:
+    """Result of rendering one CV to one format."""
+
+    path: Path
+    error: Optional[BaseException] = None
+
+
+class CVRenderer:
+    """Render CVs to several formats in worker processes.
+
+    ``submit`` returns immediately, so rendering overlaps with the next
+    model request instead of delaying it. Each worker parses the HTML
+    template once, when it starts.
+    """
+
+    def __init__(
+        self,
+        formats: Sequence[str],
+        output_dir: Path,
+        workers: Optional[int] = None,
+        template: Optional[str] = None,
+        pdf_command: Optional[list[str]] = None,
+    ):
+        """Initialize the renderer; worker processes start on first use.
+
+        Args:
+            formats: Output formats, from ``RENDER_FORMATS``
+            output_dir: Directory the rendered files are written to
+            workers: Number of worker processes (default: one per format)
+            template: HTML template text (default: the bundled template)
+            pdf_command: PDF renderer command line (default: the first
+                renderer found on PATH)
+
+        Raises:
+            ValueError: If a format is unsupported or PDF output is requested
+                and no local renderer is installed
+        """
+        for format_name in formats:
+            if format_name not in RENDER_FORMATS:
+                raise ValueError(f"Unsupported render format '{format_name}'")
+        if "pdf" in formats and pdf_command is None:
+            pdf_command = find_pdf_renderer()
+            if pdf_command is None:
+                raise ValueError(
+                    "PDF output needs a local renderer; install one of: "
+                    + ", ".join(name for name, _ in PDF_RENDERERS)
+                )
+        self.formats = list(formats)
+        self.output_dir = output_dir
+        self.pdf_command = pdf_command
+        self._futures: list[tuple[Path, Future]] = []
+        # Spawned workers do not inherit the agent threads and sockets of
+        # the parent, which forking in a threaded process could deadlock on
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers or max(1, len(self.formats)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(template if template is not None else load_render_template(),),
+        )
+
+    def submit(self, markdown: str, stem: str) -> list[Path]:
+        """Queue a CV for rendering to every format without waiting.
+
+        Args:
+            markdown: The tailored CV in Markdown
+            stem: Output file name without extension
+
+        Returns:
+            The paths that will be written
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for format_name in self.formats:
+            path = self.output_dir / f"{stem}.{format_name}"
+            future = self._executor.submit(
+                _render, markdown, path, format_name, self.pdf_command
+            )
+            self._futures.append((path, future))
+            paths.append(path)
+        return paths
+
+    def wait(self) -> list[RenderOutcome]:
+        """Wait for all queued renders and return their outcomes in order."""
+        outcomes = []
+        for path, future in self._futures:
+            try:
+                future.result()
+                outcomes.append(RenderOutcome(path))
+            except Exception as e:
+                outcomes.append(RenderOutcome(path, e))
+        self._futures = []
+        return outcomes
+
+    def close(self) -> None:
+        """Stop the worker processes, dropping renders not yet started."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "CVRenderer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+_NS_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PACKAGE_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_REL_STYLES = f"{_NS_R}/styles"
+_REL_HYPERLINK = f"{_NS_R}/hyperlink"
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    "</Types>"
+)
+
+_DOCX_PACKAGE_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<Relationships xmlns="{_NS_PACKAGE_RELS}">'
+    f'<Relationship Id="rIdDocument" Type="{_NS_R}/officeDocument" '
+    'Target="word/document.xml"/></Relationships>'
+)
+
+
+def _docx_style(style_id: str, name: str, run: str, paragraph: str = "") -> str:
+    return (
+        f'<w:style w:type="paragraph" w:styleId="{style_id}">'
+        f'<w:name w:val="{name}"/><w:basedOn w:val="Normal"/>'
+        f'<w:next w:val="Normal"/><w:qFormat/>'
+        f"<w:pPr>{paragraph}</w:pPr><w:rPr>{run}</w:rPr></w:style>"
+    )
+
+
+_DOCX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<w:styles xmlns:w="{_NS_W}">'
+    "<w:docDefaults><w:rPrDefault><w:rPr>"
+    '<w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:cs="Calibri"/>'
+    '<w:sz w:val="21"/></w:rPr></w:rPrDefault>'
+    '<w:pPrDefault><w:pPr><w:spacing w:after="60" w:line="264" w:lineRule="auto"/>'
+    "</w:pPr></w:pPrDefault></w:docDefaults>"
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal">'
+    '<w:name w:val="Normal"/><w:qFormat/></w:style>'
+    + _docx_style("Heading1", "heading 1", '<w:b/><w:sz w:val="40"/>')
+    + _docx_style(
+        "Heading2",
+        "heading 2",
+        '<w:b/><w:sz w:val="26"/>',
+        '<w:keepNext/><w:spacing w:before="240"/><w:pBdr><w:bottom w:val="single" '
+        'w:sz="6" w:space="1" w:color="BBBBBB"/></w:pBdr>',
+    )
+    + _docx_style(
+        "Heading3",
+        "heading 3",
+        '<w:b/><w:sz w:val="22"/>',
+        '<w:keepNext/><w:spacing w:before="160"/>',
+    )
+    + _docx_style(
+        "ListParagraph", "List Paragraph", "", '<w:ind w:left="360" w:hanging="360"/>'
+    )
+    + _docx_style("Code", "Code", '<w:rFonts w:ascii="Consolas" w:hAnsi="Consolas"/>')
+    + "</w:styles>"
+)
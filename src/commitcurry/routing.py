@@ -0,0 +1,358 @@
+"""Latency-aware model routing based on persisted per-model run statistics."""
+
+import json
+import os
+import tempfile
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore
+
+DEFAULT_AUTO_CANDIDATES: tuple[str, ...] = ("gemini-2.5-flash", "gemini-2.0-flash")
+
+# Number of recent runs kept per model; older runs are dropped so the
+# statistics follow changes in load and hardware.
+HISTORY_SIZE = 50
+
+# Candidates failing more often than this are only used as a last resort.
+MAX_ERROR_RATE = 0.5
+
+
+def default_stats_path() -> Path:
+    """Return the statistics file path, honouring COMMITCURRY_STATS_FILE."""
+    env_path = os.getenv("COMMITCURRY_STATS_FILE")
+    if env_path:
+        return Path(env_path)
+    return Path.home() / ".commitcurry" / "model_stats.json"
+
+
+def _percentile(values: Sequence[float], percentile: float) -> float:
+    """Return the nearest-rank percentile of a non-empty sequence."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(percentile * len(ordered)) - 1))
+    return ordered[rank]
+
+
+@dataclass
+class ModelStats:
+    """Recent observations for a single model.
+
+    Each sample is an ``(input_tokens, output_tokens, latency_seconds)`` tuple
+    from a successful run; ``outcomes`` records success (True) or failure
+    (False) for every attempted run.
+    """
+
+    samples: list[tuple[int, int, float]] = field(default_factory=list)
+    outcomes: list[bool] = field(default_factory=list)
+
+    def record(
+        self,
+        success: bool,
+        input_tokens: int,
+        output_tokens: int = 0,
+        latency: float = 0.0,
+    ) -> None:
+        """Record the outcome of one run, keeping only the recent history."""
+        self.outcomes = (self.outcomes + [success])[-HISTORY_SIZE:]
+        if success:
+            sample = (input_tokens, output_tokens, latency)
+            self.samples = (self.samples + [sample])[-HISTORY_SIZE:]
+
+    @property
+    def attempts(self) -> int:
+        """Number of recorded runs, successful or not."""
+        return len(self.outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of recent runs that failed."""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def p95_latency(self) -> Optional[float]:
+        """95th percentile latency of recent successful runs, in seconds."""
+        if not self.samples:
+            return None
+        return _percentile([latency for _, _, latency in self.samples], 0.95)
+
+    @property
+    def output_ratio(self) -> float:
+        """Average number of output tokens produced per input token."""
+        ratios = [out / inp for inp, out, _ in self.samples if inp > 0]
+        return sum(ratios) / len(ratios) if ratios else 1.0
+
+    def _seconds_per_token(self) -> Optional[tuple[float, float]]:
+        """Fit per-token prefill and generation cost to the recent samples.
+
+        Solves ``latency = a * input_tokens + b * output_tokens`` by least
+        squares. When the samples cannot separate the two costs (a single
+        sample, or input/output sizes moving in lockstep), a shared
+        per-token cost is used for both.
+        """
+        if not self.samples:
+            return None
+
+        s_ii = sum(i * i for i, _, _ in self.samples)
+        s_io = sum(i * o for i, o, _ in self.samples)
+        s_oo = sum(o * o for _, o, _ in self.samples)
+        s_li = sum(lat * i for i, _, lat in self.samples)
+        s_lo = sum(lat * o for _, o, lat in self.samples)
+
+        det = s_ii * s_oo - s_io * s_io
+        if det > 1e-9 * max(s_ii * s_oo, 1.0):
+            a = (s_li * s_oo - s_lo * s_io) / det
+            b = (s_lo * s_ii - s_li * s_io) / det
+            if a > 0 and b > 0:
+                return a, b
+
+        total_tokens = sum(i + o for i, o, _ in self.samples)
+        if total_tokens <= 0:
+            return None
+        shared = sum(lat for _, _, lat in self.samples) / total_tokens
+        return shared, shared
+
+    @property
+    def prefill_rate(self) -> Optional[float]:
+        """Observed prompt processing rate in tokens per second."""
+        costs = self._seconds_per_token()
+        return 1.0 / costs[0] if costs else None
+
+    @property
+    def generation_rate(self) -> Optional[float]:
+        """Observed generation rate in tokens per second."""
+        costs = self._seconds_per_token()
+        return 1.0 / costs[1] if costs else None
+
+    def _tail_factor(self, costs: tuple[float, float]) -> float:
+        """Ratio between p95 and typical latency relative to the fitted model."""
+        ratios = [
+            latency / (costs[0] * inp + costs[1] * out)
+            for inp, out, latency in self.samples
+            if costs[0] * inp + costs[1] * out > 0
+        ]
+        if not ratios:
+            return 1.0
+        return max(1.0, _percentile(ratios, 0.95))
+
+    def predict_latency(self, input_tokens: int) -> Optional[float]:
+        """Predict the p95 latency in seconds for a prompt of the given size.
+
+        Returns:
+            Predicted latency, or None if there are no successful runs yet
+        """
+        costs = self._seconds_per_token()
+        if costs is None:
+            return None
+        expected_output = input_tokens * self.output_ratio
+        typical = costs[0] * input_tokens + costs[1] * expected_output
+        return typical * self._tail_factor(costs)
+
+    def to_dict(self) -> dict:
+        """Serialize the statistics to a JSON-compatible dictionary."""
+        return {
+            "samples": [list(sample) for sample in self.samples],
+            "outcomes": self.outcomes,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ModelStats":
+        """Deserialize statistics produced by ``to_dict``."""
+        return cls(
+            samples=[
+                (int(inp), int(out), float(lat))
+                for inp, out, lat in data.get("samples", [])
+            ],
+            outcomes=[bool(outcome) for outcome in data.get("outcomes", [])],
+        )
+
+
+class ModelStatsStore:
+    """JSON file backed store of per-model statistics."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """Initialize the store.
+
+        Args:
+            path: Statistics file location. Defaults to ``default_stats_path()``.
+        """
+        self.path = path or default_stats_path()
+        self._stats: dict[str, ModelStats] = self._load()
+
+    def _load(self) -> dict[str, ModelStats]:
+        """Load statistics, treating a missing or corrupt file as empty."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return {
+                name: ModelStats.from_dict(entry)
+                for name, entry in data.get("models", {}).items()
+            }
+        except (OSError, ValueError, TypeError, AttributeError):
+            return {}
+
+    def get(self, model_name: str) -> ModelStats:
+        """Return the statistics for a model, creating an empty entry if needed."""
+        return self._stats.setdefault(model_name, ModelStats())
+
+    def record(
+        self,
+        model_name: str,
+        success: bool,
+        input_tokens: int,
+        output_tokens: int = 0,
+        latency: float = 0.0,
+    ) -> None:
+        """Record a run and persist the updated statistics.
+
+        Several processes may share the statistics file, so the run is added
+        to the file's current content under a lock rather than to the copy
+        loaded at startup.
+        """
+        with self._locked():
+            self._stats = self._load()
+            self.get(model_name).record(success, input_tokens, output_tokens, latency)
+            self._write()
+
+    def save(self) -> None:
+        """Atomically write the statistics file."""
+        with self._locked():
+            self._write()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold an exclusive lock on the statistics file's sidecar lock file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        lock_path = self.path.with_name(self.path.name + ".lock")
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self) -> None:
+        """Write the statistics through a unique temporary file."""
+        payload = {
+            "version": 1,
+            "models": {name: stats.to_dict() for name, stats in self._stats.items()},
+        }
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                tmp_file.write(json.dumps(payload))
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+
+@dataclass
+class RoutingDecision:
+    """The model picked by the router and why."""
+
+    model_name: str
+    predicted_latency: Optional[float]
+    reason: str
+
+
+class ModelRouter:
+    """Pick the model most likely to meet a latency target for a given input."""
+
+    def __init__(
+        self,
+        candidates: Sequence[str],
+        store: ModelStatsStore,
+        max_error_rate: float = MAX_ERROR_RATE,
+    ):
+        """Initialize the router.
+
+        Args:
+            candidates: Model names in order of preference
+            store: Statistics store used for predictions
+            max_error_rate: Error rate above which a candidate is avoided
+        """
+        if not candidates:
+            raise ValueError("At least one candidate model is required for -m auto.")
+        if "auto" in candidates:
+            raise ValueError("'auto' cannot be used as a candidate model.")
+        self.candidates = list(candidates)
+        self.store = store
+        self.max_error_rate = max_error_rate
+
+    def select(
+        self, input_tokens: int, slo_seconds: Optional[float] = None
+    ) -> RoutingDecision:
+        """Select a candidate model for a prompt of the given size.
+
+        Candidates that have never been tried are explored first so every
+        model gets statistics. Otherwise the most preferred healthy candidate
+        whose predicted p95 latency meets the SLO wins; without an SLO, or if
+        no candidate meets it, the fastest healthy candidate is used.
+
+        Args:
+            input_tokens: Estimated prompt size in tokens
+            slo_seconds: Latency target in seconds, if any
+
+        Returns:
+            The routing decision
+        """
+        for name in self.candidates:
+            if self.store.get(name).attempts == 0:
+                return RoutingDecision(name, None, "no statistics yet, exploring")
+
+        predictions = []
+        for name in self.candidates:
+            stats = self.store.get(name)
+            predicted = stats.predict_latency(input_tokens)
+            if predicted is not None and stats.error_rate <= self.max_error_rate:
+                predictions.append((name, predicted))
+
+        if not predictions:
+            # Every candidate is failing; retry the least unreliable one.
+            name = min(self.candidates, key=lambda n: self.store.get(n).error_rate)
+            return RoutingDecision(
+                name,
+                self.store.get(name).predict_latency(input_tokens),
+                "all candidates unhealthy, using lowest error rate",
+            )
+
+        if slo_seconds is not None:
+            for name, predicted in predictions:
+                if predicted <= slo_seconds:
+                    return RoutingDecision(
+                        name, predicted, f"predicted to meet {slo_seconds:g}s SLO"
+                    )
+
+        name, predicted = min(predictions, key=lambda item: item[1])
+        reason = (
+            "fastest candidate (no candidate meets SLO)"
+            if slo_seconds is not None
+            else "fastest candidate"
+        )
+        return RoutingDecision(name, predicted, reason)
+
+
+def parse_candidates(value: Optional[str]) -> list[str]:
+    """Parse a comma-separated candidate list, falling back to defaults.
+
+    The list can also be configured with the COMMITCURRY_AUTO_MODELS
+    environment variable.
+    """
+    raw = value or os.getenv("COMMITCURRY_AUTO_MODELS") or ""
+    candidates = [name.strip() for name in raw.split(",") if name.strip()]
+    return candidates or list(DEFAULT_AUTO_CANDIDATES)
@@ -0,0 +1,203 @@
+"""Control of the reasoning ("thinking") phase of reasoning models."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from .tokens import estimate_tokens
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+
+class ThinkingBudgetExceededError(Exception):
+    """Raised when a model thinks longer than its thinking-token budget."""
+
+
+@dataclass(frozen=True)
+class ThinkingSupport:
+    """How a model exposes its reasoning.
+
+    Attributes:
+        inline: Reasoning arrives inside <think> tags in the answer text, so
+            it is stripped and the budget enforced client-side while streaming
+        can_disable: The provider accepts a switch turning thinking off
+        native_budget: The provider enforces a thinking-token budget itself
+    """
+
+    inline: bool
+    can_disable: bool = True
+    native_budget: bool = False
+
+
+# Model prefixes (Ollama models without the 'ollama:' prefix), most specific
+# matching prefix wins, as for the context window table in the factory.
+THINKING_MODELS = {
+    "deepseek-r1": ThinkingSupport(inline=True),
+    "qwen3": ThinkingSupport(inline=True),
+    "magistral": ThinkingSupport(inline=True),
+    "gemini-2.5-flash": ThinkingSupport(inline=False, native_budget=True),
+    "gemini-2.5-pro": ThinkingSupport(
+        inline=False, can_disable=False, native_budget=True
+    ),
+}
+
+
+@dataclass(frozen=True)
+class ThinkingControl:
+    """Thinking settings for a run.
+
+    Attributes:
+        support: How the model exposes its reasoning
+        enabled: False to disable thinking, None for the model default
+        budget: Maximum thinking tokens, or None for no limit
+    """
+
+    support: ThinkingSupport
+    enabled: Optional[bool] = None
+    budget: Optional[int] = None
+
+
+@dataclass
+class ThinkingUsage:
+    """Estimated thinking and answer tokens of a run."""
+
+    thinking_tokens: int = 0
+    answer_tokens: int = 0
+    retried_without_thinking: bool = False
+
+
+def get_thinking_support(model_name: str) -> Optional[ThinkingSupport]:
+    """Return how a model exposes its reasoning, or None if it does not think.
+
+    Args:
+        model_name: The model identifier (e.g., 'ollama:deepseek-r1:7b')
+    """
+    bare_name = model_name[7:] if model_name.startswith("ollama:") else model_name
+    for prefix in sorted(THINKING_MODELS, key=len, reverse=True):
+        if bare_name.startswith(prefix):
+            return THINKING_MODELS[prefix]
+    return None
+
+
+def thinking_control(
+    model_name: str, enabled: Optional[bool] = None, budget: Optional[int] = None
+) -> Optional[ThinkingControl]:
+    """Build the thinking settings for a model.
+
+    Args:
+        model_name: The model identifier
+        enabled: False to disable thinking, None for the model default
+        budget: Maximum thinking tokens, or None for no limit
+
+    Returns:
+        The settings, or None for models without a thinking phase
+
+    Raises:
+        ValueError: If thinking cannot be disabled for the model
+    """
+    support = get_thinking_support(model_name)
+    if support is None:
+        return None
+    if enabled is False and not support.can_disable:
+        raise ValueError(f"Thinking cannot be disabled for '{model_name}'.")
+    return ThinkingControl(support=support, enabled=enabled, budget=budget)
+
+
+class ThinkStripper:
+    """Separate inline <think> blocks from the answer in a text stream.
+
+    Feed chunks as they arrive; tags split across chunks are handled. Some
+    chat templates open the think block in the prompt, so a closing tag
+    without an opening one turns everything before it into thinking.
+    """
+
+    def __init__(self, budget: Optional[int] = None):
+        """Initialize the stripper.
+
+        Args:
+            budget: Maximum thinking tokens before ``feed`` raises
+        """
+        self.budget = budget
+        self.thinking_tokens = 0
+        self._answer: list[str] = []
+        self._pending = ""
+        self._in_think = False
+        self._seen_tag = False
+        # Whether the chat template opened the think block
+        self.template_opened = False
+
+    @property
+    def undecided(self) -> bool:
+        """Whether the answer so far may still turn out to be thinking.
+
+        Until the first tag, text is passed through as answer, but a closing
+        tag would reclassify it as a think block opened by the chat template.
+        """
+        return not self._seen_tag
+
+    def feed(self, text: str) -> str:
+        """Consume the next chunk of model output.
+
+        Returns:
+            The answer text completed by this chunk
+
+        Raises:
+            ThinkingBudgetExceededError: If thinking exceeds the budget
+        """
+        self._pending += text
+        answer_length = len(self._answer)
+        while self._pending:
+            tag = THINK_CLOSE if self._in_think else THINK_OPEN
+            index = self._pending.find(tag)
+            closing_index = -1
+            if not self._in_think and not self._seen_tag:
+                closing_index = self._pending.find(THINK_CLOSE)
+            if closing_index != -1 and (index == -1 or closing_index < index):
+                # Think block opened by the chat template
+                self._add_thinking("".join(self._answer))
+                self._answer = []
+                answer_length = 0
+                self._add_thinking(self._pending[:closing_index])
+                self._pending = self._pending[closing_index + len(THINK_CLOSE) :]
+                self._seen_tag = True
+                self.template_opened = True
+                continue
+            if index == -1:
+                keep = _partial_tag_length(self._pending, tag)
+                if not self._in_think and not self._seen_tag:
+                    keep = max(keep, _partial_tag_length(self._pending, THINK_CLOSE))
+                self._emit(self._pending[: len(self._pending) - keep])
+                self._pending = self._pending[len(self._pending) - keep :]
+                break
+            self._emit(self._pending[:index])
+            self._pending = self._pending[index + len(tag) :]
+            self._in_think = not self._in_think
+            self._seen_tag = True
+        return "".join(self._answer[answer_length:])
+
+    def finish(self) -> str:
+        """Return the answer with all thinking removed."""
+        self._emit(self._pending)
+        self._pending = ""
+        return "".join(self._answer).strip()
+
+    def _emit(self, text: str) -> None:
+        if self._in_think:
+            self._add_thinking(text)
+        else:
+            self._answer.append(text)
+
+    def _add_thinking(self, text: str) -> None:
+        self.thinking_tokens += estimate_tokens(text)
+        if self.budget is not None and self.thinking_tokens > self.budget:
+            raise ThinkingBudgetExceededError(
+                f"Thinking exceeded the budget of {self.budget} tokens"
+            )
+
+
+def _partial_tag_length(text: str, tag: str) -> int:
+    """Return the length of the longest suffix of text that starts the tag."""
+    for length in range(min(len(tag) - 1, len(text)), 0, -1):
+        if tag.startswith(text[-length:]):
+            return length
+    return 0
@@ -0,0 +1,302 @@
+"""Watch mode: re-tailor a CV whenever its inputs change."""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Callable, Optional
+
+from .cv_optimizer import (
+    CVOptimizer,
+    OptimizationCancelledError,
+    OptimizationTimeoutError,
+)
+from .preflight import ContextWindowExceededError, plan_request
+from .routing import ModelStatsStore
+from .tokens import estimate_tokens
+
+# Seconds the watched files must stay unchanged before a run starts, so a
+# burst of saves (or an editor's write-then-rename) triggers a single run.
+DEFAULT_DEBOUNCE = 0.5
+
+# Seconds between checks of the watched files' modification times.
+POLL_INTERVAL = 0.1
+
+
+def atomic_write(path: Path, content: str) -> None:
+    """Write a file so that readers see either the old or the new content.
+
+    The content goes to a temporary file in the same directory, which then
+    replaces the target in a single rename.
+    """
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+            tmp_file.write(content)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+class FileWatcher:
+    """Detect settled changes to a set of files by polling their metadata."""
+
+    def __init__(self, paths: Sequence[Path], debounce: float = DEFAULT_DEBOUNCE):
+        """Initialize the watcher with the files' current state.
+
+        Args:
+            paths: Files to watch
+            debounce: Seconds without further changes before a change is
+                reported
+        """
+        self.paths = list(paths)
+        self.debounce = debounce
+        self._signatures = self._snapshot()
+        self._changed_at: Optional[float] = None
+
+    def _snapshot(self) -> list[Optional[tuple[int, int]]]:
+        """Return (mtime, size) of every file, or None for missing files."""
+        signatures: list[Optional[tuple[int, int]]] = []
+        for path in self.paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                signatures.append(None)
+            else:
+                signatures.append((stat.st_mtime_ns, stat.st_size))
+        return signatures
+
+    def poll(self, now: Optional[float] = None) -> bool:
+        """Return True once a change has settled for ``debounce`` seconds.
+
+        Every further change restarts the debounce period.
+        """
+        now = time.monotonic() if now is None else now
+        signatures = self._snapshot()
+        if signatures != self._signatures:
+            self._signatures = signatures
+            self._changed_at = now
+            return False
+        if self._changed_at is not None and now - self._changed_at >= self.debounce:
+            self._changed_at = None
+            return True
+        return False
+
+
+class WatchSession:
+    """Keep an optimizer warm and re-tailor a CV whenever its inputs change.
+
+    A run starts when the content of the CV or job file actually changed
+    (saves that leave the content as it was are ignored). A newer edit
+    cancels the run in flight, and each result is written atomically to the
+    output file.
+    """
+
+    def __init__(
+        self,
+        optimizer: CVOptimizer,
+        model_name: str,
+        cv_file: Path,
+        job_file: Path,
+        output_file: Path,
+        edits: bool = False,
+        timeout: Optional[float] = None,
+        debounce: float = DEFAULT_DEBOUNCE,
+        stats_store: Optional[ModelStatsStore] = None,
+        notify: Optional[Callable[[str], None]] = None,
+    ):
+        """Initialize the session.
+
+        Args:
+            optimizer: Optimizer reused for every run
+            model_name: The model identifier, used for pre-flight checks
+            cv_file: CV file to watch
+            job_file: Job description file to watch
+            output_file: File the tailored CV is written to
+            edits: Request section-level edits instead of the whole CV
+            timeout: Optional time limit in seconds for each run
+            debounce: Seconds the files must be stable before a run starts
+            stats_store: Optional run statistics to record runs in
+            notify: Callback receiving progress messages
+        """
+        self.optimizer = optimizer
+        self.model_name = model_name
+        self.cv_file = cv_file
+        self.job_file = job_file
+        self.output_file = output_file
+        self.edits = edits
+        self.timeout = timeout
+        self.stats_store = stats_store
+        self.notify = notify or (lambda message: None)
+        self.watcher = FileWatcher([cv_file, job_file], debounce)
+        self.runs = 0
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._thread: Optional[threading.Thread] = None
+        self._scheduled_digest: Optional[str] = None
+        self._written_digest: Optional[str] = None
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Tailor the CV now and after every change until stopped.
+
+        Args:
+            stop: Event ending the session when set; without it the session
+                runs until interrupted
+        """
+        stop = stop or threading.Event()
+        self.notify(f"👀 Watching {self.cv_file} and {self.job_file}")
+        self.check()
+        try:
+            while not stop.wait(POLL_INTERVAL):
+                if self.watcher.poll():
+                    self.check()
+        finally:
+            self._cancel_running()
+
+    def check(self) -> None:
+        """Start a run if the inputs differ from the last scheduled run."""
+        try:
+            cv_content = self.cv_file.read_text(encoding="utf-8")
+            job_description = self.job_file.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            self.notify(f"⚠️ Cannot read inputs, waiting for the next change: {e}")
+            return
+
+        digest = hashlib.sha256(f"{cv_content}\0{job_description}".encode()).hexdigest()
+        if digest == self._scheduled_digest:
+            return
+
+        self._cancel_running()
+        self._scheduled_digest = digest
+        if digest == self._written_digest:
+            # Changes were reverted to the content of the last written result
+            return
+
+        with self._lock:
+            generation = self._generation
+        self._thread = threading.Thread(
+            target=self._tailor,
+            args=(cv_content, job_description, digest, generation),
+            name="commitcurry-watch",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def wait(self) -> None:
+        """Wait for the run in flight, if any, to finish."""
+        if self._thread is not None:
+            self._thread.join()
+
+    def _is_current(self, generation: int) -> bool:
+        """Return whether a run has not been superseded."""
+        with self._lock:
+            return generation == self._generation
+
+    def _cancel_running(self) -> None:
+        """Supersede the run in flight and wait until it has stopped."""
+        with self._lock:
+            self._generation += 1
+        thread = self._thread
+        while thread is not None and thread.is_alive():
+            # Repeat: a cancel arriving before the request starts is lost
+            self.optimizer.cancel()
+            thread.join(POLL_INTERVAL)
+        self._thread = None
+
+    def _tailor(
+        self, cv_content: str, job_description: str, digest: str, generation: int
+    ) -> None:
+        """Run one optimization and write its result unless superseded."""
+        self.runs += 1
+        self.notify("✨ Inputs changed, tailoring CV...")
+        input_tokens = estimate_tokens(cv_content) + estimate_tokens(job_description)
+        start_time = time.perf_counter()
+        try:
+            template = (
+                self.optimizer.edits_prompt_template
+                if self.edits
+                else self.optimizer.prompt_template
+            )
+            plan = plan_request(self.model_name, cv_content, job_description, template)
+            input_tokens = plan.prompt_tokens
+            self._ensure_num_ctx(plan.num_ctx)
+            if not self._is_current(generation):
+                return
+            deadline = (
+                time.monotonic() + self.timeout if self.timeout is not None else None
+            )
+            optimize = (
+                self.optimizer.optimize_cv_edits
+                if self.edits
+                else self.optimizer.optimize_cv
+            )
+            optimized_cv = optimize(
+                plan.cv_content, plan.job_description, deadline=deadline
+            )
+        except OptimizationCancelledError:
+            self.notify("⏹️ Superseded by a newer edit")
+            return
+        except ContextWindowExceededError as e:
+            self.notify(f"❌ Input too large: {e}")
+            return
+        except OptimizationTimeoutError:
+            self._record(False, input_tokens)
+            self._allow_retry(generation)
+            self.notify(f"❌ Timed out after {self.timeout:g}s")
+            return
+        except Exception as e:
+            self._record(False, input_tokens)
+            self._allow_retry(generation)
+            self.notify(f"❌ Optimization failed: {e}")
+            return
+
+        with self._lock:
+            if generation != self._generation:
+                return
+            atomic_write(self.output_file, optimized_cv + "\n")
+            self._written_digest = digest
+        latency = time.perf_counter() - start_time
+        self._record(True, input_tokens, estimate_tokens(optimized_cv), latency)
+        self.notify(f"✅ Wrote {self.output_file} ({latency:.1f}s)")
+
+    def _allow_retry(self, generation: int) -> None:
+        """Let the next save retry a failed run, even without content changes."""
+        with self._lock:
+            if generation == self._generation:
+                self._scheduled_digest = self._written_digest
+
+    def _ensure_num_ctx(self, num_ctx: Optional[int]) -> None:
+        """Grow the Ollama context window if a run needs more than before."""
+        options = getattr(
+            getattr(self.optimizer.agent, "prompt_driver", None), "options", None
+        )
+        if num_ctx and isinstance(options, dict):
+            options["num_ctx"] = max(options.get("num_ctx", 0), num_ctx)
+
+    def _record(
+        self,
+        success: bool,
+        input_tokens: int,
+        output_tokens: int = 0,
+        latency: float = 0.0,
+    ) -> None:
+        """Record run statistics for model routing without failing the run."""
+        if self.stats_store is None:
+            return
+        try:
+            self.stats_store.record(
+                self.model_name, success, input_tokens, output_tokens, latency
+            )
+        except OSError:
+            pass
@@ -0,0 +1,148 @@
+"""Shared pytest fixtures for CommitCurry tests."""
+
+import http.server
+import json
+import socketserver
+import threading
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+# Returns the answer chunks for a chat request
+ChunkGenerator = Callable[[dict], Iterable[str]]
+
+
+class ScriptedAgent:
+    """Agent stand-in returning scripted responses in order."""
+
+    def __init__(self, responses: list[str]):
+        self.responses = list(responses)
+        self.prompts: list[str] = []
+        self.prompt_driver = None
+
+    def run(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+
+class OllamaStandIn:
+    """A minimal Ollama server answering tags, ps and chat requests.
+
+    Chat answers come from a chunk generator called with the request; they
+    are streamed chunk by chunk as NDJSON unless the request disables
+    streaming. Every chat request is kept in ``requests``.
+    """
+
+    def __init__(
+        self,
+        chunks: ChunkGenerator,
+        models: Iterable[str] = (),
+        loaded: Iterable[str] = (),
+    ):
+        self.chunks = chunks
+        self.models = list(models)
+        self.loaded = list(loaded)
+        self.requests: list[dict] = []
+        stand_in = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                if self.path == "/api/tags":
+                    self._reply({"models": [{"model": m} for m in stand_in.models]})
+                elif self.path == "/api/ps":
+                    self._reply({"models": [{"model": m} for m in stand_in.loaded]})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length))
+                stand_in.requests.append(request)
+                chunks = stand_in.chunks(request)
+                if not request.get("stream", True):
+                    self._reply(_chat_chunk(request, "".join(chunks), done=True))
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                try:
+                    for text in chunks:
+                        self._write_line(_chat_chunk(request, text, done=False))
+                    self._write_line(_chat_chunk(request, "", done=True))
+                except OSError:
+                    pass  # client went away
+
+            def _reply(self, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_line(self, payload: dict) -> None:
+                self.wfile.write(json.dumps(payload).encode() + b"\n")
+                self.wfile.flush()
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _chat_chunk(request: dict, text: str, done: bool) -> dict:
+    return {
+        "model": request["model"],
+        "created_at": "2024-01-01T00:00:00Z",
+        "message": {"role": "assistant", "content": text},
+        "done": done,
+    }
+
+
+@pytest.fixture(autouse=True)
+def isolated_stats_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep model routing statistics out of the user's home directory."""
+    stats_file = tmp_path / "model_stats.json"
+    monkeypatch.setenv("COMMITCURRY_STATS_FILE", str(stats_file))
+    return stats_file
+
+
+@pytest.fixture
+def scripted_agent() -> type[ScriptedAgent]:
+    """Agent stand-in class; construct it with the responses to return."""
+    return ScriptedAgent
+
+
+@pytest.fixture
+def ollama_stand_in() -> Iterator[Callable[..., OllamaStandIn]]:
+    """Start Ollama stand-ins on demand; all are stopped after the test.
+
+    Call the returned function with a chunk generator, and optionally the
+    available and loaded models, to start a server.
+    """
+    servers: list[OllamaStandIn] = []
+
+    def start(
+        chunks: ChunkGenerator,
+        models: Iterable[str] = (),
+        loaded: Iterable[str] = (),
+    ) -> OllamaStandIn:
+        server = OllamaStandIn(chunks, models=models, loaded=loaded)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,123 @@
+"""Tests for optimization deadlines and cancellation."""
+
+import http.server
+import socketserver
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from commitcurry.cv_optimizer import (
+    CVOptimizer,
+    OptimizationCancelledError,
+    OptimizationTimeoutError,
+)
+from commitcurry.providers.factory import AgentFactory
+
+
+class SlowAgent:
+    """Agent stand-in whose run blocks until released."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.prompt_driver = None
+
+    def run(self, prompt: str) -> str:
+        time.sleep(self.delay)
+        return "Optimized CV"
+
+
+class HangingOllamaHandler(http.server.BaseHTTPRequestHandler):
+    """Ollama stand-in that never answers chat requests."""
+
+    disconnected = threading.Event()
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        # Block until the client goes away
+        if self.rfile.read(1) == b"":
+            type(self).disconnected.set()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def hanging_ollama() -> Iterator[str]:
+    """Start a hanging Ollama stand-in server and return its URL."""
+    HangingOllamaHandler.disconnected.clear()
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), HangingOllamaHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_optimize_cv_finishes_before_deadline():
+    """Test that a fast run returns normally with a deadline set."""
+    optimizer = CVOptimizer(agent=SlowAgent(0.01))
+    result = optimizer.optimize_cv("CV", "Job", deadline=time.monotonic() + 5)
+    assert result == "Optimized CV"
+
+
+def test_optimize_cv_times_out():
+    """Test that a slow run raises a distinct timeout error."""
+    optimizer = CVOptimizer(agent=SlowAgent(5))
+
+    start = time.monotonic()
+    with pytest.raises(OptimizationTimeoutError):
+        optimizer.optimize_cv("CV", "Job", deadline=time.monotonic() + 0.2)
+    assert time.monotonic() - start < 2
+
+
+def test_optimize_cv_expired_deadline():
+    """Test that an already expired deadline fails immediately."""
+    optimizer = CVOptimizer(agent=SlowAgent(5))
+    with pytest.raises(OptimizationTimeoutError):
+        optimizer.optimize_cv("CV", "Job", deadline=time.monotonic() - 1)
+
+
+def test_optimize_cv_cancel_from_another_thread():
+    """Test that cancel() interrupts an in-flight optimization."""
+    optimizer = CVOptimizer(agent=SlowAgent(5))
+    threading.Timer(0.2, optimizer.cancel).start()
+
+    start = time.monotonic()
+    with pytest.raises(OptimizationCancelledError):
+        optimizer.optimize_cv("CV", "Job")
+    assert time.monotonic() - start < 2
+
+
+def test_timeout_aborts_server_side_request(hanging_ollama: str):
+    """Test that timing out closes the connection to the Ollama server."""
+    agent = AgentFactory.create_agent(
+        "ollama:qwen3:8b", base_url=hanging_ollama, timeout=30
+    )
+    optimizer = CVOptimizer(agent=agent)
+
+    with pytest.raises(OptimizationTimeoutError):
+        optimizer.optimize_cv("CV", "Job", deadline=time.monotonic() + 0.5)
+
+    assert HangingOllamaHandler.disconnected.wait(5)
+
+
+def test_driver_client_is_rebuilt_after_abort(hanging_ollama: str):
+    """Test that the driver gets a fresh, configured client after an abort."""
+    agent = AgentFactory.create_agent(
+        "ollama:qwen3:8b", base_url=hanging_ollama, timeout=30
+    )
+    optimizer = CVOptimizer(agent=agent)
+    original_client = agent.prompt_driver.client
+
+    with pytest.raises(OptimizationTimeoutError):
+        optimizer.optimize_cv("CV", "Job", deadline=time.monotonic() + 0.3)
+    with pytest.raises(OptimizationTimeoutError):
+        optimizer.optimize_cv("CV", "Job", deadline=time.monotonic() + 0.3)
+
+    new_client = agent.prompt_driver.client
+    assert new_client is not original_client
+    assert new_client._client.timeout.read == 30
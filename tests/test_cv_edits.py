@@ -0,0 +1,149 @@
+"""Tests for edit-list CV optimization."""
+
+import json
+
+from commitcurry.cv_edits import (
+    CVEdit,
+    apply_edits,
+    format_edits_prompt,
+    parse_edit_list,
+    split_sections,
+)
+from commitcurry.cv_optimizer import CVOptimizer
+
+CV = """John Doe
+john@example.com
+
+## Experience
+
+### Engineer at Acme
+- Built things
+
+## Education
+
+BSc Computer Science
+"""
+
+
+def edit_response(*edits: dict) -> str:
+    """Build an edit-list JSON response."""
+    return json.dumps({"edits": list(edits)})
+
+
+def test_split_sections_at_headings():
+    """Test that the preamble and every heading start a section."""
+    sections = split_sections(CV)
+
+    assert [section.section_id for section in sections] == ["s1", "s2", "s3", "s4"]
+    assert sections[0].text == "John Doe\njohn@example.com"
+    assert sections[2].text == "### Engineer at Acme\n- Built things"
+    assert sections[3].text == "## Education\n\nBSc Computer Science"
+
+
+def test_split_sections_ignores_headings_in_code_blocks():
+    """Test that '#' lines inside fenced code do not start sections."""
+    sections = split_sections("## Projects\n```\n# comment\n```\n")
+    assert len(sections) == 1
+
+
+def test_apply_no_edits_keeps_cv():
+    """Test that an empty edit list reproduces the original CV."""
+    assert apply_edits(split_sections(CV), []) == CV.strip()
+
+
+def test_apply_edits():
+    """Test replace, insert and delete edits."""
+    sections = split_sections(CV)
+    edits = [
+        CVEdit("replace", "s3", "### Senior Engineer at Acme\n- Led things"),
+        CVEdit("insert", "s3", "## Skills\n- Python"),
+        CVEdit("delete", "s2"),
+    ]
+
+    assert apply_edits(sections, edits) == (
+        "John Doe\njohn@example.com\n\n"
+        "### Senior Engineer at Acme\n- Led things\n\n"
+        "## Skills\n- Python\n\n"
+        "## Education\n\nBSc Computer Science"
+    )
+
+
+def test_parse_edit_list_valid():
+    """Test parsing a valid, fenced edit list."""
+    text = (
+        "```json\n"
+        + edit_response(
+            {"op": "replace", "section": "s3", "content": " New role "},
+            {"op": "delete", "section": "s4"},
+        )
+        + "\n```"
+    )
+
+    assert parse_edit_list(text, split_sections(CV)) == [
+        CVEdit("replace", "s3", "New role"),
+        CVEdit("delete", "s4", ""),
+    ]
+
+
+def test_parse_edit_list_rejects_malformed_lists():
+    """Test that any invalid entry rejects the whole edit list."""
+    sections = split_sections(CV)
+    invalid = [
+        "not json",
+        json.dumps({"cvs": []}),
+        edit_response({"op": "rewrite", "section": "s1", "content": "x"}),
+        edit_response({"op": "replace", "section": "s9", "content": "x"}),
+        edit_response({"op": "replace", "section": "s1", "content": "  "}),
+        edit_response({"op": "insert", "section": "s1"}),
+        edit_response(
+            {"op": "replace", "section": "s1", "content": "x"},
+            {"op": "delete", "section": "s1"},
+        ),
+    ]
+
+    for text in invalid:
+        assert parse_edit_list(text, sections) is None, text
+
+
+def test_edits_prompt_labels_sections(scripted_agent):
+    """Test that the prompt shows section ids and the schema."""
+    optimizer = CVOptimizer(agent=scripted_agent([]))
+    prompt = format_edits_prompt(optimizer.edits_prompt_template, CV, " Job ")
+
+    assert "[s1]\nJohn Doe" in prompt
+    assert "[s4]\n## Education" in prompt
+    assert '"edits"' in prompt
+    assert prompt.rstrip().endswith("Job")
+
+
+def test_optimize_cv_edits_applies_edits(scripted_agent):
+    """Test that only edited sections come from the model."""
+    agent = scripted_agent(
+        [edit_response({"op": "replace", "section": "s3", "content": "### Lead"})]
+    )
+    optimizer = CVOptimizer(agent=agent)
+
+    result = optimizer.optimize_cv_edits(CV, "Lead role")
+
+    assert result.startswith("John Doe\njohn@example.com\n\n## Experience\n\n### Lead")
+    assert result.endswith("BSc Computer Science")
+    assert len(agent.prompts) == 1
+
+
+def test_optimize_cv_edits_falls_back_to_full_regeneration(scripted_agent):
+    """Test that a malformed edit list triggers a full request."""
+    agent = scripted_agent(["Sure! Here are the edits: none", "Full CV"])
+    optimizer = CVOptimizer(agent=agent)
+
+    assert optimizer.optimize_cv_edits(CV, "Job") == "Full CV"
+    assert len(agent.prompts) == 2
+    assert "Original Resume" in agent.prompts[1]
+    assert "[s1]" not in agent.prompts[1]
+
+
+def test_optimize_cv_edits_falls_back_when_everything_is_deleted(scripted_agent):
+    """Test that an edit list deleting the whole CV is not accepted."""
+    deletes = [{"op": "delete", "section": f"s{n}"} for n in range(1, 5)]
+    agent = scripted_agent([edit_response(*deletes), "Full CV"])
+
+    assert CVOptimizer(agent=agent).optimize_cv_edits(CV, "Job") == "Full CV"
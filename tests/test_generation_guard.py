@@ -0,0 +1,155 @@
+"""Tests for the streaming generation guard."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from commitcurry.cv_optimizer import CVOptimizer
+from commitcurry.generation_guard import (
+    GenerationGuard,
+    GuardSettings,
+    OutputBudgetExceededError,
+    RepetitionLoopError,
+    adjusted_sampling,
+)
+from commitcurry.main import main
+from commitcurry.providers.factory import AgentFactory
+
+LOOP_LINE = "- Led the migration of the billing platform to Kubernetes\n"
+
+
+def looping_chunks(request: dict, loop_on_retry: bool = False) -> list[str]:
+    """Fall into a repetition loop.
+
+    Requests with a repeat penalty get a clean answer unless
+    ``loop_on_retry`` is set.
+    """
+    chunks = ["# Tailored CV\n", "Summary line\n"]
+    if "repeat_penalty" not in request["options"] or loop_on_retry:
+        chunks.extend(LOOP_LINE for _ in range(500))
+    else:
+        chunks.append("- Built the billing platform\n")
+    return chunks
+
+
+def test_guard_detects_repetition_loop():
+    """Test that a repeated n-gram aborts with the text before the loop."""
+    guard = GenerationGuard(max_tokens=10_000)
+    guard.feed("# CV\nIntro\n")
+    with pytest.raises(RepetitionLoopError) as excinfo:
+        for _ in range(10):
+            # Split mid-word, as streamed chunks are
+            guard.feed(LOOP_LINE[:20])
+            guard.feed(LOOP_LINE[20:])
+
+    assert excinfo.value.prefix == "# CV\nIntro\n" + LOOP_LINE.rstrip()
+
+
+def test_guard_accepts_ordinary_cv():
+    """Test that varied text with short repeated phrases passes."""
+    guard = GenerationGuard(max_tokens=10_000)
+    for year in range(2010, 2024):
+        guard.feed(f"- Jan {year} - Dec {year}: Software Engineer, Team {year}\n")
+
+
+def test_guard_enforces_output_budget():
+    """Test that the budget aborts with the complete lines seen so far."""
+    guard = GenerationGuard(max_tokens=5)
+    guard.feed("First line\n")
+    with pytest.raises(OutputBudgetExceededError) as excinfo:
+        guard.feed("second line that goes on")
+
+    assert excinfo.value.prefix == "First line"
+
+
+def test_output_budget_scales_with_cv():
+    """Test the budget derived from the CV length."""
+    settings = GuardSettings(budget_ratio=2.0, min_budget=100)
+
+    assert settings.output_budget("word " * 10) == 100
+    assert settings.output_budget("word " * 200) == 400
+    assert settings.output_budget("word " * 200, answers=3) == 1200
+
+
+def test_adjusted_sampling_restores_options():
+    """Test that retry sampling is temporary."""
+    agent = AgentFactory.create_agent("ollama:qwen2.5:7b")
+    driver = agent.prompt_driver
+    before = dict(driver.options)
+
+    with adjusted_sampling(driver, GuardSettings()):
+        assert driver.options["temperature"] == 0.7
+        assert driver.options["repeat_penalty"] == 1.2
+
+    assert driver.options == before
+
+
+def test_optimizer_retries_loop_with_adjusted_sampling(ollama_stand_in):
+    """Test that a looping answer is abandoned and retried."""
+    looping_ollama = ollama_stand_in(looping_chunks)
+    agent = AgentFactory.create_agent("ollama:qwen2.5:7b", base_url=looping_ollama.url)
+    optimizer = CVOptimizer(agent=agent, guard=GuardSettings())
+
+    result = optimizer.optimize_cv("John Doe\nEngineer", "Job")
+
+    assert result == "# Tailored CV\nSummary line\n- Built the billing platform"
+    first, second = looping_ollama.requests
+    assert "repeat_penalty" not in first["options"]
+    assert second["options"]["repeat_penalty"] == 1.2
+    assert "repeat_penalty" not in agent.prompt_driver.options
+
+
+def test_optimizer_returns_valid_prefix_when_retry_loops(ollama_stand_in):
+    """Test that the prefix before the loop is returned as a last resort."""
+    looping_ollama = ollama_stand_in(
+        lambda request: looping_chunks(request, loop_on_retry=True)
+    )
+    agent = AgentFactory.create_agent("ollama:qwen2.5:7b", base_url=looping_ollama.url)
+    optimizer = CVOptimizer(agent=agent, guard=GuardSettings())
+
+    result = optimizer.optimize_cv("John Doe\nEngineer", "Job")
+
+    assert result == "# Tailored CV\nSummary line\n" + LOOP_LINE.rstrip()
+    assert len(looping_ollama.requests) == 2
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_main_command_guard(mock_create_optimizer, mock_create_agent, tmp_path):
+    """Test that --guard enables the generation guard."""
+    mock_optimizer = mock_create_optimizer.return_value
+    mock_optimizer.optimize_cv.return_value = "Optimized CV content"
+    cv_file = tmp_path / "cv.txt"
+    job_file = tmp_path / "job.txt"
+    cv_file.write_text("John Doe")
+    job_file.write_text("Backend Developer")
+
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = CliRunner().invoke(main, ["--guard", str(cv_file), str(job_file)])
+
+    assert result.exit_code == 0
+    assert isinstance(mock_optimizer.guard, GuardSettings)
+
+
+def test_main_command_guard_ignores_template_opened_thinking(ollama_stand_in, tmp_path):
+    """Test that reasoning before a bare </think> does not count as answer."""
+    reasoning = ["Okay, let me think about this resume and the job.\n"] * 400
+    thinking_ollama = ollama_stand_in(
+        lambda request: [*reasoning, "</think>\n\n", "# Tailored CV"]
+    )
+    cv_file = tmp_path / "cv.txt"
+    job_file = tmp_path / "job.txt"
+    cv_file.write_text("John Doe")
+    job_file.write_text("Backend Developer")
+
+    with patch.dict(os.environ, {"OLLAMA_URL": thinking_ollama.url}):
+        result = CliRunner().invoke(
+            main,
+            ["-m", "ollama:deepseek-r1:7b", "--guard", str(cv_file), str(job_file)],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert result.stdout.strip() == "# Tailored CV"
+    assert len(thinking_ollama.requests) == 1
@@ -1,5 +1,6 @@
 """Tests for the main module."""
 
+import json
 import os
 from pathlib import Path
 from unittest.mock import patch
@@ -172,3 +173,224 @@ def test_main_command_directory_instead_of_file(tmp_path: Path) -> None:
 
     assert result.exit_code != 0
     assert "Path is not a file" in result.output
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_main_command_auto_model_routing(
+    mock_create_optimizer, mock_create_agent, tmp_path: Path, isolated_stats_file
+) -> None:
+    """Test that '-m auto' picks a candidate and records its statistics."""
+    mock_optimizer = mock_create_optimizer.return_value
+    mock_optimizer.optimize_cv.return_value = "Optimized CV content"
+
+    cv_file = tmp_path / "test_cv.txt"
+    job_file = tmp_path / "test_job.txt"
+    cv_file.write_text("John Doe\nSoftware Engineer")
+    job_file.write_text("Senior Developer Position")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "-v",
+            "-m",
+            "auto",
+            "--candidates",
+            "ollama:qwen3:8b,gemini-2.5-flash",
+            "--slo",
+            "30",
+            str(cv_file),
+            str(job_file),
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "Auto-selected ollama:qwen3:8b" in result.output
+    mock_create_agent.assert_called_once_with("ollama:qwen3:8b")
+    stats = json.loads(isolated_stats_file.read_text())
+    assert stats["models"]["ollama:qwen3:8b"]["outcomes"] == [True]
+    # Predictions use the same measure as the recorded prompt size
+    recorded_tokens = stats["models"]["ollama:qwen3:8b"]["samples"][0][0]
+    assert recorded_tokens > 100
+
+
+def test_main_command_configuration_error_not_recorded(
+    tmp_path: Path, isolated_stats_file
+) -> None:
+    """Test that a misspelt model does not count as a failed model run."""
+    cv_file = tmp_path / "test_cv.txt"
+    job_file = tmp_path / "test_job.txt"
+    cv_file.write_text("John Doe")
+    job_file.write_text("Senior Developer Position")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main, ["-m", "gemnii-2.5-flash", str(cv_file), str(job_file)]
+    )
+
+    assert result.exit_code == 1
+    assert "Configuration Error" in result.output
+    assert not isolated_stats_file.exists()
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+def test_main_command_driver_failure_not_recorded(
+    mock_create_agent, tmp_path: Path, isolated_stats_file
+) -> None:
+    """Test that a driver that cannot be created does not count as a run."""
+    mock_create_agent.side_effect = ConnectionError("Ollama is not reachable")
+    cv_file = tmp_path / "test_cv.txt"
+    job_file = tmp_path / "test_job.txt"
+    cv_file.write_text("John Doe")
+    job_file.write_text("Senior Developer Position")
+
+    result = CliRunner().invoke(
+        main, ["-m", "ollama:qwen3:8b", str(cv_file), str(job_file)]
+    )
+
+    assert result.exit_code == 1
+    assert "Connection Error" in result.output
+    assert not isolated_stats_file.exists()
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+def test_main_command_prompt_too_large(mock_create_agent, tmp_path: Path) -> None:
+    """Test that oversized inputs fail before any agent is created."""
+    cv_file = tmp_path / "test_cv.txt"
+    job_file = tmp_path / "test_job.txt"
+    cv_file.write_text("Built scalable services. " * 5000)
+    job_file.write_text("Senior Developer Position")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main, ["-m", "ollama:gemma2:9b", str(cv_file), str(job_file)]
+    )
+
+    assert result.exit_code == 1
+    assert "Input too large" in result.output
+    mock_create_agent.assert_not_called()
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_main_command_timeout(
+    mock_create_optimizer, mock_create_agent, tmp_path: Path
+) -> None:
+    """Test that a timed out run exits with a distinct exit code."""
+    from commitcurry.cv_optimizer import OptimizationTimeoutError
+
+    mock_optimizer = mock_create_optimizer.return_value
+    mock_optimizer.optimize_cv.side_effect = OptimizationTimeoutError("too slow")
+
+    cv_file = tmp_path / "test_cv.txt"
+    job_file = tmp_path / "test_job.txt"
+    cv_file.write_text("John Doe\nSoftware Engineer")
+    job_file.write_text("Senior Developer Position")
+
+    runner = CliRunner()
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = runner.invoke(main, ["--timeout", "1.5", str(cv_file), str(job_file)])
+
+    assert result.exit_code == 124
+    assert "Timed out after 1.5s" in result.output
+    mock_create_agent.assert_called_once_with("gemini-2.5-flash", timeout=1.5)
+    assert mock_optimizer.optimize_cv.call_args.kwargs["deadline"] is not None
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_main_command_packed_jobs(
+    mock_create_optimizer, mock_create_agent, tmp_path: Path
+) -> None:
+    """Test that --pack sends all job files in one packed request."""
+    mock_optimizer = mock_create_optimizer.return_value
+    mock_optimizer.optimize_cv_packed.return_value = ["CV for A", "CV for B"]
+
+    cv_file = tmp_path / "cv.txt"
+    job_a = tmp_path / "job_a.txt"
+    job_b = tmp_path / "job_b.txt"
+    cv_file.write_text("John Doe\nSoftware Engineer")
+    job_a.write_text("Backend Developer")
+    job_b.write_text("Data Engineer")
+
+    runner = CliRunner()
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = runner.invoke(main, ["--pack", str(cv_file), str(job_a), str(job_b)])
+
+    assert result.exit_code == 0
+    assert f"==> {job_a} <==\nCV for A" in result.output
+    assert f"==> {job_b} <==\nCV for B" in result.output
+    mock_optimizer.optimize_cv_packed.assert_called_once()
+    assert mock_optimizer.optimize_cv_packed.call_args.args[1] == [
+        "Backend Developer",
+        "Data Engineer",
+    ]
+    mock_optimizer.optimize_cv.assert_not_called()
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_main_command_multiple_jobs_without_pack(
+    mock_create_optimizer, mock_create_agent, tmp_path: Path
+) -> None:
+    """Test that several job files without --pack are tailored one by one."""
+    mock_optimizer = mock_create_optimizer.return_value
+    mock_optimizer.optimize_cv.side_effect = ["CV for A", "CV for B"]
+
+    cv_file = tmp_path / "cv.txt"
+    job_a = tmp_path / "job_a.txt"
+    job_b = tmp_path / "job_b.txt"
+    cv_file.write_text("John Doe")
+    job_a.write_text("Backend Developer")
+    job_b.write_text("Data Engineer")
+
+    runner = CliRunner()
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = runner.invoke(main, [str(cv_file), str(job_a), str(job_b)])
+
+    assert result.exit_code == 0
+    assert mock_optimizer.optimize_cv.call_count == 2
+    mock_optimizer.optimize_cv_packed.assert_not_called()
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_main_command_edits_mode(
+    mock_create_optimizer, mock_create_agent, tmp_path: Path
+) -> None:
+    """Test that --edits requests section-level edits."""
+    mock_optimizer = mock_create_optimizer.return_value
+    mock_optimizer.optimize_cv_edits.return_value = "Edited CV"
+
+    cv_file = tmp_path / "cv.txt"
+    job_file = tmp_path / "job.txt"
+    cv_file.write_text("John Doe\n\n## Experience\n- Things")
+    job_file.write_text("Backend Developer")
+
+    runner = CliRunner()
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = runner.invoke(main, ["--edits", str(cv_file), str(job_file)])
+
+    assert result.exit_code == 0
+    assert result.output.strip() == "Edited CV"
+    mock_optimizer.optimize_cv_edits.assert_called_once()
+    mock_optimizer.optimize_cv.assert_not_called()
+
+
+def test_main_command_edits_with_pack_rejected(tmp_path: Path) -> None:
+    """Test that --edits cannot be combined with --pack."""
+    cv_file = tmp_path / "cv.txt"
+    job_a = tmp_path / "job_a.txt"
+    job_b = tmp_path / "job_b.txt"
+    cv_file.write_text("John Doe")
+    job_a.write_text("Backend Developer")
+    job_b.write_text("Data Engineer")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main, ["--edits", "--pack", str(cv_file), str(job_a), str(job_b)]
+    )
+
+    assert result.exit_code == 2
+    assert "--edits cannot be combined with --pack" in result.output
@@ -0,0 +1,162 @@
+"""Tests for load balancing across several Ollama hosts."""
+
+import http.server
+import socketserver
+
+import pytest
+from griptape.common import PromptStack  # type: ignore
+
+from commitcurry.providers.factory import AgentFactory
+from commitcurry.providers.ollama import OllamaProvider
+from commitcurry.providers.ollama_pool import (
+    NoHealthyHostError,
+    OllamaHostPool,
+    PooledOllamaPromptDriver,
+    parse_hosts,
+)
+
+from .conftest import OllamaStandIn
+
+
+@pytest.fixture
+def stand_ins(ollama_stand_in) -> list[OllamaStandIn]:
+    """Start two Ollama stand-ins; only the second has the model loaded."""
+    return [
+        ollama_stand_in(lambda request: ["from a"], models=["qwen3:8b"]),
+        ollama_stand_in(
+            lambda request: ["from b"], models=["qwen3:8b"], loaded=["qwen3:8b"]
+        ),
+    ]
+
+
+def _unused_url() -> str:
+    """Return the URL of a local port nothing listens on."""
+    server = socketserver.TCPServer(
+        ("127.0.0.1", 0), http.server.BaseHTTPRequestHandler
+    )
+    port = server.server_address[1]
+    server.server_close()
+    return f"http://127.0.0.1:{port}"
+
+
+def _prompt() -> PromptStack:
+    """Build a one-message prompt stack."""
+    stack = PromptStack()
+    stack.add_user_message("Tailor my CV")
+    return stack
+
+
+def test_parse_hosts():
+    """Test that host lists are split, trimmed and stripped of empties."""
+    assert parse_hosts("http://a:11434/, http://b:11434") == [
+        "http://a:11434",
+        "http://b:11434",
+    ]
+    assert parse_hosts(["http://a:11434", ""]) == ["http://a:11434"]
+
+
+def test_health_check_records_available_and_loaded_models(stand_ins):
+    """Test that a health check records each host's available and loaded models."""
+    pool = OllamaHostPool([server.url for server in stand_ins])
+
+    pool.refresh()
+
+    first, second = pool.hosts
+    assert first.healthy and second.healthy
+    assert first.has_model("qwen3:8b") and not first.has_loaded("qwen3:8b")
+    assert second.has_loaded("qwen3:8b")
+
+
+def test_prefers_host_with_model_loaded(stand_ins):
+    """Test that requests go to the host with the model already loaded."""
+    pool = OllamaHostPool([server.url for server in stand_ins])
+    driver = PooledOllamaPromptDriver(model="qwen3:8b", pool=pool)
+
+    message = driver.try_run(_prompt())
+
+    assert message.value == "from b"
+    assert len(stand_ins[1].requests) == 1
+    assert stand_ins[0].requests == []
+
+
+def test_dispatches_to_least_outstanding_host(stand_ins):
+    """Test that the host with fewer outstanding requests is tried first."""
+    pool = OllamaHostPool([server.url for server in stand_ins])
+    pool.refresh()
+    first, second = pool.hosts
+    second.outstanding = 3
+
+    assert pool.candidates("qwen3:8b") == [first, second]
+
+
+def test_prefers_hosts_that_have_the_model(stand_ins):
+    """Test that only hosts serving the model are candidates."""
+    stand_ins[0].models = ["llama3:8b"]
+    pool = OllamaHostPool([server.url for server in stand_ins])
+    pool.refresh()
+
+    assert [host.url for host in pool.candidates("llama3:8b")] == [stand_ins[0].url]
+
+
+def test_fails_over_when_host_is_down(stand_ins):
+    """Test that an unreachable host is marked unhealthy and skipped."""
+    down = _unused_url()
+    pool = OllamaHostPool([down, stand_ins[0].url])
+    driver = PooledOllamaPromptDriver(model="qwen3:8b", pool=pool)
+
+    assert driver.try_run(_prompt()).value == "from a"
+    assert not pool.hosts[0].healthy
+
+
+def test_fails_over_when_host_drops_after_health_check(stand_ins):
+    """Test that a host failing mid-request is released and skipped."""
+    pool = OllamaHostPool([server.url for server in stand_ins])
+    pool.refresh()
+    stand_ins[1].stop()
+    driver = PooledOllamaPromptDriver(model="qwen3:8b", pool=pool)
+
+    assert driver.try_run(_prompt()).value == "from a"
+    assert not pool.hosts[1].healthy
+    assert pool.hosts[1].outstanding == 0
+
+
+def test_raises_when_no_host_is_healthy():
+    """Test that NoHealthyHostError is raised when every host is down."""
+    pool = OllamaHostPool([_unused_url(), _unused_url()])
+    driver = PooledOllamaPromptDriver(model="qwen3:8b", pool=pool)
+
+    with pytest.raises(NoHealthyHostError, match="No healthy Ollama host"):
+        driver.try_run(_prompt())
+
+
+def test_factory_creates_pooled_driver_for_several_hosts(stand_ins):
+    """Test that several hosts give a pooled driver with the options."""
+    urls = ",".join(server.url for server in stand_ins)
+
+    agent = AgentFactory.create_agent("ollama:qwen3:8b", base_url=urls, num_ctx=8192)
+
+    driver = agent.prompt_driver
+    assert isinstance(driver, PooledOllamaPromptDriver)
+    assert driver.options["num_ctx"] == 8192
+    assert [host.url for host in driver.pool.hosts] == [s.url for s in stand_ins]
+
+
+def test_factory_keeps_single_host_driver(monkeypatch):
+    """Test that a single host keeps the plain Ollama driver."""
+    monkeypatch.setenv("OLLAMA_URL", "http://localhost:11434/")
+
+    agent = AgentFactory.create_agent("ollama:qwen3:8b")
+
+    assert not isinstance(agent.prompt_driver, PooledOllamaPromptDriver)
+    assert agent.prompt_driver.host == "http://localhost:11434"
+
+
+def test_provider_accepts_host_list(stand_ins):
+    """Test that the provider builds a pooled driver from a host list."""
+    provider = OllamaProvider("qwen3:8b", [server.url for server in stand_ins])
+
+    driver = provider.create_prompt_driver()
+
+    assert provider.base_url == stand_ins[0].url
+    assert isinstance(driver, PooledOllamaPromptDriver)
+    assert driver.try_run(_prompt()).value == "from b"
@@ -0,0 +1,128 @@
+"""Tests for packed multi-job CV optimization."""
+
+import json
+
+from griptape.drivers.prompt.google import GooglePromptDriver  # type: ignore
+
+from commitcurry.cv_optimizer import CVOptimizer
+from commitcurry.packing import (
+    PACKED_OUTPUT_SCHEMA,
+    format_packed_prompt,
+    parse_packed_output,
+    structured_output,
+)
+from commitcurry.providers.factory import AgentFactory
+
+
+def packed_response(entries: dict) -> str:
+    """Build a packed JSON response from a {job: cv} mapping."""
+    return json.dumps({"cvs": [{"job": job, "cv": cv} for job, cv in entries.items()]})
+
+
+def test_format_packed_prompt_includes_cv_once_and_all_jobs(scripted_agent):
+    """Test that the packed prompt holds the CV once and numbers every job."""
+    optimizer = CVOptimizer(agent=scripted_agent([]))
+    prompt = format_packed_prompt(
+        optimizer.packed_prompt_template, "  My CV  ", ["Job A", "Job B", "Job C"]
+    )
+
+    assert prompt.count("My CV") == 1
+    assert "Job Posting 1:\nJob A" in prompt
+    assert "Job Posting 3:\nJob C" in prompt
+    assert '"cvs"' in prompt
+
+
+def test_parse_packed_output_valid():
+    """Test parsing a valid packed response."""
+    text = packed_response({2: "CV for B", 1: "CV for A"})
+    assert parse_packed_output(text, 2) == ["CV for A", "CV for B"]
+
+
+def test_parse_packed_output_tolerates_code_fences_and_prose():
+    """Test that fenced or prose-wrapped JSON is still accepted."""
+    fenced = "```json\n" + packed_response({1: "A"}) + "\n```"
+    assert parse_packed_output(fenced, 1) == ["A"]
+
+    wrapped = "Here you go:\n" + packed_response({1: "A"}) + "\nGood luck!"
+    assert parse_packed_output(wrapped, 1) == ["A"]
+
+
+def test_parse_packed_output_rejects_invalid_entries():
+    """Test that invalid entries are dropped individually."""
+    text = json.dumps(
+        {
+            "cvs": [
+                {"job": 1, "cv": ""},
+                {"job": 2, "cv": "CV for B"},
+                {"job": 7, "cv": "out of range"},
+                {"job": True, "cv": "bool job"},
+                {"cv": "missing job"},
+                "not an object",
+            ]
+        }
+    )
+    assert parse_packed_output(text, 3) == [None, "CV for B", None]
+    assert parse_packed_output("not json at all", 2) == [None, None]
+    assert parse_packed_output('{"cvs": "nope"}', 2) == [None, None]
+
+
+def test_optimize_cv_packed_single_request(scripted_agent):
+    """Test that a valid packed response needs only one request."""
+    agent = scripted_agent([packed_response({1: "CV A", 2: "CV B"})])
+    optimizer = CVOptimizer(agent=agent)
+
+    results = optimizer.optimize_cv_packed("CV", ["Job A", "Job B"])
+
+    assert results == ["CV A", "CV B"]
+    assert len(agent.prompts) == 1
+
+
+def test_optimize_cv_packed_falls_back_for_invalid_entries(scripted_agent):
+    """Test individual fallback requests for entries failing validation."""
+    agent = scripted_agent([packed_response({2: "CV B"}), "Individual CV A"])
+    optimizer = CVOptimizer(agent=agent)
+
+    results = optimizer.optimize_cv_packed("CV", ["Job A", "Job B"])
+
+    assert results == ["Individual CV A", "CV B"]
+    assert len(agent.prompts) == 2
+    assert "Job A" in agent.prompts[1]
+    assert "Job B" not in agent.prompts[1]
+
+
+def test_optimize_cv_packed_single_job_uses_regular_prompt(scripted_agent):
+    """Test that packing one job is a plain optimization."""
+    agent = scripted_agent(["CV A"])
+    optimizer = CVOptimizer(agent=agent)
+
+    assert optimizer.optimize_cv_packed("CV", ["Job A"]) == ["CV A"]
+    assert agent.prompts[0] == optimizer.prompt_template.format(
+        cv_content="CV", job_description="Job A"
+    )
+
+
+def test_structured_output_sets_and_restores_driver_params():
+    """Test that the schema is passed natively to Gemini and restored."""
+    driver = GooglePromptDriver(model="gemini-2.5-flash", api_key="test-key")
+    driver.extra_params["thinking_config"] = {"thinking_budget": 0}
+
+    with structured_output(driver, PACKED_OUTPUT_SCHEMA):
+        assert driver.extra_params["response_mime_type"] == "application/json"
+        assert driver.extra_params["response_json_schema"] == PACKED_OUTPUT_SCHEMA
+
+    assert driver.extra_params == {"thinking_config": {"thinking_budget": 0}}
+
+    with structured_output(None, PACKED_OUTPUT_SCHEMA):
+        pass  # drivers without native support are left alone
+
+
+def test_optimize_cv_packed_enforces_schema_on_ollama(ollama_stand_in):
+    """Test that the packed request carries the schema as Ollama format."""
+    server = ollama_stand_in(lambda request: [packed_response({1: "CV A", 2: "CV B"})])
+    agent = AgentFactory.create_agent("ollama:qwen2.5:7b", base_url=server.url)
+
+    results = CVOptimizer(agent=agent).optimize_cv_packed("CV", ["Job A", "Job B"])
+
+    assert results == ["CV A", "CV B"]
+    assert server.requests[0]["format"] == PACKED_OUTPUT_SCHEMA
+    assert "format" not in agent.prompt_driver.extra_params
@@ -0,0 +1,123 @@
+"""Tests for pre-flight prompt sizing."""
+
+from pathlib import Path
+
+import pytest
+
+from commitcurry.cv_optimizer import load_prompt_template
+from commitcurry.preflight import (
+    ContextWindowExceededError,
+    compact_text,
+    plan_packed_request,
+    plan_request,
+)
+from commitcurry.providers.factory import (
+    OLLAMA_DEFAULT_CONTEXT_WINDOW,
+    AgentFactory,
+)
+from commitcurry.routing import ModelStatsStore
+from commitcurry.tokens import estimate_tokens
+
+TEMPLATE = "Resume:\n{cv_content}\n\nJob:\n{job_description}"
+
+
+def test_estimate_tokens():
+    """Test the local token estimate."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Python") == 1
+    assert estimate_tokens("Senior Python developer, 5+ years.") == 9
+    assert estimate_tokens("internationalization") == 4
+
+
+def test_context_window_lookup():
+    """Test per-model context windows."""
+    assert AgentFactory.get_context_window("gemini-2.5-flash") == 1_048_576
+    assert AgentFactory.get_context_window("gemini-1.5-pro") == 2_097_152
+    assert AgentFactory.get_context_window("ollama:qwen2.5:7b") == 32_768
+    assert AgentFactory.get_context_window("ollama:llama3.3:8b") == 131_072
+    assert AgentFactory.get_context_window("ollama:llama3:8b") == 8_192
+    assert (
+        AgentFactory.get_context_window("ollama:unknown-model")
+        == (AgentFactory.list_supported_formats()["ollama"]["context_window"])
+    )
+    assert (
+        AgentFactory.get_default_context_window("ollama:qwen3:8b")
+        == OLLAMA_DEFAULT_CONTEXT_WINDOW
+    )
+
+    with pytest.raises(ValueError, match="Unsupported model format"):
+        AgentFactory.get_context_window("openai:gpt-4")
+    with pytest.raises(ValueError, match="Invalid Ollama model format"):
+        AgentFactory.get_context_window("ollama:")
+
+
+def test_compact_text():
+    """Test that compaction keeps content and nesting but drops decoration."""
+    text = "# Name  \n\n\n\n<!-- draft -->\n---\n- Role:    Engineer\n  - Python\n"
+    assert compact_text(text) == "# Name\n\n- Role: Engineer\n  - Python"
+
+
+def test_plan_small_prompt_needs_no_changes():
+    """Test that small prompts are sent as is."""
+    plan = plan_request("ollama:qwen3:8b", "Short CV", "Short job", TEMPLATE)
+
+    assert plan.cv_content == "Short CV"
+    assert plan.job_description == "Short job"
+    assert plan.num_ctx is None
+    assert not plan.compacted
+    assert plan.predicted_latency is None
+
+
+def test_plan_sets_num_ctx_for_large_ollama_prompt():
+    """Test that a context size is requested when the default is too small."""
+    cv = "Built scalable services. " * 400
+    plan = plan_request("ollama:qwen3:8b", cv, "Job", TEMPLATE)
+
+    assert plan.required_tokens > OLLAMA_DEFAULT_CONTEXT_WINDOW
+    assert plan.num_ctx is not None
+    assert plan.num_ctx >= plan.required_tokens
+    assert plan.num_ctx % 1024 == 0
+
+    gemini_plan = plan_request("gemini-2.5-flash", cv, "Job", TEMPLATE)
+    assert gemini_plan.num_ctx is None
+
+
+def test_plan_compacts_input_to_fit():
+    """Test that inputs are compacted when they would not fit otherwise."""
+    cv = ("Python developer\n" + "-" * 5000 + "\n\n\n") * 5
+    plan = plan_request("ollama:gemma2:9b", cv, "Job", TEMPLATE)
+
+    assert plan.compacted
+    assert "-----" not in plan.cv_content
+    assert plan.required_tokens <= 8_192
+
+
+def test_plan_fails_fast_when_prompt_cannot_fit():
+    """Test the clear error for prompts that exceed the model context."""
+    cv = "Built scalable services. " * 5000
+    with pytest.raises(ContextWindowExceededError, match="supports at most 8192"):
+        plan_request("ollama:gemma2:9b", cv, "Job", TEMPLATE)
+
+
+def test_plan_predicts_latency_from_stats(tmp_path: Path):
+    """Test latency prediction from recorded statistics."""
+    store = ModelStatsStore(tmp_path / "stats.json")
+    store.record("gemini-2.5-flash", True, 100, 100, 2.0)
+
+    plan = plan_request("gemini-2.5-flash", "CV", "Job", load_prompt_template(), store)
+    assert plan.predicted_latency is not None
+    assert plan.predicted_latency > 0
+
+
+def test_plan_packed_request_reserves_output_per_job():
+    """Test that packed requests reserve completion tokens for every job."""
+    template = load_prompt_template("cv_packed_optimization_prompt.txt")
+    cv = "Built scalable services. " * 100
+    single = plan_request("gemini-2.5-flash", cv, "Job A", TEMPLATE)
+    packed = plan_packed_request(
+        "gemini-2.5-flash", cv, ["Job A", "Job B", "Job C"], template
+    )
+
+    assert packed.output_tokens == 3 * single.output_tokens
+    assert packed.job_descriptions == ["Job A", "Job B", "Job C"]
+    assert "Job C" not in packed.cv_content
@@ -0,0 +1,147 @@
+"""Tests for client-side profiling."""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+from griptape.common import PromptStack  # type: ignore
+from griptape.events import (  # type: ignore
+    EventBus,
+    FinishPromptEvent,
+    StartPromptEvent,
+)
+
+from commitcurry.cv_optimizer import CVOptimizer
+from commitcurry.main import main
+from commitcurry.profiling import RunProfiler
+
+
+def busy(seconds: float) -> None:
+    """Burn CPU for a while."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class EventAgent:
+    """Agent stand-in publishing prompt events around a simulated model call."""
+
+    def __init__(self, model_seconds: float, client_seconds: float):
+        self.model_seconds = model_seconds
+        self.client_seconds = client_seconds
+        self.prompt_driver = None
+
+    def run(self, prompt: str) -> str:
+        busy(self.client_seconds)
+        EventBus.publish_event(
+            StartPromptEvent(model="stand-in", prompt_stack=PromptStack())
+        )
+        time.sleep(self.model_seconds)
+        EventBus.publish_event(
+            FinishPromptEvent(
+                model="stand-in",
+                result="Optimized CV",
+                input_token_count=None,
+                output_token_count=None,
+            )
+        )
+        return "Optimized CV"
+
+
+def test_rejects_unknown_mode():
+    """Test that only cpu and mem modes are accepted."""
+    with pytest.raises(ValueError, match="Unsupported profile mode"):
+        RunProfiler("gpu")
+
+
+def test_cpu_profile_separates_model_wait(tmp_path: Path):
+    """Test that model calls are attributed apart from client-side work."""
+    profiler = RunProfiler("cpu", sample_interval=0.002)
+    optimizer = CVOptimizer(agent=EventAgent(0.3, 0.1), profiler=profiler)
+
+    profiler.start()
+    optimizer.optimize_cv("CV", "Job")
+    profiler.stop()
+
+    assert profiler.model_calls == 1
+    assert 0.25 <= profiler.model_wait < profiler.wall_time
+    report = profiler.report()
+    assert "waiting on model:" in report
+    assert "client-side:" in report
+    # The agent thread's work shows up in the function report
+    assert "busy" in report
+
+    output = tmp_path / "stacks.txt"
+    profiler.write_collapsed_stacks(output)
+    lines = output.read_text().splitlines()
+    assert any(line.startswith("[model wait];") for line in lines)
+    assert any(line.startswith("[client];") and "busy" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_failed_model_call_still_counts_as_wait():
+    """Test that a start event without a finish event is closed."""
+    profiler = RunProfiler("cpu")
+    profiler.start()
+    with profiler.profile_thread():
+        EventBus.publish_event(
+            StartPromptEvent(model="stand-in", prompt_stack=PromptStack())
+        )
+        time.sleep(0.05)
+    profiler.stop()
+
+    assert profiler.model_wait >= 0.05
+
+
+def test_memory_profile_reports_allocations():
+    """Test the memory report."""
+    profiler = RunProfiler("mem")
+    profiler.start()
+    blocks = [bytearray(1024) for _ in range(1000)]
+    profiler.stop()
+
+    report = profiler.report()
+    assert len(blocks) == 1000
+    assert "peak traced memory:" in report
+    assert "Top allocations by line:" in report
+    assert "test_profiling.py" in report
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_main_command_profile_cpu(
+    mock_create_optimizer, mock_create_agent, tmp_path: Path
+) -> None:
+    """Test that --profile prints a report and writes collapsed stacks."""
+    mock_optimizer = mock_create_optimizer.return_value
+    mock_optimizer.optimize_cv.return_value = "Optimized CV content"
+
+    cv_file = tmp_path / "cv.txt"
+    job_file = tmp_path / "job.txt"
+    stacks = tmp_path / "stacks.txt"
+    cv_file.write_text("John Doe")
+    job_file.write_text("Backend Developer")
+
+    runner = CliRunner()
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = runner.invoke(
+            main,
+            [
+                "--profile",
+                "cpu",
+                "--profile-output",
+                str(stacks),
+                str(cv_file),
+                str(job_file),
+            ],
+        )
+
+    assert result.exit_code == 0
+    assert result.stdout.strip() == "Optimized CV content"
+    assert "Profile (cpu)" in result.stderr
+    assert "imports before start:" in result.stderr
+    assert stacks.exists()
+    assert isinstance(mock_optimizer.profiler, RunProfiler)
@@ -0,0 +1,245 @@
+"""Tests for recruiter mode ranking."""
+
+import json
+import os
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from click.testing import CliRunner
+
+from commitcurry.cv_optimizer import OptimizationTimeoutError
+from commitcurry.main import EXIT_CANCELLED, EXIT_TIMEOUT, main
+from commitcurry.preflight import PreflightPlan
+from commitcurry.ranking import INDEX_FILE_NAME, CVIndex, tailor_concurrently, tokenize
+
+JOB = "Senior Python developer with Kubernetes and PostgreSQL experience"
+
+
+def write_cvs(directory: Path) -> None:
+    (directory / "alice.md").write_text(
+        "Alice\nPython developer. Kubernetes, PostgreSQL, Python, Django."
+    )
+    (directory / "bob.md").write_text("Bob\nJava developer. Spring, Oracle.")
+    (directory / "carol.txt").write_text(
+        "Carol\nPython scripts and Python notebooks for data analysis."
+    )
+    (directory / "notes.pdf").write_text("Python Kubernetes PostgreSQL")
+
+
+def test_tokenize_keeps_tech_names():
+    """Test that terms such as c++ and node.js survive tokenization."""
+    assert tokenize("I know C++, C# and Node.js.") == ["know", "c++", "c#", "node.js"]
+
+
+def test_rank_orders_by_relevance(tmp_path: Path):
+    """Test that the best matching CVs come first."""
+    write_cvs(tmp_path)
+    index = CVIndex(tmp_path)
+    index.update()
+
+    ranked = index.rank(JOB)
+
+    assert [cv.path.name for cv in ranked] == ["alice.md", "carol.txt", "bob.md"]
+    assert set(ranked[0].matched_terms[:2]) == {"kubernetes", "postgresql"}
+    assert [cv.path.name for cv in index.rank(JOB, top_k=1)] == ["alice.md"]
+
+
+def test_index_updates_incrementally(tmp_path: Path):
+    """Test that only new or modified CVs are re-indexed."""
+    write_cvs(tmp_path)
+    update = CVIndex(tmp_path).update()
+    assert (update.added, update.unchanged) == (3, 0)
+    assert (tmp_path / INDEX_FILE_NAME).exists()
+
+    (tmp_path / "dave.md").write_text("Dave\nKubernetes operator author")
+    (tmp_path / "bob.md").write_text("Bob\nPython and Kubernetes developer")
+    (tmp_path / "carol.txt").unlink()
+    # Touched but unchanged content is not re-indexed
+    os.utime(tmp_path / "alice.md", ns=(0, 0))
+
+    index = CVIndex(tmp_path)
+    with patch("commitcurry.ranking.tokenize", wraps=tokenize) as spy:
+        update = index.update()
+
+    assert (update.added, update.updated, update.removed, update.unchanged) == (
+        1,
+        1,
+        1,
+        1,
+    )
+    assert spy.call_count == 2
+    assert CVIndex(tmp_path).update().changed is False
+    assert set(index.entries) == {"alice.md", "bob.md", "dave.md"}
+
+
+def test_tailor_concurrently_uses_one_optimizer_per_worker():
+    """Test that workers do not share optimizers and failures stay isolated."""
+    created = []
+    lock = threading.Lock()
+
+    def create_optimizer():
+        optimizer = MagicMock()
+
+        def optimize_cv(cv_content, job_description, deadline=None):
+            if cv_content == "bad":
+                raise RuntimeError("model failed")
+            return f"Tailored {cv_content}"
+
+        optimizer.optimize_cv.side_effect = optimize_cv
+        with lock:
+            created.append(optimizer)
+        return optimizer
+
+    plans = [
+        PreflightPlan("gemini-2.5-flash", cv, "Job", 10, 10, 1000)
+        for cv in ["a", "bad", "c", "d"]
+    ]
+    results = tailor_concurrently(plans, create_optimizer, workers=2)
+
+    assert [result.content for result in results] == [
+        "Tailored a",
+        None,
+        "Tailored c",
+        "Tailored d",
+    ]
+    assert isinstance(results[1].error, RuntimeError)
+    assert 1 <= len(created) <= 2
+
+
+def test_tailor_concurrently_reports_results_as_they_complete():
+    """Test that on_result sees each result on the calling thread."""
+    optimizer = MagicMock()
+    optimizer.optimize_cv.side_effect = lambda cv, job, deadline=None: cv.upper()
+    plans = [
+        PreflightPlan("gemini-2.5-flash", cv, "Job", 10, 10, 1000)
+        for cv in ["a", "b", "c"]
+    ]
+    seen = []
+
+    def on_result(index, result):
+        seen.append((index, result.content, threading.current_thread()))
+
+    results = tailor_concurrently(
+        plans, lambda: optimizer, workers=2, on_result=on_result
+    )
+
+    assert sorted((index, content) for index, content, _ in seen) == [
+        (0, "A"),
+        (1, "B"),
+        (2, "C"),
+    ]
+    assert {thread for _, _, thread in seen} == {threading.current_thread()}
+    assert [result.content for result in results] == ["A", "B", "C"]
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_rank_command_tailors_top_cvs(
+    mock_create_optimizer, mock_create_agent, tmp_path: Path
+) -> None:
+    """Test that the rank subcommand tailors only the top CVs."""
+    cv_dir = tmp_path / "cvs"
+    cv_dir.mkdir()
+    write_cvs(cv_dir)
+    job_file = tmp_path / "job.md"
+    job_file.write_text(JOB)
+    mock_create_optimizer.return_value.optimize_cv.return_value = "Tailored CV"
+
+    runner = CliRunner()
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = runner.invoke(
+            main, ["rank", "-k", "2", "--workers", "2", str(cv_dir), str(job_file)]
+        )
+
+    assert result.exit_code == 0, result.output
+    assert "1. " in result.stdout and "alice.md" in result.stdout
+    assert "bob.md" not in result.stdout
+    assert sorted(os.listdir(cv_dir / "tailored")) == [
+        "01-alice.tailored.md",
+        "02-carol.tailored.md",
+    ]
+    assert (cv_dir / "tailored" / "01-alice.tailored.md").read_text() == (
+        "Tailored CV\n"
+    )
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_rank_command_keeps_finished_cvs_when_cancelled(
+    mock_create_optimizer, mock_create_agent, tmp_path: Path
+) -> None:
+    """Test that CVs tailored before a Ctrl-C are written and recorded."""
+    cv_dir = tmp_path / "cvs"
+    cv_dir.mkdir()
+    write_cvs(cv_dir)
+    job_file = tmp_path / "job.md"
+    job_file.write_text(JOB)
+
+    def optimize_cv(cv_content, job_description, deadline=None):
+        if cv_content.startswith("Carol"):
+            raise KeyboardInterrupt
+        return "Tailored CV"
+
+    mock_create_optimizer.return_value.optimize_cv.side_effect = optimize_cv
+
+    runner = CliRunner()
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = runner.invoke(
+            main, ["rank", "-k", "2", "--workers", "1", str(cv_dir), str(job_file)]
+        )
+
+    assert result.exit_code == EXIT_CANCELLED
+    assert "Cancelled" in result.stderr
+    assert os.listdir(cv_dir / "tailored") == ["01-alice.tailored.md"]
+    stats = json.loads(Path(os.environ["COMMITCURRY_STATS_FILE"]).read_text())
+    assert stats["models"]["gemini-2.5-flash"]["outcomes"] == [True]
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_rank_command_exits_with_timeout_status(
+    mock_create_optimizer, mock_create_agent, tmp_path: Path
+) -> None:
+    """Test that a CV running out of time is a timeout, not a model failure."""
+    cv_dir = tmp_path / "cvs"
+    cv_dir.mkdir()
+    write_cvs(cv_dir)
+    job_file = tmp_path / "job.md"
+    job_file.write_text(JOB)
+
+    def optimize_cv(cv_content, job_description, deadline=None):
+        if cv_content.startswith("Carol"):
+            raise OptimizationTimeoutError("Deadline passed")
+        return "Tailored CV"
+
+    mock_create_optimizer.return_value.optimize_cv.side_effect = optimize_cv
+
+    runner = CliRunner()
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = runner.invoke(
+            main,
+            ["rank", "-k", "2", "--timeout", "5", str(cv_dir), str(job_file)],
+        )
+
+    assert result.exit_code == EXIT_TIMEOUT
+    assert "Timed out after 5s" in result.stderr
+    assert os.listdir(cv_dir / "tailored") == ["01-alice.tailored.md"]
+
+
+def test_rank_command_rank_only(tmp_path: Path) -> None:
+    """Test that --rank-only prints the ranking without calling a model."""
+    cv_dir = tmp_path / "cvs"
+    cv_dir.mkdir()
+    write_cvs(cv_dir)
+    job_file = tmp_path / "job.md"
+    job_file.write_text(JOB)
+
+    result = CliRunner().invoke(
+        main, ["rank", "--rank-only", str(cv_dir), str(job_file)]
+    )
+
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    assert [line.split()[2] for line in lines] == ["alice.md", "carol.txt", "bob.md"]
+    assert not (cv_dir / "tailored").exists()
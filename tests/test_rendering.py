@@ -0,0 +1,239 @@
+"""Tests for multi-format rendering of tailored CVs."""
+
+import os
+import string
+import sys
+import time
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from commitcurry.main import main
+from commitcurry.rendering import (
+    CVRenderer,
+    load_render_template,
+    parse_formats,
+    parse_markdown,
+    render_docx,
+    render_html,
+)
+
+CV = """# Jane Doe
+Backend engineer · [GitHub](https://github.com/jane)
+
+## Experience
+- Built **Python** services on *Kubernetes*
+  with PostgreSQL
+  - Cut latency by 40%
+
+1. First
+2. Second
+
+---
+Plain text & more.
+"""
+
+FAKE_PDF_RENDERER = """
+import sys
+html = open(sys.argv[1], encoding="utf-8").read()
+with open(sys.argv[2], "wb") as pdf:
+    pdf.write(b"%PDF-1.4 " + str(len(html)).encode())
+"""
+
+
+def test_parse_formats():
+    """Test parsing and validation of --render values."""
+    assert parse_formats("HTML, docx,html") == ["html", "docx"]
+    with pytest.raises(ValueError, match="Unsupported render format 'rtf'"):
+        parse_formats("html,rtf")
+
+
+def test_parse_markdown_blocks():
+    """Test the block structure of a CV."""
+    blocks = parse_markdown(CV)
+
+    assert [block.kind for block in blocks] == [
+        "heading",
+        "paragraph",
+        "heading",
+        "bullet",
+        "bullet",
+        "number",
+        "number",
+        "rule",
+        "paragraph",
+    ]
+    assert blocks[4].level == 1
+    assert "".join(span.text for span in blocks[3].spans) == (
+        "Built Python services on Kubernetes with PostgreSQL"
+    )
+
+
+def test_render_html():
+    """Test that the template is filled with the converted CV."""
+    document = render_html(CV, string.Template(load_render_template()))
+
+    assert "<title>Jane Doe</title>" in document
+    assert '<a href="https://github.com/jane">GitHub</a>' in document
+    assert "<li>Built <strong>Python</strong> services on <em>Kubernetes</em>" in (
+        document
+    )
+    assert "<ol>\n<li>First</li>" in document
+    # The nested list sits inside the item it belongs to
+    nested = "with PostgreSQL\n<ul>\n<li>Cut latency by 40%</li>\n</ul>\n</li>\n</ul>"
+    assert nested in document
+    assert "Plain text &amp; more." in document
+
+
+def test_render_html_drops_unsafe_links():
+    """Test that only http, https and mailto links become hyperlinks."""
+    markdown = (
+        "[x](javascript:void0) [y](data:text/html,hi) [mail](MAILTO:jane@example.com)"
+    )
+    document = render_html(markdown, string.Template(load_render_template()))
+
+    assert "javascript" not in document
+    assert "data:" not in document
+    assert "<p>x y " in document
+    assert '<a href="MAILTO:jane@example.com">mail</a>' in document
+
+
+def test_render_docx(tmp_path: Path):
+    """Test that the DOCX package holds the CV with formatting and links."""
+    path = tmp_path / "cv.docx"
+    render_docx(CV, path)
+
+    with zipfile.ZipFile(path) as archive:
+        document = archive.read("word/document.xml").decode()
+        relationships = archive.read("word/_rels/document.xml.rels").decode()
+        assert "[Content_Types].xml" in archive.namelist()
+
+    assert '<w:pStyle w:val="Heading1"/>' in document
+    assert "<w:b/>" in document and ">Python</w:t>" in document
+    assert "Plain text &amp; more." in document
+    assert 'Target="https://github.com/jane" TargetMode="External"' in relationships
+    assert os.listdir(tmp_path) == ["cv.docx"]
+
+
+def test_renderer_writes_all_formats(tmp_path: Path):
+    """Test rendering in worker processes, with a stand-in PDF renderer."""
+    script = tmp_path / "fake_pdf.py"
+    script.write_text(FAKE_PDF_RENDERER)
+    output_dir = tmp_path / "out"
+
+    with CVRenderer(
+        ["html", "pdf", "docx"],
+        output_dir,
+        pdf_command=[sys.executable, str(script), "{html}", "{pdf}"],
+    ) as renderer:
+        paths = renderer.submit(CV, "jane") + renderer.submit("# John", "john")
+        outcomes = renderer.wait()
+
+    assert [outcome.path for outcome in outcomes] == paths
+    assert all(outcome.error is None for outcome in outcomes)
+    assert sorted(os.listdir(output_dir)) == [
+        "jane.docx",
+        "jane.html",
+        "jane.pdf",
+        "john.docx",
+        "john.html",
+        "john.pdf",
+    ]
+    assert (output_dir / "jane.pdf").read_bytes().startswith(b"%PDF")
+
+
+def test_renderer_reports_failures(tmp_path: Path):
+    """Test that a failing PDF renderer is reported per file."""
+    with CVRenderer(
+        ["pdf"], tmp_path, pdf_command=[sys.executable, "-c", "raise SystemExit(3)"]
+    ) as renderer:
+        renderer.submit(CV, "jane")
+        (outcome,) = renderer.wait()
+
+    assert "status 3" in str(outcome.error)
+    assert os.listdir(tmp_path) == []
+
+
+def test_renderer_requires_local_pdf_renderer(tmp_path: Path):
+    """Test that PDF output fails early without a local renderer."""
+    with patch("commitcurry.rendering.find_pdf_renderer", return_value=None):
+        with pytest.raises(ValueError, match="PDF output needs a local renderer"):
+            CVRenderer(["pdf"], tmp_path)
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_main_command_render(mock_create_optimizer, mock_create_agent, tmp_path):
+    """Test that --render writes each tailored CV in the requested formats."""
+    mock_optimizer = mock_create_optimizer.return_value
+    mock_optimizer.optimize_cv.side_effect = ["# CV for job a", "# CV for job b"]
+    cv_file = tmp_path / "cv.md"
+    cv_file.write_text("John Doe")
+    job_files = [tmp_path / "a.md", tmp_path / "b.md"]
+    for job_file in job_files:
+        job_file.write_text("Backend Developer")
+    output_dir = tmp_path / "out"
+
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = CliRunner().invoke(
+            main,
+            [
+                "--render",
+                "html,docx",
+                "--output-dir",
+                str(output_dir),
+                str(cv_file),
+                *map(str, job_files),
+            ],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert sorted(os.listdir(output_dir)) == [
+        "cv-a.docx",
+        "cv-a.html",
+        "cv-b.docx",
+        "cv-b.html",
+    ]
+    assert "<h1>CV for job b</h1>" in (output_dir / "cv-b.html").read_text()
+    assert str(output_dir / "cv-a.html") in result.stderr
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_rank_command_renders_each_cv_when_tailored(
+    mock_create_optimizer, mock_create_agent, tmp_path
+):
+    """Test that rank renders a CV before the rest of the batch finishes."""
+    cv_dir = tmp_path / "cvs"
+    cv_dir.mkdir()
+    (cv_dir / "alice.md").write_text("Alice\nPython Kubernetes Python")
+    (cv_dir / "bob.md").write_text("Bob\nPython")
+    job_file = tmp_path / "job.md"
+    job_file.write_text("Python developer with Kubernetes")
+    first_html = cv_dir / "tailored" / "01-alice.tailored.html"
+
+    def optimize_cv(cv_content, job_description, deadline=None):
+        if cv_content.startswith("Bob"):
+            # Finish only once the first CV has been rendered
+            give_up = time.monotonic() + 10
+            while not first_html.exists() and time.monotonic() < give_up:
+                time.sleep(0.05)
+            return f"# Bob {first_html.exists()}"
+        return "# Alice"
+
+    mock_create_optimizer.return_value.optimize_cv.side_effect = optimize_cv
+
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = CliRunner().invoke(
+            main,
+            ["rank", "--render", "html", "--workers", "2", str(cv_dir), str(job_file)],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert (
+        "<h1>Bob True</h1>"
+        in (cv_dir / "tailored" / "02-bob.tailored.html").read_text()
+    )
@@ -0,0 +1,149 @@
+"""Tests for latency-aware model routing."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from commitcurry.routing import (
+    DEFAULT_AUTO_CANDIDATES,
+    ModelRouter,
+    ModelStats,
+    ModelStatsStore,
+    parse_candidates,
+)
+
+
+def test_model_stats_separates_prefill_and_generation_rates():
+    """Test that prefill and generation costs are fitted separately."""
+    stats = ModelStats()
+    # 1000 tokens/s prefill, 20 tokens/s generation
+    for input_tokens, output_tokens in [(1000, 100), (2000, 300), (500, 400)]:
+        latency = input_tokens / 1000 + output_tokens / 20
+        stats.record(True, input_tokens, output_tokens, latency)
+
+    assert stats.prefill_rate == pytest.approx(1000)
+    assert stats.generation_rate == pytest.approx(20)
+
+
+def test_model_stats_error_rate_and_history_window():
+    """Test error rate tracking over a bounded history."""
+    stats = ModelStats()
+    stats.record(False, 100)
+    stats.record(True, 100, 50, 1.0)
+    assert stats.error_rate == pytest.approx(0.5)
+
+    for _ in range(100):
+        stats.record(True, 100, 50, 1.0)
+    assert stats.attempts == 50
+    assert stats.error_rate == 0.0
+
+
+def test_model_stats_predict_latency_scales_with_input():
+    """Test that predictions grow with the input size."""
+    stats = ModelStats()
+    stats.record(True, 1000, 1000, 10.0)
+
+    assert stats.predict_latency(1000) == pytest.approx(10.0)
+    assert stats.predict_latency(2000) == pytest.approx(20.0)
+    assert ModelStats().predict_latency(1000) is None
+
+
+def test_stats_store_round_trip(tmp_path: Path):
+    """Test that statistics persist across store instances."""
+    path = tmp_path / "stats" / "model_stats.json"
+    store = ModelStatsStore(path)
+    store.record("gemini-2.5-flash", True, 100, 200, 2.5)
+    store.record("gemini-2.5-flash", False, 100)
+
+    reloaded = ModelStatsStore(path)
+    stats = reloaded.get("gemini-2.5-flash")
+    assert stats.samples == [(100, 200, 2.5)]
+    assert stats.outcomes == [True, False]
+    assert json.loads(path.read_text())["version"] == 1
+
+
+def test_stats_store_ignores_corrupt_file(tmp_path: Path):
+    """Test that a corrupt statistics file is treated as empty."""
+    path = tmp_path / "model_stats.json"
+    path.write_text("{not json")
+
+    store = ModelStatsStore(path)
+    assert store.get("any-model").attempts == 0
+
+
+def test_router_explores_untried_candidates_first(tmp_path: Path):
+    """Test that candidates without statistics are tried first."""
+    store = ModelStatsStore(tmp_path / "stats.json")
+    store.record("fast", True, 1000, 1000, 1.0)
+
+    router = ModelRouter(["fast", "new"], store)
+    decision = router.select(1000, slo_seconds=5.0)
+
+    assert decision.model_name == "new"
+    assert decision.predicted_latency is None
+
+
+def test_router_prefers_first_candidate_meeting_slo(tmp_path: Path):
+    """Test that the preferred candidate wins when it meets the SLO."""
+    store = ModelStatsStore(tmp_path / "stats.json")
+    store.record("quality", True, 1000, 1000, 4.0)
+    store.record("fast", True, 1000, 1000, 1.0)
+
+    router = ModelRouter(["quality", "fast"], store)
+
+    assert router.select(1000, slo_seconds=5.0).model_name == "quality"
+    # A bigger input pushes the preferred model past the SLO
+    assert router.select(2000, slo_seconds=5.0).model_name == "fast"
+    # Without an SLO the fastest model is picked
+    assert router.select(1000).model_name == "fast"
+
+
+def test_router_avoids_unhealthy_candidates(tmp_path: Path):
+    """Test that candidates with a high error rate are skipped."""
+    store = ModelStatsStore(tmp_path / "stats.json")
+    store.record("flaky", True, 1000, 1000, 1.0)
+    store.record("flaky", False, 1000)
+    store.record("flaky", False, 1000)
+    store.record("steady", True, 1000, 1000, 3.0)
+
+    router = ModelRouter(["flaky", "steady"], store)
+    assert router.select(1000, slo_seconds=5.0).model_name == "steady"
+
+
+def test_router_rejects_invalid_candidates(tmp_path: Path):
+    """Test candidate validation."""
+    store = ModelStatsStore(tmp_path / "stats.json")
+    with pytest.raises(ValueError, match="At least one candidate"):
+        ModelRouter([], store)
+    with pytest.raises(ValueError, match="'auto' cannot be used"):
+        ModelRouter(["auto"], store)
+
+
+def test_parse_candidates(monkeypatch: pytest.MonkeyPatch):
+    """Test candidate parsing from options, environment and defaults."""
+    monkeypatch.delenv("COMMITCURRY_AUTO_MODELS", raising=False)
+    assert parse_candidates(None) == list(DEFAULT_AUTO_CANDIDATES)
+    assert parse_candidates("a, b,,c") == ["a", "b", "c"]
+
+    monkeypatch.setenv("COMMITCURRY_AUTO_MODELS", "ollama:qwen3:8b,gemini-2.5-flash")
+    assert parse_candidates(None) == ["ollama:qwen3:8b", "gemini-2.5-flash"]
+
+
+def test_stats_store_merges_runs_of_other_processes(tmp_path: Path):
+    """Test that a store does not overwrite runs recorded since it loaded."""
+    path = tmp_path / "model_stats.json"
+    first = ModelStatsStore(path)
+    second = ModelStatsStore(path)
+
+    first.record("gemini-2.5-flash", True, 100, 200, 2.5)
+    second.record("gemini-2.0-flash", True, 100, 200, 1.5)
+    second.record("gemini-2.5-flash", False, 100)
+
+    stats = ModelStatsStore(path)
+    assert stats.get("gemini-2.5-flash").outcomes == [True, False]
+    assert stats.get("gemini-2.0-flash").samples == [(100, 200, 1.5)]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "model_stats.json",
+        "model_stats.json.lock",
+    ]
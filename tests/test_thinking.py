@@ -0,0 +1,226 @@
+"""Tests for reasoning-token budget control."""
+
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from commitcurry.cv_optimizer import CVOptimizer
+from commitcurry.main import main
+from commitcurry.providers.factory import AgentFactory
+from commitcurry.providers.gemini_thinking import reported_thinking_tokens
+from commitcurry.thinking import (
+    ThinkingBudgetExceededError,
+    ThinkStripper,
+    get_thinking_support,
+    thinking_control,
+)
+
+from .conftest import OllamaStandIn
+
+THINKING_WORDS = 200
+
+
+def thinking_chunks(request: dict) -> list[str]:
+    """Stream a think block before the answer, unless thinking is disabled."""
+    chunks = []
+    if request.get("think") is not False:
+        chunks.append("<thi")
+        chunks.append("nk>")
+        chunks.extend("hmm " for _ in range(THINKING_WORDS))
+        chunks.append("</think>\n\n")
+    chunks.extend(["# Tailored ", "CV"])
+    return chunks
+
+
+@pytest.fixture
+def thinking_ollama(ollama_stand_in) -> OllamaStandIn:
+    """Start an Ollama stand-in streaming a think block before the answer."""
+    return ollama_stand_in(thinking_chunks)
+
+
+def test_stripper_removes_think_blocks_split_across_chunks():
+    """Test that tags split across chunks are recognised."""
+    stripper = ThinkStripper()
+    for chunk in ["Intro <th", "ink>reason", "ing</thi", "nk> Answer <", "b>"]:
+        stripper.feed(chunk)
+
+    assert stripper.finish() == "Intro  Answer <b>"
+    # Counted per chunk, as streamed chunks are roughly one token each
+    assert stripper.thinking_tokens == 2
+
+
+def test_stripper_handles_think_block_opened_by_template():
+    """Test that a lone closing tag marks everything before it as thinking."""
+    stripper = ThinkStripper()
+    stripper.feed("let me think about this")
+    assert stripper.undecided
+    stripper.feed("</think>\nAnswer")
+
+    assert not stripper.undecided
+    assert stripper.template_opened
+    assert stripper.finish() == "Answer"
+    assert stripper.thinking_tokens == 5
+
+
+def test_stripper_enforces_budget():
+    """Test that thinking past the budget raises."""
+    stripper = ThinkStripper(budget=10)
+    stripper.feed("<think>")
+    with pytest.raises(ThinkingBudgetExceededError):
+        for _ in range(20):
+            stripper.feed("word ")
+
+
+def test_thinking_support_lookup():
+    """Test that reasoning models are recognised by prefix."""
+    assert get_thinking_support("ollama:deepseek-r1:7b").inline
+    assert not get_thinking_support("gemini-2.5-flash").inline
+    assert get_thinking_support("ollama:qwen2.5:7b") is None
+    assert thinking_control("ollama:mistral:7b", enabled=False) is None
+
+
+def test_thinking_cannot_be_disabled_for_gemini_pro():
+    """Test that disabling thinking is refused where the provider forbids it."""
+    with pytest.raises(ValueError, match="cannot be disabled"):
+        thinking_control("gemini-2.5-pro", enabled=False)
+
+
+def test_optimizer_strips_thinking_and_reports_usage(thinking_ollama):
+    """Test that the returned CV holds no think block."""
+    agent = AgentFactory.create_agent(
+        "ollama:deepseek-r1:7b", base_url=thinking_ollama.url
+    )
+    optimizer = CVOptimizer(
+        agent=agent, thinking=thinking_control("ollama:deepseek-r1:7b")
+    )
+
+    assert optimizer.optimize_cv("CV", "Job") == "# Tailored CV"
+    assert optimizer.thinking_usage.thinking_tokens == 200
+    assert optimizer.thinking_usage.answer_tokens == 4
+    assert not optimizer.thinking_usage.retried_without_thinking
+    assert thinking_ollama.requests[0]["stream"] is True
+
+
+def test_optimizer_retries_without_thinking_over_budget(thinking_ollama):
+    """Test that exceeding the budget aborts and retries with think=False."""
+    agent = AgentFactory.create_agent(
+        "ollama:deepseek-r1:7b", base_url=thinking_ollama.url
+    )
+    optimizer = CVOptimizer(
+        agent=agent,
+        thinking=thinking_control("ollama:deepseek-r1:7b", budget=50),
+    )
+
+    assert optimizer.optimize_cv("CV", "Job") == "# Tailored CV"
+    first, second = thinking_ollama.requests
+    assert "think" not in first
+    assert second["think"] is False
+    assert optimizer.thinking_usage.retried_without_thinking
+    assert 50 < optimizer.thinking_usage.thinking_tokens < 200
+    # The budget override does not stick to the driver
+    assert "think" not in agent.prompt_driver.extra_params
+
+
+def gemini_response(thinking_tokens: int):
+    """Build a Gemini SDK response reporting its thinking tokens."""
+    from google.genai import types
+
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(
+                    role="model", parts=[types.Part(text="# Tailored CV")]
+                )
+            )
+        ],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=10,
+            candidates_token_count=4,
+            thoughts_token_count=thinking_tokens,
+        ),
+    )
+
+
+def test_optimizer_reports_gemini_thinking_tokens():
+    """Test that Gemini thinking tokens come from the response usage."""
+    models = SimpleNamespace(generate_content=lambda **kwargs: gemini_response(120))
+    with (
+        patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}),
+        patch("google.genai.Client", return_value=SimpleNamespace(models=models)),
+    ):
+        agent = AgentFactory.create_agent("gemini-2.5-flash")
+        assert reported_thinking_tokens(agent.prompt_driver) == 0
+        optimizer = CVOptimizer(
+            agent=agent, thinking=thinking_control("gemini-2.5-flash")
+        )
+
+        assert optimizer.optimize_cv("CV", "Job") == "# Tailored CV"
+        assert optimizer.thinking_usage.thinking_tokens == 120
+        assert optimizer.thinking_usage.answer_tokens == 4
+        # Each run reports only its own response
+        optimizer.optimize_cv("CV", "Job")
+        assert optimizer.thinking_usage.thinking_tokens == 120
+        assert reported_thinking_tokens(agent.prompt_driver) == 240
+
+
+def test_factory_disables_thinking():
+    """Test that think=False reaches the provider options."""
+    agent = AgentFactory.create_agent("ollama:qwen3:8b", think=False)
+    assert agent.prompt_driver.extra_params["think"] is False
+
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        agent = AgentFactory.create_agent("gemini-2.5-flash", think=False)
+        assert agent.prompt_driver.extra_params["thinking_config"] == {
+            "thinking_budget": 0
+        }
+        agent = AgentFactory.create_agent("gemini-2.5-flash", think_budget=512)
+        assert agent.prompt_driver.extra_params["thinking_config"] == {
+            "thinking_budget": 512
+        }
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_main_command_no_think(mock_create_optimizer, mock_create_agent, tmp_path):
+    """Test that --no-think disables thinking for reasoning models."""
+    mock_optimizer = mock_create_optimizer.return_value
+    mock_optimizer.optimize_cv.return_value = "Optimized CV content"
+    cv_file = tmp_path / "cv.txt"
+    job_file = tmp_path / "job.txt"
+    cv_file.write_text("John Doe")
+    job_file.write_text("Backend Developer")
+
+    result = CliRunner().invoke(
+        main,
+        ["-m", "ollama:deepseek-r1:7b", "--no-think", str(cv_file), str(job_file)],
+    )
+
+    assert result.exit_code == 0
+    assert mock_create_agent.call_args.kwargs["think"] is False
+    assert mock_optimizer.thinking.enabled is False
+
+
+@patch("commitcurry.main.AgentFactory.create_agent")
+@patch("commitcurry.main.create_cv_optimizer")
+def test_main_command_reports_unavailable_thinking_count(
+    mock_create_optimizer, mock_create_agent, tmp_path
+):
+    """Test that verbose mode says when no thinking count was reported."""
+    mock_optimizer = mock_create_optimizer.return_value
+    mock_optimizer.optimize_cv.return_value = "Optimized CV content"
+    mock_optimizer.thinking_usage = None
+    cv_file = tmp_path / "cv.txt"
+    job_file = tmp_path / "job.txt"
+    cv_file.write_text("John Doe")
+    job_file.write_text("Backend Developer")
+
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = CliRunner().invoke(
+            main, ["-m", "gemini-2.5-flash", "-v", str(cv_file), str(job_file)]
+        )
+
+    assert result.exit_code == 0, result.output
+    assert "Thinking token count unavailable for gemini-2.5-flash" in result.output
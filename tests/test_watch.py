@@ -0,0 +1,192 @@
+"""Tests for watch mode."""
+
+import os
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from commitcurry.cv_optimizer import CVOptimizer
+from commitcurry.main import main
+from commitcurry.watch import FileWatcher, WatchSession, atomic_write
+
+
+class EchoAgent:
+    """Agent stand-in answering with the job description it was given.
+
+    Runs block while ``gate`` is cleared, so tests can supersede them.
+    """
+
+    def __init__(self):
+        self.prompts: list[str] = []
+        self.prompt_driver = None
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def run(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        while not self.gate.wait(0.01):
+            pass
+        return "Tailored for " + prompt.strip().rsplit("\n", 1)[-1]
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    """Wait until a condition holds."""
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "condition not met in time"
+        time.sleep(0.01)
+
+
+def make_session(tmp_path: Path, agent: EchoAgent) -> WatchSession:
+    cv_file = tmp_path / "cv.md"
+    job_file = tmp_path / "job.md"
+    cv_file.write_text("John Doe\nEngineer")
+    job_file.write_text("Backend Developer")
+    return WatchSession(
+        CVOptimizer(agent=agent),
+        "gemini-2.5-flash",
+        cv_file,
+        job_file,
+        tmp_path / "out.md",
+    )
+
+
+def test_atomic_write_replaces_content(tmp_path: Path):
+    """Test that atomic writes replace the file and leave no temp files."""
+    target = tmp_path / "out.md"
+    target.write_text("old")
+
+    atomic_write(target, "new")
+
+    assert target.read_text() == "new"
+    assert os.listdir(tmp_path) == ["out.md"]
+
+
+def test_file_watcher_debounces_changes(tmp_path: Path):
+    """Test that a change is reported once it has settled."""
+    path = tmp_path / "cv.md"
+    path.write_text("v1")
+    watcher = FileWatcher([path], debounce=1.0)
+
+    assert not watcher.poll(now=0.0)
+    path.write_text("version 2")
+    assert not watcher.poll(now=1.0)
+    assert not watcher.poll(now=1.5)
+    path.write_text("version three")
+    assert not watcher.poll(now=1.8)
+    assert not watcher.poll(now=2.5)
+    assert watcher.poll(now=2.9)
+    assert not watcher.poll(now=5.0)
+
+
+def test_file_watcher_reports_deleted_files(tmp_path: Path):
+    """Test that a removed file counts as a change."""
+    path = tmp_path / "cv.md"
+    path.write_text("v1")
+    watcher = FileWatcher([path], debounce=0.0)
+
+    path.unlink()
+    watcher.poll(now=0.0)
+    assert watcher.poll(now=0.0)
+
+
+def test_session_writes_output(tmp_path: Path):
+    """Test that a run writes the tailored CV to the output file."""
+    agent = EchoAgent()
+    session = make_session(tmp_path, agent)
+
+    session.check()
+    session.wait()
+
+    assert session.output_file.read_text() == "Tailored for Backend Developer\n"
+
+
+def test_session_skips_unchanged_content(tmp_path: Path):
+    """Test that saving identical content does not start a new run."""
+    agent = EchoAgent()
+    session = make_session(tmp_path, agent)
+    session.check()
+    session.wait()
+
+    session.job_file.write_text("Backend Developer")
+    session.check()
+    session.wait()
+
+    assert session.runs == 1
+    assert len(agent.prompts) == 1
+
+
+def test_session_newer_edit_cancels_run_in_flight(tmp_path: Path):
+    """Test that an edit supersedes the run in flight."""
+    agent = EchoAgent()
+    agent.gate.clear()
+    session = make_session(tmp_path, agent)
+    session.check()
+    wait_for(lambda: len(agent.prompts) == 1)
+
+    session.job_file.write_text("Data Engineer")
+    agent.gate.set()
+    session.check()
+    session.wait()
+
+    assert session.output_file.read_text() == "Tailored for Data Engineer\n"
+    assert session.runs == 2
+
+
+def test_session_superseded_result_is_not_written(tmp_path: Path):
+    """Test that a cancelled run never writes its output."""
+    agent = EchoAgent()
+    agent.gate.clear()
+    session = make_session(tmp_path, agent)
+    session.check()
+    wait_for(lambda: len(agent.prompts) == 1)
+
+    session._cancel_running()
+    agent.gate.set()
+
+    assert not session.output_file.exists()
+
+
+def test_session_run_reacts_to_changes(tmp_path: Path):
+    """Test the watch loop end to end."""
+    agent = EchoAgent()
+    session = make_session(tmp_path, agent)
+    session.watcher.debounce = 0.05
+    stop = threading.Event()
+    loop = threading.Thread(target=session.run, args=(stop,))
+    loop.start()
+    try:
+        wait_for(lambda: session.output_file.exists())
+        session.job_file.write_text("Data Engineer")
+        wait_for(
+            lambda: session.output_file.read_text() == "Tailored for Data Engineer\n"
+        )
+    finally:
+        stop.set()
+        loop.join()
+
+
+@patch("commitcurry.main.WatchSession")
+@patch("commitcurry.main.AgentFactory.create_agent")
+def test_watch_command_builds_session(
+    mock_create_agent, mock_session, tmp_path: Path
+) -> None:
+    """Test that the watch subcommand wires the session."""
+    cv_file = tmp_path / "cv.md"
+    job_file = tmp_path / "job.md"
+    cv_file.write_text("John Doe")
+    job_file.write_text("Backend Developer")
+    mock_session.return_value.run.side_effect = KeyboardInterrupt
+
+    runner = CliRunner()
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+        result = runner.invoke(main, ["watch", "--edits", str(cv_file), str(job_file)])
+
+    assert result.exit_code == 0
+    assert "Stopped watching" in result.output
+    args, kwargs = mock_session.call_args
+    assert args[2:] == (cv_file, job_file, tmp_path / "cv.tailored.md")
+    assert kwargs["edits"] is True